@@ -1,6 +1,9 @@
+import os
+
 from infrastructure.web.flask_app import create_app
 
-app = create_app()
+# WARM_UP=0 arranca en frío (índices y payloads se arman en la primera petición)
+app = create_app(warm_up=os.environ.get("WARM_UP", "1") != "0")
 
 if __name__ == "__main__":
     app.run(host="127.0.0.1", port=5057, debug=True)
\ No newline at end of file
@@ -1,21 +1,49 @@
-from .use_cases import SearchProductsUseCase, GetProductUseCase, NormalRingUseCase
+from typing import List, Optional
+from .use_cases import GetProductsUseCase
 
 class ProductService:
+    # peticiones idénticas simultáneas se agrupan en el controlador (single-flight
+    # por clave de cache), no aquí
     def __init__(self, search_use_case, get_use_case, repo):
         self.search_use_case = search_use_case
         self.get_use_case = get_use_case
         self.repo = repo
+        self.get_many_use_case = GetProductsUseCase(repo)
 
-    def search_products(self, query: str = ""):
+    def search_products(self, query: str = "", limit: Optional[int] = None,
+                        cursor: Optional[str] = None, with_total: bool = True, fuzzy: bool = False,
+                        filters: Optional[dict] = None):
         # aquí usas el caso de uso
-        return self.search_use_case.execute(query)
+        return self.search_use_case.execute(
+            query, limit=limit, cursor=cursor, with_total=with_total, fuzzy=fuzzy, filters=filters
+        )
     
+    def suggest(self, query: str, limit: int):
+        return self.repo.suggest_products(query, limit)
+
+    def stream_products(self, query: str = "", fuzzy: bool = False):
+        # generador: el controlador proyecta y serializa a medida que llegan
+        return self.search_use_case.stream(query, fuzzy=fuzzy)
+
     def get_product(self, product_id: str):
         return self.get_use_case.execute(product_id)
 
-    def normal_ring(self):
-        # aquí sí puedes usar el repo directamente
-        return self.repo.normal_ring()
-    
-    def best_sellers(self):
-        return self.repo.best_sellers()
\ No newline at end of file
+    def get_products(self, product_ids: List[str]):
+        return self.get_many_use_case.execute(product_ids)
+
+    def collection(self, name: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                   with_total: bool = True):
+        """Página de una colección curada; None si no existe."""
+        return self.repo.collection(name, limit=limit, cursor=cursor, with_total=with_total)
+
+    def list_collections(self):
+        return self.repo.list_collections()
+
+    def stream_collection(self, name: str):
+        return self.repo.iter_collection(name)
+
+    def data_version(self) -> int:
+        return self.repo.data_version()
+
+    def data_token(self) -> str:
+        return self.repo.data_token()
\ No newline at end of file
@@ -1,12 +1,29 @@
-from core.entities import ProductSearchResult
+from typing import Iterator, List, Optional
+from core.entities import Product, ProductSearchResult
+from core.facets import Filters
 from core.ports import ProductRepository
 
 class SearchProductsUseCase:
     def __init__(self, product_repository: ProductRepository):
         self.product_repository = product_repository
     
-    def execute(self, query: str = "") -> ProductSearchResult:
-        return self.product_repository.search_products(query)
+    def execute(self, query: str = "", limit: Optional[int] = None,
+                cursor: Optional[str] = None, with_total: bool = True, fuzzy: bool = False,
+                filters: Optional[Filters] = None) -> ProductSearchResult:
+        if filters is not None:
+            return self.product_repository.filter_products(
+                filters, query, limit=limit, cursor=cursor, with_total=with_total
+            )
+        if fuzzy:
+            return self.product_repository.fuzzy_search_products(
+                query, limit=limit, cursor=cursor, with_total=with_total
+            )
+        return self.product_repository.search_products(query, limit=limit, cursor=cursor, with_total=with_total)
+
+    def stream(self, query: str = "", fuzzy: bool = False) -> Iterator[Product]:
+        if fuzzy:
+            return self.product_repository.iter_fuzzy_search_products(query)
+        return self.product_repository.iter_search_products(query)
 
 class GetProductUseCase:
     def __init__(self, product_repository: ProductRepository):
@@ -15,9 +32,9 @@ class GetProductUseCase:
     def execute(self, product_id: str):
         return self.product_repository.get_product_by_id(product_id)
 
-class NormalRingUseCase:
-    def __init__(self, repo: ProductRepository):
-        self.repo = repo
+class GetProductsUseCase:
+    def __init__(self, product_repository: ProductRepository):
+        self.product_repository = product_repository
 
-    def execute(self):
-        return self.repo.normal_ring()
+    def execute(self, product_ids: List[str]) -> List[Product]:
+        return self.product_repository.get_products_by_ids(product_ids)
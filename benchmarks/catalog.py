@@ -0,0 +1,98 @@
+"""
+Catálogos sintéticos para benchmarks: misma estructura que `data.sqlite`
+(se construyen con el mismo código de la ingesta) y PNGs de prueba.
+
+    python -m benchmarks.catalog 10000 /tmp/bench-10k
+"""
+import random
+import sys
+from pathlib import Path
+from typing import Iterator, List
+
+from PIL import Image
+
+from infrastructure.database.ingest import build_database, images_by_product
+from infrastructure.database.models import DatabaseConfig
+
+COLUMNS = ["id", "nombres", "categoria", "plus", "descripcion", "acabado", "material", "piedra", "estilo"]
+
+TIPOS = ["ANILLO", "CADENA", "ARGOLLAS", "DIJE", "PULSERA", "JUEGO", "ARETES", "COLLAR"]
+ESTILOS = ["CONTEMPORANEO", "MINIMALISTA", "MARTILLADO", "SATINADO", "HEXAGONAL", "VINTAGE", "CLÁSICO", "ENTORCHADO"]
+COLORES = ["NEGRO", "VERDE", "ROJO", "AZUL", "BLANCO", "DORADO", "ROSA"]
+CATEGORIAS = [
+    "MUJERES JOYAS DE PLATA",
+    "MUJERES JOYAS DE ORO 18K",
+    "HOMBRES JOYAS DE ORO 18K",
+    "HOMBRES JOYAS DE PLATA",
+    "ANILLOS DE COMPROMISO",
+    "MUJERES JOYAS DE ORO 18K HOMBRES JOYAS DE ORO 18K",
+]
+MATERIALES = ["Oro 18K", "Oro 18K de alta pureza", "Plata de alta calidad", "Plata italiana de alta calidad", "Oro sólido 18K"]
+PIEDRAS = [None, None, "Circón", "Malaquita natural (verde intenso)", "Esmeralda", "Ónix"]
+ACABADOS = [None, "Pulido brillante", "Diamantado", "Pulido con efecto artesanal", "Satinado"]
+
+
+def synthetic_rows(count: int, seed: int = 42) -> Iterator[list]:
+    rnd = random.Random(seed)
+    for pid in range(1, count + 1):
+        tipo = rnd.choice(TIPOS)
+        nombre = f"{tipo} {rnd.choice(ESTILOS)} {rnd.choice(COLORES)}"
+        yield [
+            str(pid),
+            nombre,
+            rnd.choice(CATEGORIAS),
+            "BEST SELLER" if rnd.random() < 0.3 else None,
+            f"{nombre.capitalize()} elaborado en {rnd.choice(MATERIALES).lower()}, ideal para uso diario.",
+            rnd.choice(ACABADOS),
+            rnd.choice(MATERIALES),
+            rnd.choice(PIEDRAS),
+            rnd.choice(ESTILOS).capitalize(),
+        ]
+
+
+def synthetic_images(images_dir: Path, count: int, size=(1200, 1600), seed: int = 42) -> List[str]:
+    """`<id>.png` para los primeros `count` productos (reutiliza los que ya existan)."""
+    rnd = random.Random(seed)
+    images_dir.mkdir(parents=True, exist_ok=True)
+    names = []
+    for pid in range(1, count + 1):
+        path = images_dir / f"{pid}.png"
+        color = (rnd.randrange(256), rnd.randrange(256), rnd.randrange(256))
+        if not path.exists():
+            im = Image.new("RGB", size, color)
+            # algo de detalle para que los derivados no sean triviales de comprimir
+            for y in range(0, size[1], 40):
+                im.paste((color[2], color[0], color[1]), (0, y, size[0], y + 8))
+            im.save(path, optimize=False)
+        names.append(path.name)
+    return names
+
+
+def build_catalog(directory: str, products: int, images: int = 50, seed: int = 42) -> dict:
+    """
+    Crea `<directory>/catalog.sqlite` y `<directory>/products/` si no existen.
+    Devuelve las rutas para `create_app`.
+    """
+    base = Path(directory)
+    base.mkdir(parents=True, exist_ok=True)
+    db_path = base / "catalog.sqlite"
+    products_dir = base / "products"
+    synthetic_images(products_dir, min(images, products), seed=seed)
+    if not db_path.exists():
+        tmp = base / "catalog.sqlite.tmp"
+        if tmp.exists():
+            tmp.unlink()
+        build_database(str(tmp), COLUMNS, synthetic_rows(products, seed),
+                       images_by_product(products_dir), DatabaseConfig(db_path=str(db_path)))
+        tmp.replace(db_path)
+    return {
+        "db_path": str(db_path),
+        "products_dir": str(products_dir),
+        "derivatives_dir": str(base / "derivatives"),
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("uso: python -m benchmarks.catalog <productos> <directorio>")
+    print(build_catalog(sys.argv[2], int(sys.argv[1])))
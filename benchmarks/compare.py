@@ -0,0 +1,69 @@
+"""
+Compara dos corridas de `benchmarks.run` y marca regresiones.
+
+    python -m benchmarks.compare base.json nuevo.json [--threshold 0.15]
+
+Sale con código 1 si algún p95 (o el pico de RSS) empeora más que el
+umbral, para poder usarlo antes de desplegar.
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+# ruido de medición: por debajo de esto no se considera regresión
+MIN_DELTA_MS = 0.5
+
+
+def _load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as fh:
+        report = json.load(fh)
+    return {(r["size"], r["mode"]): r for r in report.get("results", []) if "error" not in r}
+
+
+def _change(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    if not old or new is None:
+        return None
+    return (new - old) / old
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compara dos resultados de benchmark.")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.15, help="empeoramiento tolerado (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    base, new = _load(args.base), _load(args.new)
+    regressions = []
+    for key in sorted(set(base) & set(new)):
+        old_run, new_run = base[key], new[key]
+        print(f"[{key[1]} {key[0]}]")
+        rss = _change(old_run.get("peak_rss_kb"), new_run.get("peak_rss_kb"))
+        if rss is not None:
+            print(f"  {'peak_rss_kb':<28} {old_run['peak_rss_kb']:>10} -> {new_run['peak_rss_kb']:>10}  {rss:+.1%}")
+            if rss > args.threshold:
+                regressions.append(f"{key[1]} {key[0]} peak_rss_kb {rss:+.1%}")
+        for name in sorted(set(old_run["endpoints"]) & set(new_run["endpoints"])):
+            for metric in METRICS:
+                old, cur = old_run["endpoints"][name].get(metric), new_run["endpoints"][name].get(metric)
+                delta = _change(old, cur)
+                if delta is None:
+                    continue
+                print(f"  {name + ' ' + metric:<28} {old:>10} -> {cur:>10}  {delta:+.1%}")
+                worse = -delta if metric == "throughput_rps" else delta
+                if metric == "p95_ms" and worse > args.threshold and cur - old >= MIN_DELTA_MS:
+                    regressions.append(f"{key[1]} {key[0]} {name} p95 {delta:+.1%}")
+
+    if regressions:
+        print("\nRegresiones:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("\nSin regresiones por encima del umbral.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,381 @@
+"""
+Benchmark de la API del catálogo sobre catálogos sintéticos.
+
+    python -m benchmarks.run --sizes 100,10000,100000 --modes inprocess,gunicorn
+
+Cada combinación (tamaño, modo) corre en un proceso aparte para que el
+pico de RSS sea el de ese escenario:
+
+- inprocess: `create_app()` + test client de Flask (sin red).
+- gunicorn:  HTTP real contra `gunicorn -k gthread` (requiere gunicorn),
+  cada worker arma todo en frío (PRELOAD=0).
+- gunicorn-preload: igual pero con preload_app + precalentado en el
+  master (gunicorn.conf.py); compara arranque y memoria por worker.
+
+Por endpoint se mide latencia fría (primera petición), p50/p95/p99,
+throughput y bytes. En gunicorn, además, el arranque (hasta que /ping
+responde 200) y RSS / PSS por proceso (PSS reparte las páginas
+compartidas copy-on-write entre los procesos que las usan). El
+resultado se guarda en JSON (`benchmarks/results/<fecha>.json`) para comparar con
+`python -m benchmarks.compare`.
+"""
+import argparse
+import http.client
+import importlib.util
+import json
+import math
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = BASE_DIR / "benchmarks" / "results"
+
+# nombre -> (variantes de URL que se recorren en ciclo, headers)
+ENDPOINTS: Dict[str, Tuple[List[str], Dict[str, str]]] = {
+    "products": (["/products"], {}),
+    "products_page": (["/products?limit=50"], {}),
+    "search": (["/products?q=anillo", "/products?q=plata", "/products?q=oro%2018k",
+                "/products?q=cadena%20negro", "/products?q=minimal"], {}),
+    "normal_ring": (["/products/normal-ring"], {}),
+    "best_sellers": (["/products/best-sellers"], {}),
+    "image": (["/assets/products/1.png"], {}),
+    "image_webp": (["/assets/products/1.png?w=640"], {"Accept": "image/webp,image/*;q=0.8"}),
+}
+
+
+# ========= medición =========
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    # nearest-rank
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def drive(make_client: Callable[[], Callable[[str, dict], Tuple[int, int]]], urls: List[str],
+          headers: Dict[str, str], requests: int, concurrency: int, duration: float) -> dict:
+    """
+    Lanza `requests` peticiones (o las que quepan en `duration` segundos)
+    repartidas en `concurrency` hilos. La primera se mide aparte (fría).
+    """
+    first_client = make_client()
+    started = time.perf_counter()
+    status, size = first_client(urls[0], headers)
+    first_ms = (time.perf_counter() - started) * 1000
+
+    latencies: List[float] = []
+    errors = [0 if status < 400 else 1]
+    total_bytes = [size]
+    lock = threading.Lock()
+    counter = iter(range(1, requests))
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        client = make_client()
+        local, local_errors, local_bytes = [], 0, 0
+        while time.perf_counter() < deadline:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            t0 = time.perf_counter()
+            try:
+                st, n = client(urls[i % len(urls)], headers)
+            except (OSError, http.client.HTTPException):
+                st, n = 599, 0
+            local.append((time.perf_counter() - t0) * 1000)
+            local_errors += st >= 400
+            local_bytes += n
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+            total_bytes[0] += local_bytes
+
+    t_start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(max(1, concurrency))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t_start
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        "requests": count + 1,
+        "errors": errors[0],
+        "first_ms": round(first_ms, 3),
+        "p50_ms": _round(percentile(latencies, 50)),
+        "p95_ms": _round(percentile(latencies, 95)),
+        "p99_ms": _round(percentile(latencies, 99)),
+        "mean_ms": _round(sum(latencies) / count if count else None),
+        "throughput_rps": round(count / elapsed, 1) if elapsed > 0 and count else None,
+        "bytes_per_request": total_bytes[0] // (count + 1),
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
+
+
+# ========= escenarios =========
+def run_inprocess(catalog: dict, args) -> dict:
+    sys.path.insert(0, str(BASE_DIR))
+    from infrastructure.web.flask_app import create_app
+
+    t0 = time.perf_counter()
+    app = create_app(**catalog)
+    startup = time.perf_counter() - t0
+
+    def make_client():
+        client = app.test_client()
+
+        def call(url, headers):
+            resp = client.get(url, headers=headers)
+            return resp.status_code, len(resp.get_data())
+        return call
+
+    endpoints = {
+        name: drive(make_client, urls, headers, args.requests, args.concurrency, args.duration)
+        for name, (urls, headers) in ENDPOINTS.items()
+    }
+    return {
+        "startup_s": round(startup, 3),
+        # ru_maxrss está en KB en Linux
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "endpoints": endpoints,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _process_tree(pid: int) -> List[int]:
+    out = [pid]
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as fh:
+                for child in fh.read().split():
+                    out.extend(_process_tree(int(child)))
+    except OSError:
+        pass
+    return out
+
+
+def _peak_rss_kb(pid: int) -> Optional[int]:
+    return _proc_kb(f"/proc/{pid}/status", "VmHWM:")
+
+
+def _proc_kb(path: str, field: str) -> Optional[int]:
+    try:
+        with open(path) as fh:
+            for line in fh:
+                if line.startswith(field):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _memory_kb(pid: int) -> dict:
+    """RSS pico, RSS actual y PSS (memoria propia + parte proporcional de la compartida)."""
+    return {
+        "rss_peak": _peak_rss_kb(pid),
+        "rss": _proc_kb(f"/proc/{pid}/status", "VmRSS:"),
+        "pss": _proc_kb(f"/proc/{pid}/smaps_rollup", "Pss:"),
+    }
+
+
+def run_gunicorn(catalog: dict, args, preload: bool = False) -> dict:
+    if importlib.util.find_spec("gunicorn") is None:
+        raise RuntimeError("gunicorn no está instalado (pip install gunicorn)")
+    port = _free_port()
+    factory = "infrastructure.web.flask_app:create_app({})".format(
+        ", ".join(f"{k}={v!r}" for k, v in dict(catalog, warm_up=preload).items())
+    )
+    # gunicorn.conf.py se carga desde BASE_DIR; PRELOAD decide preload_app
+    env = dict(os.environ, METRICS_DIR=tempfile.mkdtemp(prefix="bench-metrics-"),
+               PRELOAD="1" if preload else "0", PUBLIC_BASE_URL=f"http://127.0.0.1:{port}/")
+    cmd = [
+        sys.executable, "-m", "gunicorn", "-w", str(args.workers), "-k", "gthread",
+        "--threads", str(args.threads), "-b", f"127.0.0.1:{port}", "--log-level", "warning", factory,
+    ]
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=str(BASE_DIR), env=env)
+    try:
+        startup = None
+        while time.perf_counter() - t0 < 120:
+            if proc.poll() is not None:
+                raise RuntimeError(f"gunicorn terminó con código {proc.returncode}")
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+                conn.request("GET", "/ping")
+                resp = conn.getresponse()
+                resp.read()
+                conn.close()
+                if resp.status == 200:
+                    startup = time.perf_counter() - t0
+                    break
+            except OSError:
+                pass
+            time.sleep(0.05)
+        if startup is None:
+            raise RuntimeError("gunicorn no respondió en 120s")
+
+        def make_client():
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+
+            def call(url, headers):
+                conn.request("GET", url, headers=headers)
+                resp = conn.getresponse()
+                return resp.status, len(resp.read())
+            return call
+
+        # memoria recién arrancado (antes de la carga) y al final
+        memory_idle = {pid: _memory_kb(pid) for pid in _process_tree(proc.pid)}
+        endpoints = {
+            name: drive(make_client, urls, headers, args.requests, args.concurrency, args.duration)
+            for name, (urls, headers) in ENDPOINTS.items()
+        }
+        memory = {pid: _memory_kb(pid) for pid in _process_tree(proc.pid)}
+        return {
+            "startup_s": round(startup, 3),
+            "preload": preload,
+            "peak_rss_kb": sum(m["rss_peak"] or 0 for m in memory.values()),
+            "pss_kb": sum(m["pss"] or 0 for m in memory.values()),
+            "idle_pss_kb": sum(m["pss"] or 0 for m in memory_idle.values()),
+            "memory_kb_by_process": memory,
+            "workers": args.workers,
+            "threads": args.threads,
+            "endpoints": endpoints,
+        }
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+SCENARIOS = {
+    "inprocess": run_inprocess,
+    "gunicorn": run_gunicorn,
+    "gunicorn-preload": lambda catalog, args: run_gunicorn(catalog, args, preload=True),
+}
+
+
+# ========= orquestación =========
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(BASE_DIR),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _scenario_args(args) -> List[str]:
+    return [
+        "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+        "--duration", str(args.duration), "--workers", str(args.workers), "--threads", str(args.threads),
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de la API del catálogo.")
+    parser.add_argument("--sizes", default="100,10000,100000", help="tamaños de catálogo (coma)")
+    parser.add_argument("--modes", default="inprocess,gunicorn", help="inprocess, gunicorn y/o gunicorn-preload")
+    parser.add_argument("--requests", type=int, default=200, help="peticiones por endpoint (máximo)")
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos por endpoint (máximo)")
+    parser.add_argument("--concurrency", type=int, default=4, help="hilos cliente")
+    parser.add_argument("--workers", type=int, default=2, help="workers de gunicorn")
+    parser.add_argument("--threads", type=int, default=4, help="hilos por worker de gunicorn")
+    parser.add_argument("--images", type=int, default=50, help="PNGs sintéticos por catálogo")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "apijoyeria-bench"),
+                        help="dónde se guardan los catálogos (se reutilizan entre corridas)")
+    parser.add_argument("--out", default=None, help="archivo JSON de salida")
+    parser.add_argument("--scenario", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--catalog", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.scenario:
+        # proceso hijo: un solo escenario, resultado por stdout
+        result = SCENARIOS[args.scenario](json.loads(args.catalog), args)
+        sys.stdout.write(json.dumps(result) + "\n")
+        return 0
+
+    from benchmarks.catalog import build_catalog
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in SCENARIOS]
+    if unknown:
+        parser.error(f"modos desconocidos: {', '.join(unknown)}")
+
+    report = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("scenario", "catalog", "out")},
+        "endpoints": {name: urls for name, (urls, _) in ENDPOINTS.items()},
+        "results": [],
+    }
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        t0 = time.perf_counter()
+        catalog = build_catalog(os.path.join(args.workdir, str(size)), size, images=args.images)
+        print(f"catálogo {size}: {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+        for mode in modes:
+            entry = {"size": size, "mode": mode}
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.run", "--scenario", mode,
+                 "--catalog", json.dumps(catalog)] + _scenario_args(args),
+                cwd=str(BASE_DIR), capture_output=True, text=True,
+            )
+            if proc.returncode == 0:
+                entry.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+            else:
+                entry["error"] = (proc.stderr.strip().splitlines() or ["error"])[-1]
+            report["results"].append(entry)
+            _print_entry(entry)
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, ensure_ascii=False, indent=1)
+    print(f"resultados: {out}", file=sys.stderr)
+    return 0
+
+
+def _print_entry(entry: dict):
+    head = f"[{entry['mode']} {entry['size']}]"
+    if "error" in entry:
+        print(f"{head} error: {entry['error']}", file=sys.stderr)
+        return
+    memory = f"pico RSS {entry['peak_rss_kb'] // 1024} MB"
+    if entry.get("pss_kb"):
+        memory += f", PSS {entry['idle_pss_kb'] // 1024} MB en reposo / {entry['pss_kb'] // 1024} MB al final"
+    print(f"{head} arranque {entry['startup_s']}s, {memory}", file=sys.stderr)
+    for name, m in entry["endpoints"].items():
+        print(
+            f"  {name:<14} p50 {m['p50_ms']}ms  p95 {m['p95_ms']}ms  p99 {m['p99_ms']}ms  "
+            f"{m['throughput_rps']} req/s  fría {m['first_ms']}ms  {m['bytes_per_request']} B"
+            + (f"  errores {m['errors']}" if m["errors"] else ""),
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Colecciones curadas declarativas: un nombre + reglas sobre campos
+normalizados (ver `norm`). Se declaran en `resources/collections.json`:
+
+    {
+      "normal-ring": {
+        "title": "Anillos",
+        "rules": [
+          {"field": "nombres", "op": "contains", "value": "anillo"},
+          {"field": "categoria", "op": "not_contains", "value": "compromiso"}
+        ]
+      }
+    }
+
+Operadores (todas las reglas deben cumplirse):
+- contains / not_contains: subcadena del texto normalizado.
+- equals / not_equals: texto normalizado completo.
+- token: palabra exacta entre los tokens del campo (como categoria_tokens).
+- present: el campo tiene valor.
+
+Un campo sin valor no cumple ninguna regla (tampoco las negativas),
+igual que LIKE / NOT LIKE con NULL en SQL.
+"""
+import json
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Tuple
+
+from .text import norm, tokens_from_category
+
+OPERATORS = ("contains", "not_contains", "equals", "not_equals", "token", "present")
+
+
+class CollectionConfigError(ValueError):
+    """Definición de colección inválida."""
+
+
+@dataclass(frozen=True)
+class CollectionRule:
+    field: str
+    op: str
+    value: str = ""
+
+    def __post_init__(self):
+        if self.op not in OPERATORS:
+            raise CollectionConfigError(f"operador desconocido: {self.op}")
+        # el valor se compara siempre normalizado
+        object.__setattr__(self, "value", norm(self.value))
+
+    def matches(self, normalized: str) -> bool:
+        """`normalized` es norm(valor del campo); '' si no tiene valor."""
+        if not normalized:
+            return False
+        if self.op == "contains":
+            return self.value in normalized
+        if self.op == "not_contains":
+            return self.value not in normalized
+        if self.op == "equals":
+            return normalized == self.value
+        if self.op == "not_equals":
+            return normalized != self.value
+        if self.op == "token":
+            return self.value in tokens_from_category(normalized)
+        return True  # present
+
+
+@dataclass(frozen=True)
+class CollectionDefinition:
+    name: str
+    title: str
+    rules: Tuple[CollectionRule, ...]
+
+    @property
+    def fields(self) -> FrozenSet[str]:
+        return frozenset(r.field for r in self.rules)
+
+    def matches(self, normalized: Dict[str, str]) -> bool:
+        """`normalized`: campo -> texto normalizado (ver `normalize_fields`)."""
+        return all(r.matches(normalized.get(r.field, "")) for r in self.rules)
+
+
+def normalize_fields(data: dict, fields) -> Dict[str, str]:
+    return {f: norm(data.get(f)) for f in fields}
+
+
+def parse_collections(raw: dict) -> Tuple[CollectionDefinition, ...]:
+    if not isinstance(raw, dict):
+        raise CollectionConfigError("se esperaba un objeto {nombre: definición}")
+    out = []
+    for name, spec in raw.items():
+        try:
+            rules = tuple(
+                CollectionRule(str(r["field"]), str(r["op"]), str(r.get("value", "")))
+                for r in spec["rules"]
+            )
+        except (KeyError, TypeError) as e:
+            raise CollectionConfigError(f"colección {name!r} inválida: {e}")
+        if not rules:
+            raise CollectionConfigError(f"colección {name!r} sin reglas")
+        out.append(CollectionDefinition(str(name), str(spec.get("title") or name), rules))
+    return tuple(out)
+
+
+def load_collections(path: str) -> Tuple[CollectionDefinition, ...]:
+    with open(path, "r", encoding="utf-8") as fh:
+        return parse_collections(json.load(fh))
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List, Optional, Any
+from typing import Dict, List, Optional, Any
 
 @dataclass
 class ProductImage:
@@ -21,7 +21,16 @@ class Product:
         principal = next((img for img in self.images if img.is_primary), None)
         return principal.path if principal else None
 
+@dataclass
+class Suggestion:
+    """Sugerencia compacta del autocompletado."""
+    id: Any  # valor de la columna id tal cual (mismo tipo que "id" en /products)
+    name: str  # nombre presentable (nombres_display)
+    image: Optional[ProductImage] = None  # imagen principal (miniatura)
+
 @dataclass
 class ProductSearchResult:
-    total: int
-    data: List[Product]
\ No newline at end of file
+    total: Optional[int]  # None si se pidió omitir el conteo
+    data: List[Product]
+    next_cursor: Optional[str] = None  # cursor de la página siguiente (si la hay)
+    facets: Optional[Dict[str, Dict[str, int]]] = None  # campo -> valor -> productos
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""
+Filtros por facetas (`/products?categoria=plata&material=oro`).
+
+Cada campo facetado se indexa por tokens normalizados, igual que
+`categoria_tokens`: "Plata italiana de alta calidad" -> plata, italiana,
+alta, calidad. Un valor de filtro con varias palabras exige todas; varios
+valores del mismo campo se combinan con OR y campos distintos con AND.
+"""
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+from .text import STOPWORDS, norm, tokens_from_category
+
+FACET_FIELDS = ("categoria", "material", "piedra")
+
+# campo -> valores pedidos; cada valor es una tupla de tokens
+Filters = Dict[str, Tuple[Tuple[str, ...], ...]]
+
+
+def facet_tokens(value) -> List[str]:
+    """Tokens facetables de un valor (sin stopwords ni repetidos)."""
+    return [t for t in dict.fromkeys(tokens_from_category(norm(value))) if t not in STOPWORDS]
+
+
+def parse_filters(args: Mapping[str, Iterable[str]]) -> Filters:
+    """{'material': ['Oro 18K', 'plata']} -> {'material': (('oro', '18k'), ('plata',))}."""
+    out: Filters = {}
+    for field in FACET_FIELDS:
+        values = tuple(t for t in (tuple(facet_tokens(v)) for v in args.get(field) or ()) if t)
+        if values:
+            out[field] = values
+    return out
+
+
+def matches_filters(tokens: Mapping[str, Iterable[str]], filters: Filters) -> bool:
+    """`tokens`: campo -> tokens del producto."""
+    for field, values in filters.items():
+        have = set(tokens.get(field) or ())
+        if not any(have.issuperset(v) for v in values):
+            return False
+    return True
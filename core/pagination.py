@@ -0,0 +1,79 @@
+import base64
+import bisect
+import json
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+# tope de productos por página (evita ?limit=100000000)
+MAX_PAGE_SIZE = 500
+
+
+class PaginationError(ValueError):
+    """Parámetros de paginación inválidos (limit o cursor)."""
+
+
+def encode_cursor(order: str, key: Sequence[Any]) -> str:
+    """Cursor opaco: orden + clave del último elemento devuelto."""
+    raw = json.dumps({"o": order, "k": list(key)}, separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        if not isinstance(data, dict) or not isinstance(data["k"], list):
+            raise ValueError
+    except (ValueError, KeyError, TypeError, UnicodeError):
+        raise PaginationError("cursor inválido")
+    return data
+
+
+def decode_cursor(cursor: Optional[str], order: str) -> Optional[list]:
+    """Devuelve la clave del cursor, o None si no hay cursor."""
+    if not cursor:
+        return None
+    data = _decode(cursor)
+    if data.get("o") != order:
+        raise PaginationError("cursor inválido")
+    return data["k"]
+
+
+def cursor_order(cursor: Optional[str]) -> Optional[str]:
+    """Orden con el que se generó el cursor (None si no hay cursor)."""
+    return _decode(cursor).get("o") if cursor else None
+
+
+def parse_limit(raw: Optional[str]) -> Optional[int]:
+    if raw is None or str(raw).strip() == "":
+        return None
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise PaginationError("limit debe ser un entero")
+    if limit < 1:
+        raise PaginationError("limit debe ser mayor que 0")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def paginate(items: Sequence[Any], key: Callable[[Any], tuple], limit: Optional[int],
+             after: Optional[list], keys: Optional[Sequence[tuple]] = None) -> Tuple[List[Any], Optional[tuple]]:
+    """
+    Keyset en memoria sobre una lista ya ordenada por `key`.
+    `keys`: claves ya calculadas (p. ej. las del snapshot); si no, la
+    búsqueda binaria calcula `key` solo en O(log n) elementos.
+    Devuelve (página, clave del último elemento si quedan más).
+    """
+    start = 0
+    if after is not None:
+        try:
+            if keys is not None:
+                start = bisect.bisect_right(keys, tuple(after))
+            else:
+                start = bisect.bisect_right(items, tuple(after), key=key)
+        except TypeError:
+            raise PaginationError("cursor inválido")
+    if limit is None:
+        return list(items[start:]), None
+    page = list(items[start:start + limit])
+    has_more = start + limit < len(items)
+    return page, (key(page[-1]) if has_more and page else None)
@@ -1,21 +1,98 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from .entities import Product, ProductSearchResult
+from typing import Iterator, List, Optional, Tuple
+from .collections import CollectionDefinition
+from .entities import Product, ProductSearchResult, Suggestion
+from .facets import Filters
 
 class ProductRepository(ABC):
     """Puerto para acceso a datos de productos"""
     
     @abstractmethod
-    def search_products(self, query: str = "") -> ProductSearchResult:
+    def search_products(self, query: str = "", limit: Optional[int] = None,
+                        cursor: Optional[str] = None, with_total: bool = True) -> ProductSearchResult:
+        """
+        Busca productos en orden estable (nombres, id; o relevancia si hay
+        búsqueda por texto). `limit` + `cursor` paginan por keyset.
+        """
         pass
     
     @abstractmethod
     def get_product_by_id(self, product_id: str) -> Optional[Product]:
         pass
 
+    @abstractmethod
+    def get_products_by_ids(self, product_ids: List[str]) -> List[Product]:
+        """Varios productos en el orden pedido (los inexistentes se omiten)."""
+        pass
+
+    @abstractmethod
+    def fuzzy_search_products(self, query: str = "", limit: Optional[int] = None,
+                              cursor: Optional[str] = None, with_total: bool = True) -> ProductSearchResult:
+        """Búsqueda tolerante a errores de tipeo, ordenada por similitud."""
+        pass
+
+    @abstractmethod
+    def filter_products(self, filters: Filters, query: str = "", limit: Optional[int] = None,
+                        cursor: Optional[str] = None, with_total: bool = True) -> ProductSearchResult:
+        """
+        Búsqueda + filtros por faceta (ver core.facets), en orden (nombres, id),
+        con conteos por faceta del resultado en `facets`.
+        """
+        pass
+
+    @abstractmethod
+    def suggest_products(self, query: str, limit: int = 8) -> List[Suggestion]:
+        """Autocompletado: productos cuyas palabras empiezan con las de `query`."""
+        pass
+
+    @abstractmethod
+    def iter_search_products(self, query: str = "") -> Iterator[Product]:
+        """Mismo resultado que `search_products` pero como generador (streaming)."""
+        pass
+
+    @abstractmethod
+    def iter_fuzzy_search_products(self, query: str = "") -> Iterator[Product]:
+        """Como `fuzzy_search_products`, pero como generador."""
+        pass
+
+    @abstractmethod
+    def list_collections(self) -> List[Tuple[CollectionDefinition, int]]:
+        """Colecciones curadas con su cantidad de productos."""
+        pass
+
+    @abstractmethod
+    def collection(self, name: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                   with_total: bool = True) -> Optional[ProductSearchResult]:
+        """Página de una colección curada en orden (nombres, id); None si no existe."""
+        pass
+
+    @abstractmethod
+    def iter_collection(self, name: str) -> Iterator[Product]:
+        pass
+
+    @abstractmethod
+    def data_version(self) -> int:
+        """Versión de los datos; cambia cuando cambia el catálogo."""
+        pass
+
+    @abstractmethod
+    def data_token(self) -> str:
+        """Como `data_version`, pero igual en todos los procesos que leen los mismos datos."""
+        pass
+
 class ImageService(ABC):
     """Puerto para servicios de imágenes"""
     
     @abstractmethod
     def get_image_url(self, product_id: str) -> Optional[str]:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def asset_path(self, path: str) -> str:
+        """Ruta pública de un asset (p. ej. con huella de contenido)."""
+        pass
+
+    @abstractmethod
+    def describe_image(self, filename: str) -> Optional[dict]:
+        """Dimensiones, bytes y anchos disponibles (`widths`) de una imagen; None si no existe."""
+        pass
@@ -0,0 +1,49 @@
+import re
+import unicodedata
+
+_WS_RE = re.compile(r"\s+")
+_TOKEN_SPLIT_RE = re.compile(r"[^a-z0-9]+")
+# palabras que no aportan a búsquedas ni facetas ("joyas de plata" -> joyas, plata)
+STOPWORDS = frozenset({"de", "del", "la", "las", "el", "los", "y", "o", "en", "con",
+                       "para", "por", "al", "un", "una"})
+
+def norm(s):
+    """Minúsculas, sin acentos y con espacios colapsados."""
+    if s is None:
+        return ""
+    s = unicodedata.normalize("NFD", str(s))
+    s = "".join(ch for ch in s if unicodedata.category(ch) != "Mn")
+    return _WS_RE.sub(" ", s.lower()).strip()
+
+def tokens_from_category(cat_norm: str):
+    if not cat_norm:
+        return []
+    return [t for t in _TOKEN_SPLIT_RE.split(cat_norm) if t]
+
+def title_case_basic(s: str):
+    if not s:
+        return ""
+    prep = {"de","del","la","las","los","y","o","en","con","para","por","al"}
+    parts = _WS_RE.sub(" ", str(s)).strip().split(" ")
+    out = []
+    for i, w in enumerate(parts):
+        lw = w.lower()
+        out.append(lw if (i > 0 and lw in prep) else lw[:1].upper() + lw[1:])
+    return " ".join(out)
+
+# ========= campos derivados (se materializan al escribir la BD) =========
+DERIVED_COLUMNS = ("categoria_norm", "categoria_tokens", "nombres_display")
+NAME_KEYS = ("nombres", "nombre", "producto", "title", "título")
+
+def derive_product_fields(data: dict) -> dict:
+    """
+    Calcula los campos derivados de una fila de `products`.
+    `categoria_tokens` se guarda como texto separado por espacios.
+    """
+    cat_norm = norm(data.get("categoria"))
+    nombres_raw = next((data.get(k) for k in NAME_KEYS if data.get(k)), None)
+    return {
+        "categoria_norm": cat_norm,
+        "categoria_tokens": " ".join(tokens_from_category(cat_norm)),
+        "nombres_display": title_case_basic(nombres_raw or "Producto"),
+    }
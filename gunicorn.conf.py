@@ -0,0 +1,72 @@
+"""
+Configuración de gunicorn (se carga sola desde el directorio de trabajo):
+
+    gunicorn app:app
+
+Con `preload_app` la app (y su precalentado, ver
+infrastructure/web/lifecycle.py) se arma una vez en el master antes del
+fork: los workers arrancan con índices y payloads ya listos y los
+comparten copy-on-write. PRELOAD=0 vuelve a armar todo en cada worker.
+
+Los payloads que se arman después (búsquedas, páginas, compresión) van al
+cache compartido entre workers (SHARED_CACHE_DIR, en /dev/shm si existe;
+vacío lo desactiva): cada respuesta se arma una vez, no una por worker.
+"""
+import gc
+import os
+import shutil
+
+from infrastructure import instrumentation
+from infrastructure.web import shared_cache
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+timeout = 120
+preload_app = os.environ.get("PRELOAD", "1") != "0"
+
+# host público de las URLs absolutas: sin él el master no precalienta payloads
+# (sus claves de cache no coincidirían con las del tráfico). Render lo expone
+# como RENDER_EXTERNAL_URL.
+if not os.environ.get("PUBLIC_BASE_URL") and os.environ.get("RENDER_EXTERNAL_URL"):
+    os.environ["PUBLIC_BASE_URL"] = os.environ["RENDER_EXTERNAL_URL"]
+
+# antes de cargar la app: la lee create_app() (en el master o en cada worker).
+# Solo se borra al salir el directorio propio, no uno configurado a mano.
+own_shared_cache_dir = None
+if "SHARED_CACHE_DIR" not in os.environ:
+    own_shared_cache_dir = os.environ["SHARED_CACHE_DIR"] = shared_cache.default_directory()
+
+
+def on_starting(server):
+    # el directorio de métricas es de este master (METRICS_DIR o uno con su pid);
+    # si viene configurado puede tener volcados de una corrida anterior
+    instrumentation.metrics.clear_files()
+
+
+def child_exit(server, worker):
+    # lo que contó un worker muerto no se sigue sumando en /metrics
+    instrumentation.metrics.remove_file(worker.pid)
+
+
+def on_exit(server):
+    if own_shared_cache_dir:
+        shutil.rmtree(own_shared_cache_dir, ignore_errors=True)
+    if instrumentation.metrics.owns_directory:
+        shutil.rmtree(instrumentation.metrics.directory, ignore_errors=True)
+
+
+def when_ready(server):
+    if preload_app:
+        # lo armado en el master no vuelve a recorrerlo el GC: menos páginas
+        # tocadas (y copiadas) en los workers
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    lifecycle = server.app.wsgi().extensions.get("lifecycle")
+    if lifecycle is not None:
+        lifecycle.reset_after_fork()
+    else:
+        instrumentation.metrics.reset_after_fork()
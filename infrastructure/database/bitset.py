@@ -0,0 +1,108 @@
+import bisect
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Conjuntos de posiciones como enteros de Python: bit i = posición i.
+# Unión / intersección / conteo (`|`, `&`, `bit_count`) corren en C.
+
+
+def to_bitset(positions: Iterable[int], size: int) -> int:
+    buf = bytearray(size // 8 + 1)
+    for pos in positions:
+        buf[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(buf, "little")
+
+
+def iter_positions(bits: int, start: int = 0) -> Iterator[int]:
+    """Posiciones encendidas >= start, de menor a mayor."""
+    bits >>= start
+    if not bits:
+        return
+    flags = bin(bits)[:1:-1]  # bit 0 primero
+    i = flags.find("1")
+    while i >= 0:
+        yield start + i
+        i = flags.find("1", i + 1)
+
+
+class ScoredMatches:
+    """
+    Resultado ordenado por puntaje: niveles (puntaje, bitset) de mayor a
+    menor sobre posiciones ordenadas por `keys` (nombres, id). Contar es
+    `bit_count` y una página solo lee los bits que devuelve.
+    """
+
+    def __init__(self, keys: Sequence[tuple], levels: List[Tuple[float, int]]):
+        self.keys = keys
+        self.levels = levels
+
+    @property
+    def total(self) -> int:
+        return sum(bits.bit_count() for _, bits in self.levels)
+
+    @property
+    def bits(self) -> int:
+        """Todas las posiciones que cumplen, sin importar el puntaje."""
+        out = 0
+        for _, bits in self.levels:
+            out |= bits
+        return out
+
+    def sort_key(self, pos: int, score: float) -> tuple:
+        # clave de cursor estable entre versiones: (-puntaje, nombres, id)
+        return (-score,) + self.keys[pos]
+
+    def positions(self) -> Iterator[int]:
+        for _, bits in self.levels:
+            yield from iter_positions(bits)
+
+    def page(self, after: Optional[Sequence] = None,
+             limit: Optional[int] = None) -> Tuple[List[Tuple[int, float]], Optional[tuple]]:
+        """
+        (posición, puntaje) en orden (-puntaje, nombres, id) a partir de la
+        clave `after`; devuelve también la clave del último si quedan más.
+        """
+        out: List[Tuple[int, float]] = []
+        for score, bits in self.levels:
+            start = 0
+            if after is not None:
+                if -score < after[0]:
+                    continue
+                if -score == after[0]:
+                    start = bisect.bisect_right(self.keys, tuple(after[1:]))
+            for pos in iter_positions(bits, start):
+                if limit is not None and len(out) >= limit:
+                    return out, self.sort_key(*out[-1])
+                out.append((pos, score))
+        return out, None
+
+
+def merge_levels(levels: Iterable[Tuple[float, int]]) -> List[Tuple[float, int]]:
+    """Une los bitsets de igual puntaje y ordena de mayor a menor."""
+    by_score = {}
+    for score, bits in levels:
+        if bits:
+            score = round(score, 6)
+            by_score[score] = by_score.get(score, 0) | bits
+    return sorted(by_score.items(), key=lambda sb: -sb[0])
+
+
+def best_levels(levels: Dict[float, int]) -> List[Tuple[float, int]]:
+    """Cada posición queda solo en el nivel de mayor puntaje donde aparece."""
+    out, seen = [], 0
+    for score in sorted(levels, reverse=True):
+        bits = levels[score] & ~seen
+        if bits:
+            out.append((score, bits))
+            seen |= bits
+    return out
+
+
+def add_levels(per_term: Sequence[List[Tuple[float, int]]]) -> List[Tuple[float, int]]:
+    """
+    Posiciones presentes en todos los términos, agrupadas por la suma de sus
+    puntajes. Se agrupa en cada paso, así los niveles no crecen sin control.
+    """
+    acc: List[Tuple[float, int]] = [(0.0, -1)]  # -1: todos los bits
+    for levels in per_term:
+        acc = merge_levels((total + score, mask & bits) for total, mask in acc for score, bits in levels)
+    return acc
@@ -0,0 +1,49 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.collections import CollectionDefinition, normalize_fields
+
+# (clave de orden (nombres, id), id) -> mismo orden que los listados SQL
+Member = Tuple[tuple, str]
+
+
+class CollectionMembers:
+    """
+    Miembros precomputados de cada colección para una versión de datos,
+    ya ordenados por (nombres, id). Servir una colección es paginar esta
+    lista y traer la página por id (índice único), sin recorrer la tabla.
+    """
+
+    def __init__(self, version: int, definitions: Sequence[CollectionDefinition],
+                 members: Dict[str, Tuple[Member, ...]]):
+        self.version = version
+        self.definitions = {d.name: d for d in definitions}
+        self._members = members
+
+    def get(self, name: str) -> Optional[Tuple[Member, ...]]:
+        return self._members.get(name)
+
+    def sizes(self) -> Dict[str, int]:
+        return {name: len(m) for name, m in self._members.items()}
+
+
+def build_collection_members(version: int, rows: Iterable[dict], definitions: Sequence[CollectionDefinition],
+                             id_column: str = "id") -> CollectionMembers:
+    """Una sola pasada por las filas evalúa todas las colecciones."""
+    fields = set()
+    for definition in definitions:
+        fields |= definition.fields
+    buckets: Dict[str, List[Member]] = {d.name: [] for d in definitions}
+    for row in rows:
+        pid = str(row.get(id_column) or "").strip()
+        if not pid:
+            continue  # sin id no se puede traer después
+        normalized = normalize_fields(row, fields)
+        key = (str(row.get("nombres") or ""), row.get(id_column))
+        for definition in definitions:
+            if definition.matches(normalized):
+                buckets[definition.name].append((key, pid))
+    return CollectionMembers(
+        version,
+        definitions,
+        {name: tuple(sorted(items, key=lambda m: m[0])) for name, items in buckets.items()},
+    )
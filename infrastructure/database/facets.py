@@ -0,0 +1,100 @@
+import bisect
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from core.facets import FACET_FIELDS, Filters, facet_tokens
+from .bitset import iter_positions, to_bitset
+
+# valores por faceta que se informan en la respuesta (los de más productos)
+MAX_FACET_VALUES = 50
+
+
+class FacetIndex:
+    """
+    Índice invertido por faceta: token normalizado -> bitset de productos.
+    Los productos se identifican por su posición en el orden de listado
+    (nombres, id), así que filtrar es AND/OR de enteros, contar es
+    `bit_count` y una página se lee en orden recorriendo los bits.
+    """
+
+    def __init__(self, version: int, docs: Iterable[Tuple[tuple, str, Mapping[str, Iterable[str]]]],
+                 fields: Sequence[str] = FACET_FIELDS):
+        """`docs`: (clave de orden, id, campo -> tokens) de cada producto."""
+        self.version = version
+        self.fields = tuple(fields)
+        ordered = sorted(docs, key=lambda d: d[0])
+        self.keys: Tuple[tuple, ...] = tuple(d[0] for d in ordered)
+        self.ids: Tuple[str, ...] = tuple(d[1] for d in ordered)
+        self._pos = {pid: pos for pos, pid in enumerate(self.ids)}
+        self.all = (1 << len(self.ids)) - 1
+
+        postings: Dict[str, Dict[str, List[int]]] = {f: {} for f in self.fields}
+        for pos, (_, _, tokens) in enumerate(ordered):
+            for field in self.fields:
+                for token in tokens.get(field) or ():
+                    postings[field].setdefault(token, []).append(pos)
+        n = len(self.ids)
+        self._values: Dict[str, Dict[str, int]] = {
+            f: {token: to_bitset(ps, n) for token, ps in by_token.items()}
+            for f, by_token in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def positions_of(self, product_ids: Iterable[str]) -> int:
+        """Bitset de los ids dados (los desconocidos se ignoran)."""
+        pos = self._pos
+        return to_bitset((pos[p] for p in product_ids if p in pos), len(self.ids))
+
+    def _field_bits(self, field: str, values: Tuple[Tuple[str, ...], ...]) -> int:
+        by_token = self._values.get(field, {})
+        out = 0
+        for tokens in values:
+            bits = self.all
+            for token in tokens:
+                bits &= by_token.get(token, 0)
+            out |= bits
+        return out
+
+    def match(self, filters: Filters, base: Optional[int] = None) -> int:
+        bits = self.all if base is None else base
+        for field, values in filters.items():
+            bits &= self._field_bits(field, values)
+        return bits
+
+    def counts(self, filters: Filters, base: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Conteos por valor de cada faceta sobre el resultado actual. Para la
+        faceta F se ignora el propio filtro de F (como en las tiendas: elegir
+        "oro" no oculta "plata"), el resto de los filtros sí se aplica.
+        """
+        out = {}
+        for field in self.fields:
+            scope = self.match({f: v for f, v in filters.items() if f != field}, base)
+            counts = [(token, (bits & scope).bit_count()) for token, bits in self._values[field].items()]
+            counts = sorted((c for c in counts if c[1]), key=lambda c: (-c[1], c[0]))
+            out[field] = dict(counts[:MAX_FACET_VALUES])
+        return out
+
+    def page(self, bits: int, after: Optional[Sequence] = None,
+             limit: Optional[int] = None) -> Tuple[List[int], Optional[tuple]]:
+        """Posiciones en orden (nombres, id) desde `after`; + clave del último si quedan más."""
+        start = bisect.bisect_right(self.keys, tuple(after)) if after is not None else 0
+        out: List[int] = []
+        for pos in iter_positions(bits, start):
+            if limit is not None and len(out) >= limit:
+                return out, self.keys[out[-1]]
+            out.append(pos)
+        return out, None
+
+
+def build_facet_index(version: int, rows: Iterable[dict], id_column: str = "id",
+                      fields: Sequence[str] = FACET_FIELDS) -> FacetIndex:
+    docs = []
+    for row in rows:
+        pid = str(row.get(id_column) or "").strip()
+        if not pid:
+            continue
+        tokens = {f: facet_tokens(row.get(f)) for f in fields}
+        docs.append(((str(row.get("nombres") or ""), row.get(id_column)), pid, tokens))
+    return FacetIndex(version, docs, fields)
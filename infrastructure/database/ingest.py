@@ -0,0 +1,324 @@
+"""
+Ingesta del catálogo: Excel -> SQLite, con reemplazo atómico de la BD.
+
+    python -m infrastructure.database.ingest catalogo.xlsx [--db data.sqlite]
+        [--images resources/products] [--sheet Hoja1] [--batch-size 500]
+
+    python -m infrastructure.database.ingest --prepare [--db data.sqlite]
+
+Después de importar también se pregeneran las variantes WebP/AVIF de las
+imágenes (`--no-derivatives` lo omite): la app no las genera al responder.
+
+`--prepare` deja lista una BD existente sin reimportarla (campos
+derivados, índice FTS5 y ANALYZE); lo corre el build de la imagen. La app
+no escribe en la BD al arrancar: solo comprueba que esté preparada.
+
+La planilla se lee en modo streaming (openpyxl read_only) y se escribe en
+un archivo temporal junto a la BD: tablas, índices, campos derivados,
+índice FTS5 y ANALYZE. Al final se hace `os.replace` sobre `data.sqlite`;
+los workers en marcha detectan el archivo nuevo (inode distinto) y
+reabren sus conexiones, sin lecturas a medio escribir.
+"""
+import argparse
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from openpyxl import load_workbook
+
+from core.text import DERIVED_COLUMNS, norm
+from .materialize import materialize_derived_fields, materialize_derived_rows
+from .models import DatabaseConfig
+from .schema import quote_ident
+from .search_index import ensure_search_index
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+DEFAULT_DB = BASE_DIR / "data.sqlite"
+DEFAULT_IMAGES = BASE_DIR / "resources" / "products"
+DEFAULT_DERIVATIVES = BASE_DIR / "resources" / "derivatives"
+IMAGES_URL_PREFIX = "/assets/products/"
+# filas omitidas que se detallan en el log (el resto solo cuenta)
+MAX_REPORTED_ROWS = 20
+
+log = logging.getLogger(__name__)
+
+# encabezados que no salen de la regla general (ver column_name)
+HEADER_ALIASES = {
+    "lado 1": "lado1",
+    "lado 2": "lado2",
+    "coleccion/ simbolismo": "categoria",
+    "coleccion / simbolismo": "categoria",
+    "coleccion/simbolismo": "categoria",
+    "nombre": "nombres",
+}
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+def column_name(header) -> Optional[str]:
+    """'Diseño' -> 'disenio', 'Tamaños Disponibles' -> 'tamanios_disponibles'."""
+    if header is None or str(header).strip() == "":
+        return None
+    text = str(header).strip()
+    alias = HEADER_ALIASES.get(norm(text))
+    if alias:
+        return alias
+    text = text.replace("ñ", "ni").replace("Ñ", "ni")
+    slug = _SLUG_RE.sub("_", norm(text)).strip("_")
+    return slug or None
+
+
+def _cell(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip()
+    return text or None
+
+
+def read_rows(xlsx_path: str, sheet: Optional[str] = None) -> Tuple[List[str], Iterator[list]]:
+    """Columnas + iterador de filas (sin cargar la planilla entera)."""
+    wb = load_workbook(xlsx_path, read_only=True, data_only=True)
+    ws = wb[sheet] if sheet else wb.active
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows, None) or ()
+
+    columns: List[str] = []
+    positions: List[int] = []
+    for pos, h in enumerate(header):
+        name = column_name(h)
+        if name and name not in columns:
+            columns.append(name)
+            positions.append(pos)
+
+    def generate():
+        try:
+            for raw in rows:
+                values = [_cell(raw[p]) if p < len(raw) else None for p in positions]
+                if any(v is not None for v in values):
+                    yield values
+        finally:
+            wb.close()
+
+    return columns, generate()
+
+
+def images_by_product(images_dir: Path) -> Dict[str, List[str]]:
+    """'33.png', '33otra.png' -> {'33': ['33.png', '33otra.png']} (principal primero)."""
+    out: Dict[str, List[str]] = {}
+    if not images_dir.is_dir():
+        return out
+    for path in images_dir.glob("*.png"):
+        m = re.match(r"^(\d+)", path.stem)
+        if m:
+            out.setdefault(str(int(m.group(1))), []).append(path.name)
+    for pid, names in out.items():
+        names.sort(key=lambda n: (Path(n).stem != pid, n))
+    return out
+
+
+def _batches(it: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in it:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def build_database(target: str, columns: List[str], rows: Iterable[list],
+                   images: Dict[str, List[str]], config: DatabaseConfig,
+                   batch_size: int = 500) -> int:
+    """Crea la BD completa en `target`. Devuelve cuántos productos escribió."""
+    products = quote_ident(config.products_table)
+    product_images = quote_ident(config.product_images_table)
+    has_id = "id" in columns
+    data_columns = [c for c in columns if c != "id" and c not in DERIVED_COLUMNS]
+    all_columns = ["id"] + data_columns + list(DERIVED_COLUMNS)
+    insert_columns = ["id"] + data_columns
+    id_pos = columns.index("id") if has_id else None
+    data_pos = [columns.index(c) for c in data_columns]
+
+    conn = sqlite3.connect(target)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF;")  # archivo temporal: sin journal
+        conn.execute("PRAGMA synchronous = OFF;")
+        col_defs = ", ".join(
+            f'{quote_ident(c)} {"INTEGER" if c == "id" else "TEXT"}' for c in all_columns
+        )
+        conn.execute(f"CREATE TABLE {products} ({col_defs});")
+        conn.execute(f"""
+            CREATE TABLE {product_images} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                product_id TEXT NOT NULL,
+                path TEXT NOT NULL,
+                position INTEGER NOT NULL DEFAULT 1,
+                is_primary INTEGER NOT NULL DEFAULT 0,
+                original_url TEXT
+            );
+        """)
+
+        insert_product = (
+            f"INSERT INTO {products} ({', '.join(quote_ident(c) for c in insert_columns)}) "
+            f"VALUES ({', '.join('?' for _ in insert_columns)});"
+        )
+        insert_image = (
+            f"INSERT INTO {product_images} (product_id, path, position, is_primary) VALUES (?, ?, ?, ?);"
+        )
+        count = 0
+        seen = set()
+        skipped = 0
+
+        def skip(reason: str):
+            nonlocal skipped
+            skipped += 1
+            if skipped <= MAX_REPORTED_ROWS:
+                log.warning("fila de datos %d omitida: %s", count, reason)
+
+        for batch in _batches(rows, batch_size):
+            product_rows, image_rows = [], []
+            for values in batch:
+                count += 1
+                if has_id:
+                    # sin columna id se numera por fila; con ella, un id malo no se inventa
+                    raw_id = values[id_pos]
+                    try:
+                        pid = int(raw_id)
+                    except (TypeError, ValueError):
+                        skip(f"id vacío o no numérico ({raw_id!r})")
+                        continue
+                else:
+                    pid = count
+                if pid in seen:
+                    skip(f"id {pid} repetido (se conserva la primera fila)")
+                    continue
+                seen.add(pid)
+                product_rows.append([pid] + [values[p] for p in data_pos])
+                for position, name in enumerate(images.get(str(pid), []), start=1):
+                    image_rows.append((str(pid), IMAGES_URL_PREFIX + name, position, int(position == 1)))
+            with conn:
+                conn.executemany(insert_product, product_rows)
+                conn.executemany(insert_image, image_rows)
+        if skipped:
+            log.warning("%d de %d filas omitidas por id inválido o repetido", skipped, count)
+
+        with conn:
+            conn.execute(f"CREATE UNIQUE INDEX idx_products_id ON {products}(id);")
+            conn.execute(
+                f"CREATE INDEX idx_products_listing ON {products}(COALESCE({quote_ident('nombres')}, ''), id);"
+                if "nombres" in data_columns else
+                f"CREATE INDEX idx_products_listing ON {products}(id);"
+            )
+            if "plus" in data_columns:
+                conn.execute(f"CREATE INDEX idx_products_plus ON {products}({quote_ident('plus')} COLLATE NOCASE);")
+            conn.execute(
+                f"CREATE INDEX idx_product_images_product ON {product_images}(product_id, position);"
+            )
+            materialize_derived_rows(conn, config.products_table)
+        conn.execute("PRAGMA journal_mode = DELETE;")
+    finally:
+        conn.close()
+
+    # sin índice FTS5 no se publica la BD (ingest() borra el temporal sin hacer el swap)
+    if not ensure_search_index(DatabaseConfig(db_path=target, products_table=config.products_table,
+                                              product_images_table=config.product_images_table,
+                                              fts_table=config.fts_table)):
+        raise RuntimeError(f"No se pudo crear el índice FTS5 en {target}")
+    conn = sqlite3.connect(target)
+    try:
+        conn.execute("ANALYZE;")
+        conn.commit()
+    finally:
+        conn.close()
+    return len(seen)
+
+
+def prepare_database(db_path: str, config: Optional[DatabaseConfig] = None):
+    """Pasos de build sobre una BD ya cargada (idempotente)."""
+    config = config or DatabaseConfig(db_path=db_path)
+    # primero los derivados: el índice FTS5 cubre todas las columnas
+    if not materialize_derived_fields(config):
+        raise RuntimeError(f"No se pudieron materializar los campos derivados en {db_path}")
+    if not ensure_search_index(config):
+        raise RuntimeError(f"No se pudo crear el índice FTS5 en {db_path}")
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("ANALYZE;")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def swap_database(tmp_path: str, db_path: str):
+    """Reemplazo atómico (mismo filesystem): los lectores ven la BD vieja o la nueva."""
+    fd = os.open(tmp_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, db_path)
+
+
+def ingest(xlsx_path: str, db_path: str = str(DEFAULT_DB), images_dir: str = str(DEFAULT_IMAGES),
+           sheet: Optional[str] = None, batch_size: int = 500) -> int:
+    db_path = str(Path(db_path).resolve())
+    tmp_path = f"{db_path}.ingest-{os.getpid()}.tmp"
+    config = DatabaseConfig(db_path=db_path)
+    columns, rows = read_rows(xlsx_path, sheet)
+    if not columns:
+        raise ValueError(f"La hoja no tiene encabezados: {xlsx_path}")
+    try:
+        count = build_database(tmp_path, columns, rows, images_by_product(Path(images_dir)),
+                               config, batch_size)
+        swap_database(tmp_path, db_path)
+    except BaseException:
+        for leftover in (tmp_path, tmp_path + "-journal"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        raise
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Importa el catálogo de productos desde Excel a SQLite.")
+    parser.add_argument("xlsx", nargs="?", help="planilla .xlsx con una fila de encabezados")
+    parser.add_argument("--prepare", action="store_true",
+                        help="solo preparar la BD existente (sin planilla)")
+    parser.add_argument("--db", default=str(DEFAULT_DB), help="BD destino (se reemplaza atómicamente)")
+    parser.add_argument("--images", default=str(DEFAULT_IMAGES), help="carpeta con <id>.png")
+    parser.add_argument("--sheet", default=None, help="hoja a leer (por defecto, la activa)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--derivatives", default=str(DEFAULT_DERIVATIVES),
+                        help="carpeta de variantes WebP/AVIF a pregenerar")
+    parser.add_argument("--no-derivatives", action="store_true", help="no pregenerar variantes")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    started = time.perf_counter()
+    if args.prepare:
+        prepare_database(str(Path(args.db).resolve()))
+        print(f"{args.db} preparada ({time.perf_counter() - started:.2f}s)")
+        return 0
+    if not args.xlsx:
+        parser.error("falta la planilla (o --prepare)")
+    count = ingest(args.xlsx, args.db, args.images, args.sheet, args.batch_size)
+    print(f"{count} productos importados en {args.db} ({time.perf_counter() - started:.2f}s)")
+    if not args.no_derivatives:
+        # import local: solo la CLI de ingesta toca la capa web
+        from infrastructure.web.image_derivatives import ImageDerivativePipeline
+        started = time.perf_counter()
+        pipeline = ImageDerivativePipeline(args.images, args.derivatives)
+        total = pipeline.generate_all()
+        print(f"{total} imágenes con variantes en {args.derivatives} ({time.perf_counter() - started:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import sqlite3
+from pathlib import Path
+from core.text import DERIVED_COLUMNS, derive_product_fields
+from .models import DatabaseConfig
+from .schema import quote_ident
+
+
+def _ensure_columns(conn, table: str) -> None:
+    existing = {r[1] for r in conn.execute(f"PRAGMA table_info({quote_ident(table)});")}
+    for col in DERIVED_COLUMNS:
+        if col not in existing:
+            conn.execute(f"ALTER TABLE {quote_ident(table)} ADD COLUMN {quote_ident(col)} TEXT;")
+
+
+def _ensure_reset_trigger(conn, table: str) -> None:
+    """
+    Si alguien edita nombres/categoría a mano, los derivados se vacían para
+    que los controladores los recalculen hasta la próxima materialización.
+    """
+    name = quote_ident(f"{table}_derived_au")
+    sets = ", ".join(f"{quote_ident(c)} = NULL" for c in DERIVED_COLUMNS)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {name}
+        AFTER UPDATE OF {quote_ident('nombres')}, {quote_ident('categoria')} ON {quote_ident(table)}
+        BEGIN
+            UPDATE {quote_ident(table)} SET {sets} WHERE rowid = new.rowid;
+        END;
+    """)
+
+
+def materialize_derived_rows(conn, table: str) -> int:
+    """
+    Rellena categoria_norm, categoria_tokens y nombres_display en `conn`.
+    Solo escribe las filas cuyo valor guardado difiere. Devuelve cuántas cambió.
+    """
+    _ensure_columns(conn, table)
+    conn.row_factory = sqlite3.Row
+    updates = []
+    for row in conn.execute(f"SELECT rowid AS _rowid_, * FROM {quote_ident(table)};"):
+        data = dict(row)
+        derived = derive_product_fields(data)
+        if any(data.get(c) != derived[c] for c in DERIVED_COLUMNS):
+            updates.append([derived[c] for c in DERIVED_COLUMNS] + [data["_rowid_"]])
+    if updates:
+        sets = ", ".join(f"{quote_ident(c)} = ?" for c in DERIVED_COLUMNS)
+        conn.executemany(f"UPDATE {quote_ident(table)} SET {sets} WHERE rowid = ?;", updates)
+    _ensure_reset_trigger(conn, table)
+    return len(updates)
+
+
+def materialize_derived_fields(config: DatabaseConfig) -> bool:
+    """
+    Paso de materialización sobre la BD configurada (idempotente: si ya
+    está al día no escribe nada). Devuelve False si no se pudo escribir.
+    Es un paso de build (`ingest --prepare`), no de arranque.
+    """
+    try:
+        conn = sqlite3.connect(config.db_path)
+    except sqlite3.Error:
+        return False
+    try:
+        with conn:
+            materialize_derived_rows(conn, config.products_table)
+        return True
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+
+
+def check_derived_fields(config: DatabaseConfig) -> None:
+    """
+    Arranque de la app: solo comprueba (en solo lectura) que las columnas
+    derivadas existan; si faltan, la BD no pasó por la ingesta / el build.
+    """
+    uri = Path(config.db_path).resolve().as_uri() + "?mode=ro"
+    try:
+        conn = sqlite3.connect(uri, uri=True)
+    except sqlite3.Error as e:
+        raise RuntimeError(f"No se pudo abrir la base de datos {config.db_path}: {e}")
+    try:
+        existing = {r[1] for r in conn.execute(f"PRAGMA table_info({quote_ident(config.products_table)});")}
+    finally:
+        conn.close()
+    missing = [c for c in DERIVED_COLUMNS if c not in existing]
+    if missing:
+        raise RuntimeError(
+            f"Faltan columnas derivadas en {config.db_path}: {', '.join(missing)}. "
+            f"Preparar la BD con: python -m infrastructure.database.ingest --prepare --db {config.db_path}"
+        )
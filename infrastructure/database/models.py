@@ -7,6 +7,20 @@ class DatabaseConfig:
     products_table: str = "products"
     product_images_table: str = "product_images"
     id_candidates: List[str] = None
+    fts_table: str = "products_fts"  # índice FTS5 (unicode61 sin acentos)
+    # pool de conexiones (una por hilo, solo lectura)
+    pool_enabled: bool = True
+    read_only: bool = True
+    pool_max_age: float = 300.0  # segundos antes de reciclar una conexión
+    pool_health_check_interval: float = 30.0
+    mmap_size: int = 64 * 1024 * 1024
+    cache_size: int = -16000  # negativo = KiB (≈16 MB)
+    # snapshot del catálogo en memoria (opcional) y detección de cambios
+    snapshot_enabled: bool = False
+    # /products?q= ordenado por relevancia (índice en memoria); False = bm25 de FTS5
+    # (índice armado por la ingesta / `ingest --prepare`) o LIKE si no existe
+    relevance_enabled: bool = True
+    version_check_interval: float = 1.0
     
     def __post_init__(self):
         if self.id_candidates is None:
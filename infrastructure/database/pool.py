@@ -0,0 +1,177 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+from infrastructure.instrumentation import metrics, span
+from .models import DatabaseConfig
+
+
+def _file_id(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+class _PooledConnection:
+    __slots__ = ("conn", "pid", "created_at", "checked_at", "file_id", "file_checked_at")
+
+    def __init__(self, conn: sqlite3.Connection, pid: int, file_id: Optional[Tuple[int, int]]):
+        now = time.monotonic()
+        self.conn = conn
+        self.pid = pid
+        self.created_at = now
+        self.checked_at = now
+        self.file_id = file_id
+        self.file_checked_at = now
+
+
+class SQLiteConnectionPool:
+    """
+    Pool de conexiones de solo lectura, una por hilo (y por proceso).
+    Pensado para gunicorn gthread: cada hilo reutiliza su conexión, que se
+    comprueba periódicamente y se recicla por antigüedad, tras un fork o
+    cuando `data.sqlite` se reemplaza por otro archivo (ingesta atómica).
+    """
+
+    def __init__(self, config: DatabaseConfig, on_file_change: Optional[Callable[[], None]] = None):
+        self.config = config
+        self._on_file_change = on_file_change
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._inherited = []
+        self._stats: Dict[str, int] = {
+            "opened": 0,
+            "reused": 0,
+            "recycled": 0,
+            "health_check_failures": 0,
+            "fork_resets": 0,
+            "file_swaps": 0,
+        }
+
+    # ---------- API ----------
+    @contextmanager
+    def connection(self):
+        if not self.config.pool_enabled:
+            with span("db_acquire"):
+                conn = self._open()
+            try:
+                yield conn
+            finally:
+                conn.close()
+            return
+
+        with span("db_acquire"):
+            pooled = self._acquire()
+        try:
+            yield pooled.conn
+        except sqlite3.Error:
+            # ante un error de SQLite se fuerza el health check en el próximo uso
+            pooled.checked_at = float("-inf")
+            raise
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self._stats)
+        out["pid"] = os.getpid()
+        out["enabled"] = int(bool(self.config.pool_enabled))
+        return out
+
+    def reset_after_fork(self):
+        """Descarta conexiones heredadas del proceso padre."""
+        inherited = getattr(self._local, "pooled", None)
+        if inherited is not None:
+            # se conserva la referencia para que el GC no la cierre en el hijo
+            self._inherited.append(inherited.conn)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._bump("fork_resets")
+
+    # ---------- internos ----------
+    def _acquire(self) -> _PooledConnection:
+        pid = os.getpid()
+        if pid != self._pid:
+            self.reset_after_fork()
+
+        pooled: Optional[_PooledConnection] = getattr(self._local, "pooled", None)
+        if pooled is not None:
+            now = time.monotonic()
+            if pooled.pid != pid or now - pooled.created_at > self.config.pool_max_age:
+                self._discard(pooled, count_recycle=True)
+                pooled = None
+            elif (now - pooled.file_checked_at > self.config.version_check_interval
+                  and self._file_swapped(pooled, now)):
+                # el archivo fue reemplazado: la conexión sigue leyendo el viejo
+                self._bump("file_swaps")
+                self._discard(pooled, count_recycle=True)
+                pooled = None
+                if self._on_file_change is not None:
+                    self._on_file_change()
+            elif now - pooled.checked_at > self.config.pool_health_check_interval:
+                if self._is_healthy(pooled.conn):
+                    pooled.checked_at = now
+                else:
+                    self._bump("health_check_failures")
+                    self._discard(pooled, count_recycle=True)
+                    pooled = None
+
+        if pooled is None:
+            file_id = _file_id(self.config.db_path)
+            pooled = _PooledConnection(self._open(), pid, file_id)
+            self._local.pooled = pooled
+        else:
+            self._bump("reused")
+        return pooled
+
+    def _open(self) -> sqlite3.Connection:
+        cfg = self.config
+        if cfg.read_only:
+            uri = Path(cfg.db_path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(cfg.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA mmap_size = {int(cfg.mmap_size)};")
+        conn.execute(f"PRAGMA cache_size = {int(cfg.cache_size)};")
+        conn.execute("PRAGMA temp_store = MEMORY;")
+        if cfg.read_only:
+            conn.execute("PRAGMA query_only = ON;")
+        self._bump("opened")
+        return conn
+
+    def _file_swapped(self, pooled: _PooledConnection, now: float) -> bool:
+        pooled.file_checked_at = now
+        return _file_id(self.config.db_path) != pooled.file_id
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1;").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, pooled: _PooledConnection, count_recycle: bool = False):
+        if getattr(self._local, "pooled", None) is pooled:
+            self._local.pooled = None
+        # una conexión heredada por fork no se cierra: pertenece al padre
+        if pooled.pid != os.getpid():
+            self._inherited.append(pooled.conn)
+        else:
+            try:
+                pooled.conn.close()
+            except sqlite3.Error:
+                pass
+        if count_recycle:
+            self._bump("recycled")
+
+    def _bump(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+        # expuesto en /metrics junto al resto de contadores del worker
+        metrics.inc("db_pool_events_total", {"event": key})
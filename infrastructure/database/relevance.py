@@ -0,0 +1,184 @@
+import bisect
+import re
+import itertools
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from core.text import norm
+from .bitset import ScoredMatches, add_levels, best_levels, merge_levels, to_bitset
+
+# clase de cada columna -> peso (el resto de las columnas cuenta como texto largo)
+FIELD_CLASSES = {
+    "nombres": 0, "nombres_display": 0,
+    "categoria": 1, "categoria_norm": 1, "categoria_tokens": 1,
+    "material": 2, "piedra": 2, "piedra_central": 2,
+}
+TEXT_CLASS = 3
+CLASS_WEIGHTS = (8.0, 4.0, 2.0, 1.0)  # nombre > categoría > material/piedra > texto largo
+
+# calidad del match de un término: palabra completa o solo prefijo
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.5
+# las palabras de la consulta aparecen seguidas en un campo (× peso del campo)
+PHRASE_BOOST = 1.0
+# el nombre es la consulta / empieza con la consulta
+NAME_EXACT_BOOST = 8.0
+NAME_START_BOOST = 4.0
+# multiplicador para los marcados BEST SELLER (columna plus)
+BEST_SELLER_BOOST = 1.2
+
+# misma tokenización que el índice FTS5 / snapshot (\w+ sobre texto normalizado)
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(norm(text))
+
+
+class RelevanceIndex:
+    """
+    Ranking por relevancia en memoria. Encuentra lo mismo que la búsqueda
+    FTS5 (cada palabra como prefijo, todas obligatorias) pero ordena por
+    puntaje: por término, el mejor campo donde aparece (peso del campo ×
+    palabra completa / prefijo); más bonus por frase y por nombre, y un
+    multiplicador para BEST SELLER.
+
+    Los postings se guardan por (palabra, clase de campo) y el puntaje se
+    calcula por niveles de bitsets (ver ScoredMatches): no se puntúa cada
+    producto por separado. La frase se resuelve con postings de pares de
+    palabras consecutivas ("oro 18k") dentro de una misma columna: todos
+    los pares de la consulta en la misma clase de campo.
+    """
+
+    def __init__(self, version: int,
+                 docs: Iterable[Tuple[tuple, str, str, Sequence[Sequence[Sequence[str]]], bool]]):
+        """
+        `docs`: (clave de orden, id, nombre normalizado, por clase de campo
+        las palabras normalizadas de cada columna, es best seller).
+        """
+        self.version = version
+        ordered = sorted(docs, key=lambda d: d[0])
+        self.keys: Tuple[tuple, ...] = tuple(d[0] for d in ordered)
+        self.ids: Tuple[str, ...] = tuple(d[1] for d in ordered)
+        n = len(self.ids)
+
+        postings: Dict[str, Dict[int, List[int]]] = {}
+        pairs: Dict[str, Dict[int, List[int]]] = {}
+        for pos, d in enumerate(ordered):
+            for cls, columns in enumerate(d[3]):
+                for word in dict.fromkeys(itertools.chain.from_iterable(columns)):
+                    postings.setdefault(word, {}).setdefault(cls, []).append(pos)
+                # pares por columna: una frase no cruza el límite entre dos columnas
+                column_pairs = (f"{a} {b}" for words in columns for a, b in zip(words, words[1:]))
+                for pair in dict.fromkeys(column_pairs):
+                    pairs.setdefault(pair, {}).setdefault(cls, []).append(pos)
+        self._words: Tuple[str, ...] = tuple(sorted(postings))
+        self._postings = tuple({c: tuple(ps) for c, ps in postings[w].items()} for w in self._words)
+        self._pairs = {p: {c: tuple(ps) for c, ps in by_class.items()} for p, by_class in pairs.items()}
+        self._bitsets: Dict[tuple, int] = {}
+
+        # nombres normalizados ordenados: "empieza con" es un rango (bisect)
+        names = sorted((d[2], pos) for pos, d in enumerate(ordered))
+        self._names = tuple(name for name, _ in names)
+        self._name_pos = tuple(pos for _, pos in names)
+        self._best_sellers = to_bitset((pos for pos, d in enumerate(ordered) if d[4]), n)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _bitset(self, key: tuple, postings: Tuple[int, ...]) -> int:
+        """Postings como bitset; se cachean los frecuentes."""
+        bits = self._bitsets.get(key)
+        if bits is not None:
+            return bits
+        bits = to_bitset(postings, len(self.ids))
+        # solo si el bitset no ocupa más que la tupla de postings
+        if len(postings) * 64 >= len(self.ids):
+            self._bitsets[key] = bits
+        return bits
+
+    def _term_levels(self, term: str) -> List[Tuple[float, int]]:
+        """(puntaje, productos cuyo MEJOR match del término da ese puntaje)."""
+        lo = bisect.bisect_left(self._words, term)
+        hi = bisect.bisect_left(self._words, term + "\uffff", lo)
+        levels: Dict[float, int] = {}
+        for wid in range(lo, hi):
+            quality = EXACT_MATCH if self._words[wid] == term else PREFIX_MATCH
+            for cls in self._postings[wid]:
+                score = CLASS_WEIGHTS[cls] * quality
+                levels[score] = levels.get(score, 0) | self._bitset((wid, cls), self._postings[wid][cls])
+        return best_levels(levels)
+
+    def _names_from(self, lo: int, hi: int) -> int:
+        return to_bitset(self._name_pos[lo:hi], len(self.ids))
+
+    def search(self, query: str) -> ScoredMatches:
+        terms = _words(query)
+        if not terms:
+            return ScoredMatches(self.keys, [])
+        per_term = []
+        for term in dict.fromkeys(terms):
+            levels = self._term_levels(term)
+            if not levels:
+                return ScoredMatches(self.keys, [])
+            per_term.append(levels)
+        levels = add_levels(per_term)
+        if not levels:
+            return ScoredMatches(self.keys, levels)
+        matched = 0
+        for _, bits in levels:
+            matched |= bits
+
+        # nombre == consulta / nombre empieza con la consulta
+        phrase = " ".join(terms)
+        lo = bisect.bisect_left(self._names, phrase)
+        exact_hi = bisect.bisect_right(self._names, phrase, lo)
+        start_hi = bisect.bisect_left(self._names, phrase + "\uffff", exact_hi)
+        boosts = [
+            (self._names_from(lo, exact_hi) & matched, NAME_EXACT_BOOST),
+            (self._names_from(exact_hi, start_hi) & matched, NAME_START_BOOST),
+        ]
+        # frase: todos los pares consecutivos de la consulta en un mismo campo
+        # (el de más peso si hay varios)
+        if len(terms) > 1:
+            seen = 0
+            for cls, weight in enumerate(CLASS_WEIGHTS):
+                bits = matched & ~seen
+                for a, b in zip(terms, terms[1:]):
+                    pair = f"{a} {b}"
+                    bits &= self._bitset((pair, cls), self._pairs.get(pair, {}).get(cls, ()))
+                    if not bits:
+                        break
+                if bits:
+                    boosts.append((bits, weight * PHRASE_BOOST))
+                    seen |= bits
+
+        for boosted, bonus in boosts:
+            if boosted:
+                levels = merge_levels(
+                    [(score, bits & ~boosted) for score, bits in levels]
+                    + [(score + bonus, bits & boosted) for score, bits in levels]
+                )
+        best = self._best_sellers & matched
+        if best:
+            levels = merge_levels(
+                [(score, bits & ~best) for score, bits in levels]
+                + [(score * BEST_SELLER_BOOST, bits & best) for score, bits in levels]
+            )
+        return ScoredMatches(self.keys, levels)
+
+
+def build_relevance_index(version: int, rows: Iterable[dict], id_column: str = "id") -> RelevanceIndex:
+    docs = []
+    for row in rows:
+        pid = str(row.get(id_column) or "").strip()
+        if not pid:
+            continue
+        by_class: List[List[List[str]]] = [[] for _ in CLASS_WEIGHTS]
+        for column, value in row.items():
+            if value is not None:
+                by_class[FIELD_CLASSES.get(column, TEXT_CLASS)].append(_words(value))
+        name = " ".join(_words(row.get("nombres")))
+        best_seller = norm(row.get("plus")) == "best seller"
+        key = (str(row.get("nombres") or ""), row.get(id_column))
+        docs.append((key, pid, name, by_class, best_seller))
+    return RelevanceIndex(version, docs)
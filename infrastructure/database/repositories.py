@@ -1,51 +1,174 @@
-import sqlite3
+import time
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict
-from core.entities import Product, ProductImage, ProductSearchResult
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from core.collections import CollectionDefinition
+from core.facets import FACET_FIELDS, Filters
+from core.entities import Product, ProductImage, ProductSearchResult, Suggestion
+from core.pagination import PaginationError, decode_cursor, encode_cursor, paginate
 from core.ports import ProductRepository
+from infrastructure.instrumentation import span
+from .bitset import ScoredMatches
+from .collections import CollectionMembers, build_collection_members
+from .facets import FacetIndex, build_facet_index
 from .models import DatabaseConfig
+from .pool import SQLiteConnectionPool
+from .relevance import RelevanceIndex, build_relevance_index
+from .schema import SchemaCache, TableSchema, quote_ident
+from .search_index import to_fts_query
+from .snapshot import CatalogSnapshot, CatalogSnapshotStore
+from .suggest import SUGGEST_FIELDS, SuggestIndex, build_suggest_index, primary_images
+from .trigram import TRIGRAM_FIELDS, TrigramIndex, build_trigram_index
+from .watcher import DataVersionWatcher
 
-def quote_ident(s: str) -> str:
-    """Cita un identificador SQLite, escapando comillas dobles."""
-    return '"' + str(s).replace('"', '""') + '"'
+# límite prudente de parámetros por IN (...) (SQLITE_MAX_VARIABLE_NUMBER)
+IN_CHUNK_SIZE = 500
+
+# órdenes paginables -> nº de claves _sortN que expone la fuente SQL
+SORT_WIDTH = {"name": 2, "rank": 3}
+
+# filas por lote al recorrer un listado completo en modo streaming
+STREAM_BATCH_SIZE = 200
 
 class SQLiteProductRepository(ProductRepository):
     """Adaptador para SQLite (solo devuelve imágenes existentes en la BD)."""
 
-    def __init__(self, config: DatabaseConfig):
+    def __init__(self, config: DatabaseConfig, collections: Sequence[CollectionDefinition] = ()):
         self.config = config
+        self.collections = tuple(collections)
         self._verify_database()
+        self._watcher = DataVersionWatcher(config.db_path, config.version_check_interval)
+        # metadatos del esquema: se introspecciona una vez por versión de datos
+        self._schema_cache = SchemaCache(config, self._watcher.version)
+        self._pool = SQLiteConnectionPool(config, on_file_change=self._schema_cache.invalidate)
+        # modo snapshot: todo el catálogo en memoria, reconstruido al cambiar la BD
+        self._snapshots: Optional[CatalogSnapshotStore] = None
+        if config.snapshot_enabled:
+            self._snapshots = CatalogSnapshotStore(self._load_snapshot, self._watcher.version)
+        # miembros de cada colección curada, recalculados al cambiar la versión de datos
+        self._collection_members = CatalogSnapshotStore(self._load_collection_members, self._watcher.version)
+        # índice de trigramas para la búsqueda tolerante a errores (se arma al primer uso)
+        self._trigram_indexes = CatalogSnapshotStore(self._load_trigram_index, self._watcher.version)
+        # ranking por relevancia para /products?q=
+        self._relevance_indexes: Optional[CatalogSnapshotStore] = None
+        if config.relevance_enabled:
+            self._relevance_indexes = CatalogSnapshotStore(self._load_relevance_index, self._watcher.version)
+        # índices invertidos por faceta (categoria, material, piedra)
+        self._facet_indexes = CatalogSnapshotStore(self._load_facet_index, self._watcher.version)
+        # versión en la que relevancia y facetas comparten posiciones (ver _shares_positions)
+        self._aligned_version: Optional[int] = None
+        # índice de prefijos para /products/suggest
+        self._suggest_indexes = CatalogSnapshotStore(self._load_suggest_index, self._watcher.version)
 
     def _verify_database(self):
         if not Path(self.config.db_path).exists():
             raise FileNotFoundError(f"No se encontró la base de datos: {self.config.db_path}")
 
     def _get_connection(self):
-        conn = sqlite3.connect(self.config.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
-
-    def _detect_id_column(self, conn) -> str:
-        table = quote_ident(self.config.products_table)
-        cur = conn.execute(f'PRAGMA table_info({table});')
-        cols = [r["name"] for r in cur.fetchall()]
-        if not cols:
-            return "id"
-        lower_cols = {c.lower(): c for c in cols}
-        for candidate in self.config.id_candidates:
-            if candidate in lower_cols:
-                return lower_cols[candidate]
-        return cols[0]
-
-    def _list_columns(self, conn) -> List[str]:
-        table = quote_ident(self.config.products_table)
-        cur = conn.execute(f'PRAGMA table_info({table});')
-        return [r["name"] for r in cur.fetchall()]
-
-    def _build_like_clause(self, query: str, columns: List[str]) -> Tuple[str, List[str]]:
+        """Conexión del pool para el hilo actual (usar como context manager)."""
+        return self._pool.connection()
+
+    def pool_stats(self) -> Dict[str, int]:
+        return self._pool.stats()
+
+    def reset_after_fork(self):
+        self._pool.reset_after_fork()
+
+    def warm_up(self) -> Dict[str, float]:
+        """
+        Arma ya los índices en memoria de la versión actual (y de paso trae
+        las páginas de SQLite al cache del SO). Con gunicorn --preload corre
+        en el master y los workers los heredan copy-on-write.
+        Devuelve segundos por índice.
+        """
+        stores = {
+            "snapshot": self._snapshots,
+            "collections": self._collection_members,
+            "relevance": self._relevance_indexes,
+            "facets": self._facet_indexes,
+            "suggest": self._suggest_indexes,
+            "trigram": self._trigram_indexes,
+        }
+        out = {}
+        for name, store in stores.items():
+            if store is None:
+                continue
+            started = time.perf_counter()
+            store.get()
+            out[name] = time.perf_counter() - started
+        return out
+
+    def data_version(self) -> int:
+        """Contador que sube cada vez que cambian los datos de la BD."""
+        return self._watcher.version()
+
+    def data_token(self) -> str:
+        """Huella de los datos comparable entre procesos (cache compartido entre workers)."""
+        return self._watcher.token()
+
+    def _load_snapshot(self, version: int) -> CatalogSnapshot:
+        with self._get_connection() as conn:
+            schema = self._schema(conn)
+            if schema.is_empty:
+                return CatalogSnapshot(version, [], schema.id_column)
+            rows = [dict(r) for r in conn.execute(schema.select_sql).fetchall()]
+            return CatalogSnapshot(version, self._load_product_images(conn, rows, schema), schema.id_column)
+
+    def _scan_columns(self, conn, schema: TableSchema, wanted) -> Iterator[dict]:
+        """Recorre la tabla leyendo solo las columnas pedidas que existan (+ id y nombres)."""
+        wanted = set(wanted) | {schema.id_column, "nombres"}
+        columns = [c for c in schema.columns if c in wanted]
+        sql = f"SELECT {', '.join(quote_ident(c) for c in columns)} FROM {quote_ident(self.config.products_table)}"
+        return (dict(r) for r in conn.execute(sql))
+
+    def _load_collection_members(self, version: int) -> CollectionMembers:
+        with self._get_connection() as conn:
+            schema = self._schema(conn)
+            if schema.is_empty or not self.collections:
+                return build_collection_members(version, [], self.collections, schema.id_column)
+            wanted = set()
+            for definition in self.collections:
+                wanted |= definition.fields
+            rows = self._scan_columns(conn, schema, wanted)
+            return build_collection_members(version, rows, self.collections, schema.id_column)
+
+    def _load_trigram_index(self, version: int) -> TrigramIndex:
+        with self._get_connection() as conn:
+            schema = self._schema(conn)
+            if schema.is_empty:
+                return build_trigram_index(version, [], schema.id_column)
+            return build_trigram_index(version, self._scan_columns(conn, schema, TRIGRAM_FIELDS), schema.id_column)
+
+    def _load_relevance_index(self, version: int) -> RelevanceIndex:
+        with self._get_connection() as conn:
+            schema = self._schema(conn)
+            if schema.is_empty:
+                return build_relevance_index(version, [], schema.id_column)
+            rows = (dict(r) for r in conn.execute(schema.select_sql))
+            return build_relevance_index(version, rows, schema.id_column)
+
+    def _load_facet_index(self, version: int) -> FacetIndex:
+        with self._get_connection() as conn:
+            schema = self._schema(conn)
+            if schema.is_empty:
+                return build_facet_index(version, [], schema.id_column)
+            return build_facet_index(version, self._scan_columns(conn, schema, FACET_FIELDS), schema.id_column)
+
+    def _load_suggest_index(self, version: int) -> SuggestIndex:
+        with self._get_connection() as conn:
+            schema = self._schema(conn)
+            if schema.is_empty:
+                return build_suggest_index(version, [], {}, schema.id_column)
+            img_rows = conn.execute(f"{schema.images_sql} ORDER BY product_id, position ASC").fetchall()
+            images = primary_images([self._row_to_image(dict(r)) for r in img_rows])
+            rows = self._scan_columns(conn, schema, SUGGEST_FIELDS)
+            return build_suggest_index(version, rows, images, schema.id_column)
+
+    def _schema(self, conn) -> TableSchema:
+        return self._schema_cache.get(conn)
+
+    def _build_like_clause(self, query: str, schema: TableSchema) -> Tuple[str, List[str]]:
         like = f"%{query}%"
-        parts = [f'{quote_ident(c)} LIKE ?' for c in columns]
-        return "(" + " OR ".join(parts) + ")", [like] * len(columns)
+        return schema.search_where_sql, [like] * len(schema.columns)
 
     def _row_to_product(self, row: dict, images: List[ProductImage], id_column: str) -> Product:
         product_data = dict(row)
@@ -56,63 +179,289 @@ class SQLiteProductRepository(ProductRepository):
             images=images
         )
 
-    def search_products(self, query: str = "") -> ProductSearchResult:
-        conn = self._get_connection()
-        try:
-            id_column = self._detect_id_column(conn)
-            columns = self._list_columns(conn)
-            if not columns:
+    def _fetch_page(self, conn, schema: TableSchema, source_sql: str, params: list, order: str,
+                    limit: Optional[int], cursor: Optional[str], with_total: bool,
+                    count_sql: Optional[str] = None, count_params: Optional[list] = None) -> ProductSearchResult:
+        """
+        Pagina por keyset una fuente SQL que expone columnas _sort0.._sortN.
+        Pide limit+1 filas para saber si hay página siguiente sin contar.
+        """
+        sort_cols = [f"_sort{i}" for i in range(SORT_WIDTH[order])]
+        order_by = ", ".join(sort_cols)
+        sql = f"SELECT * FROM ({source_sql})"
+        page_params = list(params)
+
+        after = decode_cursor(cursor, order)
+        if after is not None:
+            if len(after) != len(sort_cols):
+                raise PaginationError("cursor inválido")
+            sql += f" WHERE ({order_by}) > ({', '.join('?' for _ in sort_cols)})"
+            page_params.extend(after)
+        sql += f" ORDER BY {order_by}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            page_params.append(limit + 1)
+
+        with span("db_query"):
+            rows = [dict(r) for r in conn.execute(sql, page_params).fetchall()]
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(order, [rows[-1][c] for c in sort_cols])
+        for row in rows:
+            for c in sort_cols:
+                row.pop(c, None)
+
+        total = None
+        if with_total:
+            if after is None and next_cursor is None:
+                total = len(rows)  # todo cabe en esta página: no hace falta contar
+            else:
+                with span("db_count"):
+                    total = conn.execute(
+                        count_sql or f"SELECT COUNT(*) FROM ({source_sql})",
+                        params if count_params is None else count_params,
+                    ).fetchone()[0]
+
+        products = self._load_product_images(conn, rows, schema)
+        return ProductSearchResult(total=total, data=products, next_cursor=next_cursor)
+
+    def _page_from_snapshot(self, snapshot: CatalogSnapshot, products: Sequence[Product],
+                            limit: Optional[int], cursor: Optional[str], with_total: bool) -> ProductSearchResult:
+        # listado completo: claves precalculadas en el snapshot
+        keys = snapshot.listing_keys if products is snapshot.listing else None
+        page, last_key = paginate(products, snapshot.sort_key, limit, decode_cursor(cursor, "name"), keys)
+        return ProductSearchResult(
+            total=len(products) if with_total else None,
+            data=page,
+            next_cursor=encode_cursor("name", last_key) if last_key is not None else None,
+        )
+
+    def _search_source(self, query: str, schema: TableSchema) -> Tuple[str, list, str, Optional[str]]:
+        """Fuente SQL de la búsqueda: (sql, params, orden, sql de conteo)."""
+        fts_query = to_fts_query(query) if schema.fts_search_sql else None
+        if fts_query:
+            # índice FTS5: coste proporcional a los matches, ranking bm25
+            return schema.fts_search_sql, [fts_query], "rank", schema.fts_count_sql
+
+        sql = schema.listing_sql
+        params: List[str] = []
+
+        if query.strip():
+            where_clause, where_params = self._build_like_clause(query, schema)
+            sql += f" WHERE {where_clause}"
+            params.extend(where_params)
+
+        # orden estable: nombres, id
+        return sql, params, "name", None
+
+    def _ranked(self, query: str) -> Optional[Tuple[RelevanceIndex, ScoredMatches]]:
+        """Resultado por relevancia (None si no aplica: sin índice o sin texto buscable)."""
+        if self._relevance_indexes is None or not to_fts_query(query):
+            return None
+        with span("relevance"):
+            index = self._relevance_indexes.get()
+            return index, index.search(query)
+
+    def search_products(self, query: str = "", limit: Optional[int] = None,
+                        cursor: Optional[str] = None, with_total: bool = True) -> ProductSearchResult:
+        ranked = self._ranked(query)
+        if ranked is not None:
+            index, matches = ranked
+            after = decode_cursor(cursor, "relevance")
+            try:
+                page, last_key = matches.page(after, limit)
+            except (TypeError, IndexError):
+                raise PaginationError("cursor inválido")
+            return ProductSearchResult(
+                total=matches.total if with_total else None,
+                data=self.get_products_by_ids([index.ids[pos] for pos, _ in page]),
+                next_cursor=encode_cursor("relevance", last_key) if last_key is not None else None,
+            )
+
+        if self._snapshots is not None:
+            with span("snapshot"):
+                snapshot = self._snapshots.get()
+                return self._page_from_snapshot(snapshot, snapshot.search(query), limit, cursor, with_total)
+
+        with self._get_connection() as conn:
+            schema = self._schema(conn)
+            if schema.is_empty:
                 return ProductSearchResult(total=0, data=[])
 
-            table = quote_ident(self.config.products_table)
-            columns_str = ", ".join(quote_ident(c) for c in columns)
-            sql = f"SELECT {columns_str} FROM {table}"
-            params: List[str] = []
+            sql, params, order, count_sql = self._search_source(query, schema)
+            return self._fetch_page(conn, schema, sql, params, order, limit, cursor, with_total,
+                                    count_sql=count_sql)
+
+    def fuzzy_search_products(self, query: str = "", limit: Optional[int] = None,
+                              cursor: Optional[str] = None, with_total: bool = True) -> ProductSearchResult:
+        """
+        Búsqueda tolerante a errores de tipeo ("anilo", "perla" por "perlas",
+        sin tildes) con el índice de trigramas. Orden: similitud, luego
+        (nombres, id).
+        """
+        after = decode_cursor(cursor, "fuzzy")
+        with span("fuzzy"):
+            index = self._trigram_indexes.get()
+            matches = index.search(query)
+            try:
+                page, last_key = matches.page(after, limit)
+            except (TypeError, IndexError):
+                raise PaginationError("cursor inválido")
+        return ProductSearchResult(
+            total=matches.total if with_total else None,
+            data=self.get_products_by_ids([index.ids[pos] for pos, _ in page]),
+            next_cursor=encode_cursor("fuzzy", last_key) if last_key is not None else None,
+        )
+
+    def _shares_positions(self, relevance: RelevanceIndex, facets: FacetIndex) -> bool:
+        """
+        Ambos índices numeran los productos por (nombres, id); si son de la
+        misma versión de datos las posiciones coinciden y los bitsets se
+        cruzan directamente. Se verifica una vez por versión.
+        """
+        if relevance.version != facets.version:
+            return False
+        if self._aligned_version != facets.version:
+            if relevance.ids != facets.ids:
+                return False
+            self._aligned_version = facets.version
+        return True
+
+    def _query_bits(self, query: str, index: FacetIndex) -> int:
+        """Bitset de la búsqueda por texto sobre las posiciones de `index`."""
+        ranked = self._ranked(query)
+        if ranked is not None:
+            relevance, matches = ranked
+            if self._shares_positions(relevance, index):
+                return matches.bits
+            return index.positions_of(relevance.ids[pos] for pos in matches.positions())
+        return index.positions_of(self._matching_ids(query))
 
-            if query.strip():
-                where_clause, where_params = self._build_like_clause(query, columns)
-                sql += f" WHERE {where_clause}"
-                params.extend(where_params)
+    def _matching_ids(self, query: str) -> List[str]:
+        """Ids que cumplen la búsqueda por texto sin índice de relevancia (sin cargar filas completas ni imágenes)."""
+        if self._snapshots is not None:
+            return [p.id for p in self._snapshots.get().search(query)]
+        with self._get_connection() as conn:
+            schema = self._schema(conn)
+            if schema.is_empty:
+                return []
+            sql, params, _, _ = self._search_source(query, schema)
+            with span("db_query"):
+                rows = conn.execute(f"SELECT {quote_ident(schema.id_column)} FROM ({sql})", params).fetchall()
+            return [str(r[0] or "").strip() for r in rows]
 
-            # 👉 aquí agregamos el ORDER BY nombres
-            sql += f" ORDER BY {quote_ident('nombres')} ASC"
+    def filter_products(self, filters: Filters, query: str = "", limit: Optional[int] = None,
+                        cursor: Optional[str] = None, with_total: bool = True) -> ProductSearchResult:
+        """
+        Filtros por faceta resueltos con el índice invertido: la búsqueda por
+        texto (si hay) aporta un bitset más y el resto son intersecciones.
+        Orden (nombres, id), igual que los listados; solo se arman los ids
+        de la página devuelta.
+        """
+        after = decode_cursor(cursor, "name")
+        index = self._facet_indexes.get()
+        base = self._query_bits(query, index) if query.strip() else None
+        with span("facets"):
+            bits = index.match(filters, base)
+            try:
+                page, last_key = index.page(bits, after, limit)
+            except TypeError:
+                raise PaginationError("cursor inválido")
+            facets = index.counts(filters, base)
+        return ProductSearchResult(
+            total=bits.bit_count() if with_total else None,
+            data=self.get_products_by_ids([index.ids[pos] for pos in page]),
+            next_cursor=encode_cursor("name", last_key) if last_key is not None else None,
+            facets=facets,
+        )
 
-            rows = [dict(r) for r in conn.execute(sql, params).fetchall()]
-            products_with_images = self._load_product_images(conn, rows, id_column)
+    def suggest_products(self, query: str, limit: int = 8) -> List[Suggestion]:
+        with span("suggest"):
+            return self._suggest_indexes.get().suggest(query, limit)
 
-            return ProductSearchResult(total=len(products_with_images), data=products_with_images)
+    # ---------- streaming ----------
+    def _iter_source(self, conn, schema: TableSchema, source_sql: str, params: list,
+                     order: str) -> Iterator[Product]:
+        """
+        Recorre la fuente completa con un cursor, de a STREAM_BATCH_SIZE filas
+        (imágenes cargadas por lote): nunca se materializa el resultado entero.
+        """
+        sort_cols = [f"_sort{i}" for i in range(SORT_WIDTH[order])]
+        cur = conn.execute(f"SELECT * FROM ({source_sql}) ORDER BY {', '.join(sort_cols)}", params)
+        try:
+            while True:
+                with span("db_query"):
+                    batch = cur.fetchmany(STREAM_BATCH_SIZE)
+                if not batch:
+                    return
+                rows = [dict(r) for r in batch]
+                for row in rows:
+                    for c in sort_cols:
+                        row.pop(c, None)
+                yield from self._load_product_images(conn, rows, schema)
         finally:
-            conn.close()
+            cur.close()
+
+    def _iter_listing(self, snapshot_list: Callable[[CatalogSnapshot], List[Product]],
+                      source: Callable[[TableSchema], Tuple[str, list, str]]) -> Iterator[Product]:
+        if self._snapshots is not None:
+            yield from snapshot_list(self._snapshots.get())
+            return
+
+        with self._get_connection() as conn:
+            schema = self._schema(conn)
+            if schema.is_empty:
+                return
+            sql, params, order = source(schema)
+            yield from self._iter_source(conn, schema, sql, params, order)
 
+    def _iter_ranked(self, index: RelevanceIndex, matches: ScoredMatches) -> Iterator[Product]:
+        batch = []
+        for pos in matches.positions():
+            batch.append(index.ids[pos])
+            if len(batch) >= STREAM_BATCH_SIZE:
+                yield from self.get_products_by_ids(batch)
+                batch = []
+        if batch:
+            yield from self.get_products_by_ids(batch)
 
-    def _load_product_images(self, conn, rows: List[dict], id_column: str) -> List[Product]:
+    def iter_search_products(self, query: str = "") -> Iterator[Product]:
+        ranked = self._ranked(query)
+        if ranked is not None:
+            return self._iter_ranked(*ranked)
+        return self._iter_listing(
+            lambda snapshot: snapshot.search(query),
+            lambda schema: self._search_source(query, schema)[:3],
+        )
+
+    def iter_fuzzy_search_products(self, query: str = "") -> Iterator[Product]:
+        index = self._trigram_indexes.get()
+        return self._iter_ranked(index, index.search(query))
+
+    def _load_product_images(self, conn, rows: List[dict], schema: TableSchema) -> List[Product]:
         if not rows:
             return []
 
+        id_column = schema.id_column
         # Construye lista de IDs (únicos, no vacíos)
         product_ids = [str(r.get(id_column) or "").strip() for r in rows]
         product_ids = [pid for pid in dict.fromkeys(product_ids) if pid]  # únicos + no vacíos
 
         images_by_product: Dict[str, List[ProductImage]] = {}
-        if product_ids:
-            placeholders = ",".join("?" for _ in product_ids)
-            img_table = quote_ident(self.config.product_images_table)
+        for start in range(0, len(product_ids), IN_CHUNK_SIZE):
+            chunk = product_ids[start:start + IN_CHUNK_SIZE]
+            placeholders = ",".join("?" for _ in chunk)
             images_sql = f"""
-                SELECT product_id, path, position, is_primary, original_url
-                FROM {img_table}
+                {schema.images_sql}
                 WHERE product_id IN ({placeholders})
                 ORDER BY product_id, position ASC
             """
-            for img_row in conn.execute(images_sql, product_ids).fetchall():
-                d = dict(img_row)
-                pid = str(d["product_id"])
-                images_by_product.setdefault(pid, []).append(ProductImage(
-                    product_id=pid,
-                    path=d["path"],
-                    position=int(d["position"]) if d["position"] is not None else 0,
-                    is_primary=bool(d["is_primary"]),
-                    original_url=d.get("original_url")
-                ))
+            with span("db_images"):
+                img_rows = conn.execute(images_sql, chunk).fetchall()
+            for img_row in img_rows:
+                img = self._row_to_image(dict(img_row))
+                images_by_product.setdefault(img.product_id, []).append(img)
 
         products: List[Product] = []
         for row in rows:
@@ -121,99 +470,92 @@ class SQLiteProductRepository(ProductRepository):
             products.append(self._row_to_product(row, images, id_column))
         return products
 
+    def _row_to_image(self, d: dict) -> ProductImage:
+        return ProductImage(
+            product_id=str(d["product_id"]),
+            path=d["path"],
+            position=int(d["position"]) if d["position"] is not None else 0,
+            is_primary=bool(d["is_primary"]),
+            original_url=d.get("original_url")
+        )
+
     def get_product_by_id(self, product_id: str) -> Optional[Product]:
-        conn = self._get_connection()
-        try:
-            id_column = self._detect_id_column(conn)
-            columns = self._list_columns(conn)
-            if not columns:
+        if self._snapshots is not None:
+            return self._snapshots.get().get(product_id)
+
+        with self._get_connection() as conn:
+            schema = self._schema(conn)
+            if schema.is_empty:
                 return None
 
-            table = quote_ident(self.config.products_table)
-            columns_str = ", ".join(quote_ident(c) for c in columns)
-            sql = f"SELECT {columns_str} FROM {table} WHERE {quote_ident(id_column)} = ?"
-            row = conn.execute(sql, [product_id]).fetchone()
+            with span("db_query"):
+                row = conn.execute(schema.select_by_id_sql, [product_id]).fetchone()
             if not row:
                 return None
 
             product_data = dict(row)
-            images = self._get_images_for_product(conn, product_id)
-            return self._row_to_product(product_data, images, id_column)
-        finally:
-            conn.close()
-
-    def _get_images_for_product(self, conn, product_id: str) -> List[ProductImage]:
-        img_table = quote_ident(self.config.product_images_table)
-        sql = f"""
-            SELECT product_id, path, position, is_primary, original_url
-            FROM {img_table}
-            WHERE product_id = ?
-            ORDER BY position ASC
-        """
-        out: List[ProductImage] = []
-        for r in conn.execute(sql, [product_id]).fetchall():
-            d = dict(r)
-            out.append(ProductImage(
-                product_id=str(d["product_id"]),
-                path=d["path"],
-                position=int(d["position"]) if d["position"] is not None else 0,
-                is_primary=bool(d["is_primary"]),
-                original_url=d.get("original_url")
-            ))
-        return out
-    
-    def normal_ring(self) -> List[Product]:
-        """
-        Devuelve los productos cuyo nombre contenga 'anillo'
-        y cuya categoría no contenga 'compromiso'.
-        Incluye imágenes relacionadas.
-        """
-        conn = self._get_connection()
-        try:
-            id_column = self._detect_id_column(conn)
-            columns = self._list_columns(conn)
-            if not columns:
-                return []
+            images = self._get_images_for_product(conn, product_id, schema)
+            return self._row_to_product(product_data, images, schema.id_column)
 
-            table = quote_ident(self.config.products_table)
-            columns_str = ", ".join(quote_ident(c) for c in columns)
-            sql = f"""
-                SELECT {columns_str}
-                FROM {table}
-                WHERE LOWER(nombres) LIKE '%anillo%'
-                AND LOWER(categoria) NOT LIKE '%compromiso%'
-            """
-            rows = [dict(r) for r in conn.execute(sql).fetchall()]
-            return self._load_product_images(conn, rows, id_column)
-        finally:
-            conn.close()
-    
-    def best_sellers(self) -> List[Product]:
+    def get_products_by_ids(self, product_ids: List[str]) -> List[Product]:
         """
-        Devuelve productos marcados como BEST SELLER (case-insensitive),
-        incluyendo sus imágenes.
+        Multi-get: una consulta IN para las filas y otra para las imágenes.
+        Respeta el orden pedido; ids repetidos o inexistentes se omiten.
         """
-        conn = self._get_connection()
-        try:
-            id_column = self._detect_id_column(conn)
-            columns = self._list_columns(conn)
-            if not columns:
+        wanted = [pid for pid in dict.fromkeys(str(p).strip() for p in product_ids) if pid]
+        if not wanted:
+            return []
+        if self._snapshots is not None:
+            snapshot = self._snapshots.get()
+            return [p for p in (snapshot.get(pid) for pid in wanted) if p is not None]
+
+        with self._get_connection() as conn:
+            schema = self._schema(conn)
+            if schema.is_empty:
                 return []
 
-            table = quote_ident(self.config.products_table)
-            columns_str = ", ".join(quote_ident(c) for c in columns)
+            rows_by_id: Dict[str, dict] = {}
+            for start in range(0, len(wanted), IN_CHUNK_SIZE):
+                chunk = wanted[start:start + IN_CHUNK_SIZE]
+                placeholders = ",".join("?" for _ in chunk)
+                sql = f"{schema.select_sql} WHERE {quote_ident(schema.id_column)} IN ({placeholders})"
+                with span("db_query"):
+                    found = conn.execute(sql, chunk).fetchall()
+                for r in found:
+                    row = dict(r)
+                    rows_by_id.setdefault(str(row.get(schema.id_column) or "").strip(), row)
+            rows = [rows_by_id[pid] for pid in wanted if pid in rows_by_id]
+            return self._load_product_images(conn, rows, schema)
 
-            # COLLATE NOCASE para tolerar 'Best Seller', 'best seller', etc.
-            sql = f"""
-                SELECT {columns_str}
-                FROM {table}
-                WHERE {quote_ident('plus')} = 'BEST SELLER' COLLATE NOCASE
-            """
+    def _get_images_for_product(self, conn, product_id: str, schema: TableSchema) -> List[ProductImage]:
+        with span("db_images"):
+            rows = conn.execute(schema.images_by_product_sql, [product_id]).fetchall()
+        return [self._row_to_image(dict(r)) for r in rows]
 
-            rows = [dict(r) for r in conn.execute(sql).fetchall()]
-            return self._load_product_images(conn, rows, id_column)
-        finally:
-            conn.close()
+    # ---------- colecciones curadas ----------
+    def list_collections(self) -> List[Tuple[CollectionDefinition, int]]:
+        """Definiciones con su cantidad de productos (versión de datos actual)."""
+        sizes = self._collection_members.get().sizes()
+        return [(d, sizes.get(d.name, 0)) for d in self.collections]
+
+    def collection(self, name: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                   with_total: bool = True) -> Optional[ProductSearchResult]:
+        """
+        Página de una colección (None si no está definida): keyset sobre la
+        lista precomputada de miembros + multi-get por id de la página.
+        """
+        with span("collection"):
+            members = self._collection_members.get().get(name)
+        if members is None:
+            return None
+        page, last_key = paginate(members, lambda m: m[0], limit, decode_cursor(cursor, "name"))
+        return ProductSearchResult(
+            total=len(members) if with_total else None,
+            data=self.get_products_by_ids([pid for _, pid in page]),
+            next_cursor=encode_cursor("name", last_key) if last_key is not None else None,
+        )
 
-    
-    
\ No newline at end of file
+    def iter_collection(self, name: str) -> Iterator[Product]:
+        members = self._collection_members.get().get(name) or ()
+        for start in range(0, len(members), STREAM_BATCH_SIZE):
+            yield from self.get_products_by_ids([pid for _, pid in members[start:start + STREAM_BATCH_SIZE]])
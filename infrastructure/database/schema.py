@@ -0,0 +1,138 @@
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from .models import DatabaseConfig
+
+
+def quote_ident(s: str) -> str:
+    """Cita un identificador SQLite, escapando comillas dobles."""
+    return '"' + str(s).replace('"', '""') + '"'
+
+
+def content_rowid_column(table_info: List[tuple]) -> str:
+    """
+    Columna que enlaza `products` con su índice FTS: la columna id si es
+    INTEGER (estable ante VACUUM); si no, el rowid implícito.
+    """
+    for _, name, col_type, *_ in table_info:
+        if name.lower() == "id" and (col_type or "").upper() == "INTEGER":
+            return name
+    return "rowid"
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    """Metadatos de `products`/`product_images` y SQL precompilado."""
+    data_version: int  # versión de datos (DataVersionWatcher) con la que se introspeccionó
+    columns: List[str]
+    id_column: str
+    image_columns: List[str]
+    select_sql: str = ""
+    select_by_id_sql: str = ""
+    images_sql: str = ""
+    images_by_product_sql: str = ""
+    search_where_sql: str = ""
+    # fuentes paginables: columnas del producto + claves de orden _sort0.._sortN
+    listing_sql: str = ""  # orden (nombres, id)
+    fts_search_sql: str = ""  # orden (bm25, nombres, id); vacío si no hay FTS5
+    fts_count_sql: str = ""
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.columns
+
+
+class SchemaCache:
+    """
+    Introspecciona el esquema una sola vez y lo reutiliza. Se invalida
+    cuando cambia la versión de datos (`version`: la del DataVersionWatcher,
+    que cubre escrituras, DDL incluido, y reemplazos del archivo con una
+    comprobación cada `version_check_interval`): al responder no hay
+    ningún PRAGMA.
+    """
+
+    def __init__(self, config: DatabaseConfig, version: Callable[[], int]):
+        self.config = config
+        self._version = version
+        self._lock = threading.Lock()
+        self._schema: Optional[TableSchema] = None
+
+    def get(self, conn) -> TableSchema:
+        version = self._version()
+        schema = self._schema
+        if schema is not None and schema.data_version == version:
+            return schema
+        with self._lock:
+            schema = self._schema
+            if schema is None or schema.data_version != version:
+                schema = self._introspect(conn, version)
+                self._schema = schema
+        return schema
+
+    def invalidate(self):
+        with self._lock:
+            self._schema = None
+
+    def _table_info(self, conn, table: str) -> List[tuple]:
+        cur = conn.execute(f"PRAGMA table_info({quote_ident(table)});")
+        return [tuple(r) for r in cur.fetchall()]
+
+    def _table_columns(self, conn, table: str) -> List[str]:
+        return [r[1] for r in self._table_info(conn, table)]
+
+    def _detect_id_column(self, columns: List[str]) -> str:
+        if not columns:
+            return "id"
+        lower_cols = {c.lower(): c for c in columns}
+        for candidate in self.config.id_candidates:
+            if candidate in lower_cols:
+                return lower_cols[candidate]
+        return columns[0]
+
+    def _introspect(self, conn, version: int) -> TableSchema:
+        table_info = self._table_info(conn, self.config.products_table)
+        columns = [r[1] for r in table_info]
+        image_columns = self._table_columns(conn, self.config.product_images_table)
+        id_column = self._detect_id_column(columns)
+        if not columns:
+            return TableSchema(version, [], id_column, image_columns)
+
+        table = quote_ident(self.config.products_table)
+        img_table = quote_ident(self.config.product_images_table)
+        columns_str = ", ".join(quote_ident(c) for c in columns)
+        select_sql = f"SELECT {columns_str} FROM {table}"
+        images_select = (
+            "SELECT product_id, path, position, is_primary, original_url "
+            f"FROM {img_table}"
+        )
+        nombres = quote_ident("nombres")
+        id_ref = quote_ident(id_column)
+        listing_sql = f"SELECT {columns_str}, COALESCE({nombres}, '') AS _sort0, {id_ref} AS _sort1 FROM {table}"
+
+        fts_search_sql = fts_count_sql = ""
+        if self._table_columns(conn, self.config.fts_table) == columns:
+            fts = quote_ident(self.config.fts_table)
+            rowid = content_rowid_column(table_info)
+            rowid_ref = "p.rowid" if rowid == "rowid" else "p." + quote_ident(rowid)
+            p_columns = ", ".join("p." + quote_ident(c) for c in columns)
+            fts_search_sql = (
+                f"SELECT {p_columns}, {fts}.rank AS _sort0, COALESCE(p.{nombres}, '') AS _sort1, "
+                f"p.{id_ref} AS _sort2 "
+                f"FROM {fts} JOIN {table} AS p ON {rowid_ref} = {fts}.rowid WHERE {fts} MATCH ?"
+            )
+            fts_count_sql = f"SELECT COUNT(*) FROM {fts} WHERE {fts} MATCH ?"
+
+        return TableSchema(
+            data_version=version,
+            columns=columns,
+            id_column=id_column,
+            image_columns=image_columns,
+            select_sql=select_sql,
+            select_by_id_sql=f"{select_sql} WHERE {quote_ident(id_column)} = ?",
+            images_sql=images_select,
+            images_by_product_sql=f"{images_select} WHERE product_id = ? ORDER BY position ASC",
+            search_where_sql="(" + " OR ".join(f"{quote_ident(c)} LIKE ?" for c in columns) + ")",
+            listing_sql=listing_sql,
+            fts_search_sql=fts_search_sql,
+            fts_count_sql=fts_count_sql,
+        )
@@ -0,0 +1,93 @@
+import re
+import sqlite3
+from typing import List, Optional
+from .models import DatabaseConfig
+from .schema import content_rowid_column, quote_ident
+
+# unicode61 + remove_diacritics 2 pliega mayúsculas y acentos como norm()
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+FTS_PREFIXES = "2 3 4"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def to_fts_query(query: str) -> Optional[str]:
+    """
+    Convierte el texto del usuario en una expresión MATCH segura:
+    cada palabra se busca como prefijo y todas deben aparecer (AND).
+    Devuelve None si no queda ningún término buscable.
+    """
+    terms = _TOKEN_RE.findall(query or "")
+    if not terms:
+        return None
+    return " ".join('"' + t.replace('"', '""') + '"*' for t in terms)
+
+
+def _columns(conn, table: str) -> List[tuple]:
+    return conn.execute(f"PRAGMA table_info({quote_ident(table)});").fetchall()
+
+
+def ensure_search_index(config: DatabaseConfig) -> bool:
+    """
+    Crea (o recrea si cambió el esquema) la tabla FTS5 de productos y los
+    triggers que la mantienen sincronizada con `products`.
+    Devuelve False si no se pudo (FTS5 no disponible, BD de solo lectura...).
+    """
+    fts = config.fts_table
+    try:
+        conn = sqlite3.connect(config.db_path)
+    except sqlite3.Error:
+        return False
+    try:
+        columns = _columns(conn, config.products_table)
+        if not columns:
+            return False
+        names = [c[1] for c in columns]
+        fts_names = [c[1] for c in _columns(conn, fts)]
+        if fts_names == names:
+            return True
+
+        table = quote_ident(config.products_table)
+        fts_q = quote_ident(fts)
+        rowid = content_rowid_column(columns)
+        cols = ", ".join(quote_ident(n) for n in names)
+        new_cols = ", ".join("new." + quote_ident(n) for n in names)
+        old_cols = ", ".join("old." + quote_ident(n) for n in names)
+        new_rowid = "new." + quote_ident(rowid) if rowid != "rowid" else "new.rowid"
+        old_rowid = "old." + quote_ident(rowid) if rowid != "rowid" else "old.rowid"
+
+        with conn:
+            conn.execute(f"DROP TABLE IF EXISTS {fts_q};")
+            for suffix in ("ai", "ad", "au"):
+                conn.execute(f"DROP TRIGGER IF EXISTS {quote_ident(f'{fts}_{suffix}')};")
+            conn.execute(f"""
+                CREATE VIRTUAL TABLE {fts_q} USING fts5(
+                    {cols},
+                    content={quote_ident(config.products_table)},
+                    content_rowid={quote_ident(rowid)},
+                    tokenize='{FTS_TOKENIZER}',
+                    prefix='{FTS_PREFIXES}'
+                );
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER {quote_ident(fts + '_ai')} AFTER INSERT ON {table} BEGIN
+                    INSERT INTO {fts_q}(rowid, {cols}) VALUES ({new_rowid}, {new_cols});
+                END;
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER {quote_ident(fts + '_ad')} AFTER DELETE ON {table} BEGIN
+                    INSERT INTO {fts_q}({fts_q}, rowid, {cols}) VALUES ('delete', {old_rowid}, {old_cols});
+                END;
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER {quote_ident(fts + '_au')} AFTER UPDATE ON {table} BEGIN
+                    INSERT INTO {fts_q}({fts_q}, rowid, {cols}) VALUES ('delete', {old_rowid}, {old_cols});
+                    INSERT INTO {fts_q}(rowid, {cols}) VALUES ({new_rowid}, {new_cols});
+                END;
+            """)
+            conn.execute(f"INSERT INTO {fts_q}({fts_q}) VALUES ('rebuild');")
+        return True
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
@@ -0,0 +1,109 @@
+import bisect
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from core.entities import Product
+from core.text import norm
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(norm(text))
+
+
+class CatalogSnapshot:
+    """
+    Copia inmutable del catálogo en memoria con índice por id y un
+    vocabulario ordenado para búsquedas por prefijo (misma semántica que
+    el índice FTS5). Las colecciones (categoría, BEST SELLER) tienen sus
+    propios miembros precalculados (ver core.collections) y se leen de
+    aquí por id.
+    """
+
+    def __init__(self, version: int, products: Iterable[Product], id_column: str = "id"):
+        self.version = version
+        self.id_column = id_column
+        # orden natural de la tabla (como un SELECT sin ORDER BY)
+        self.products: Tuple[Product, ...] = tuple(products)
+        n = len(self.products)
+        # orden estable de listados: (nombres, id), igual que en SQL
+        self.sorted_positions: Tuple[int, ...] = tuple(
+            sorted(range(n), key=lambda i: self.sort_key(self.products[i]))
+        )
+        # listado completo ya ordenado + sus claves (keyset con bisect, sin recalcular)
+        self.listing: Tuple[Product, ...] = tuple(self.products[i] for i in self.sorted_positions)
+        self.listing_keys: Tuple[tuple, ...] = tuple(self.sort_key(p) for p in self.listing)
+        self.by_id: Dict[str, int] = {}
+
+        postings: Dict[str, set] = {}
+        for pos, product in enumerate(self.products):
+            self.by_id.setdefault(product.id, pos)
+            for value in product.data.values():
+                if value is None:
+                    continue
+                for word in _words(value):
+                    postings.setdefault(word, set()).add(pos)
+
+        self._vocabulary: List[str] = sorted(postings)
+        self._postings: List[frozenset] = [frozenset(postings[w]) for w in self._vocabulary]
+
+    def sort_key(self, product: Product) -> tuple:
+        # mismo orden que ORDER BY COALESCE(nombres, ''), id
+        return (str(product.data.get("nombres") or ""), product.data.get(self.id_column))
+
+    # ---------- consultas ----------
+    def _positions_for_prefix(self, prefix: str) -> set:
+        out: set = set()
+        i = bisect.bisect_left(self._vocabulary, prefix)
+        vocab = self._vocabulary
+        while i < len(vocab) and vocab[i].startswith(prefix):
+            out |= self._postings[i]
+            i += 1
+        return out
+
+    def search(self, query: str) -> Sequence[Product]:
+        terms = _words(query)
+        if not terms:
+            return self.listing
+        matches: Optional[set] = None
+        for term in terms:
+            found = self._positions_for_prefix(term)
+            matches = found if matches is None else matches & found
+            if not matches:
+                return []
+        return [self.products[i] for i in self.sorted_positions if i in matches]
+
+    def get(self, product_id: str) -> Optional[Product]:
+        pos = self.by_id.get(str(product_id))
+        return self.products[pos] if pos is not None else None
+
+
+class CatalogSnapshotStore:
+    """
+    Mantiene el snapshot vigente y lo reconstruye cuando cambia la versión
+    de datos. La sustitución es atómica: los lectores siempre ven un
+    snapshot completo (el viejo o el nuevo).
+    """
+
+    def __init__(self, loader: Callable[[int], CatalogSnapshot], version: Callable[[], int]):
+        self._loader = loader
+        self._version = version
+        self._lock = threading.Lock()
+        self._snapshot: Optional[CatalogSnapshot] = None
+
+    def get(self) -> CatalogSnapshot:
+        version = self._version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = self._loader(version)
+                self._snapshot = snapshot
+        return snapshot
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
@@ -0,0 +1,115 @@
+import bisect
+import heapq
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.entities import ProductImage, Suggestion
+from core.text import norm, title_case_basic, tokens_from_category
+
+# columnas que alimentan el autocompletado (las que no existan se ignoran)
+SUGGEST_FIELDS = ("nombres", "nombres_display", "categoria", "categoria_tokens", "material")
+# peso según dónde aparece la palabra (menor = mejor)
+NAME_START, NAME_WORD, CATEGORY, MATERIAL = range(4)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+class SuggestIndex:
+    """
+    Índice de prefijos para el autocompletado: vocabulario ordenado
+    (arreglo + bisect) y, por palabra, los productos que la contienen
+    ordenados por (peso, posición en el listado). Un prefijo es un rango
+    contiguo del vocabulario; se mezclan los postings del rango con
+    `heapq.merge` y se corta al llegar a `limit`, sin recorrer el resto.
+    """
+
+    def __init__(self, version: int, docs: Iterable[Tuple[tuple, str, str, Dict[str, int],
+                                                           Optional[ProductImage]]]):
+        """`docs`: (clave de orden, id, nombre presentable, palabra -> peso, imagen)."""
+        self.version = version
+        ordered = sorted(docs, key=lambda d: d[0])
+        self._ids = tuple(d[1] for d in ordered)
+        self._names = tuple(d[2] for d in ordered)
+        self._images = tuple(d[4] for d in ordered)
+        self._doc_words = tuple(tuple(d[3]) for d in ordered)
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for pos, doc in enumerate(ordered):
+            for word, weight in doc[3].items():
+                postings.setdefault(word, []).append((weight, pos))
+        self._words = tuple(sorted(postings))
+        self._postings = tuple(tuple(sorted(postings[w])) for w in self._words)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _word_range(self, prefix: str) -> range:
+        lo = bisect.bisect_left(self._words, prefix)
+        hi = bisect.bisect_left(self._words, prefix + "\uffff", lo)
+        return range(lo, hi)
+
+    def suggest(self, query: str, limit: int = 8) -> List[Suggestion]:
+        """
+        Cada palabra de la consulta es prefijo de alguna palabra del
+        producto; la última (la que se está tipeando) guía la búsqueda.
+        """
+        terms = _WORD_RE.findall(norm(query))
+        if not terms or limit <= 0:
+            return []
+        last, others = terms[-1], terms[:-1]
+        merged = heapq.merge(*(self._postings[i] for i in self._word_range(last)))
+        out: List[Suggestion] = []
+        seen = set()
+        for _, pos in merged:
+            if pos in seen:
+                continue
+            seen.add(pos)
+            words = self._doc_words[pos]
+            if others and not all(any(w.startswith(t) for w in words) for t in others):
+                continue
+            out.append(Suggestion(id=self._ids[pos], name=self._names[pos], image=self._images[pos]))
+            if len(out) >= limit:
+                break
+        return out
+
+
+def _doc_words(row: dict) -> Dict[str, int]:
+    """Palabra -> mejor peso con el que aparece en el producto."""
+    words: Dict[str, int] = {}
+
+    def add(items, weight):
+        for w in items:
+            if weight < words.get(w, weight + 1):
+                words[w] = weight
+
+    name_words = _WORD_RE.findall(norm(row.get("nombres")))
+    add(name_words[:1], NAME_START)
+    add(name_words[1:], NAME_WORD)
+    category = row.get("categoria_tokens")
+    add(category.split() if category else tokens_from_category(norm(row.get("categoria"))), CATEGORY)
+    add(_WORD_RE.findall(norm(row.get("material"))), MATERIAL)
+    return words
+
+
+def build_suggest_index(version: int, rows: Iterable[dict], images: Dict[str, ProductImage],
+                        id_column: str = "id") -> SuggestIndex:
+    """`images`: id -> imagen principal (miniatura)."""
+    docs = []
+    for row in rows:
+        pid = str(row.get(id_column) or "").strip()
+        if not pid:
+            continue
+        name = row.get("nombres_display") or title_case_basic(row.get("nombres") or "Producto")
+        key = (str(row.get("nombres") or ""), row.get(id_column))
+        docs.append((key, row.get(id_column), name, _doc_words(row), images.get(pid)))
+    return SuggestIndex(version, docs)
+
+
+def primary_images(images: Sequence[ProductImage]) -> Dict[str, ProductImage]:
+    """Imagen principal de cada producto (o la de menor posición si no hay)."""
+    out: Dict[str, ProductImage] = {}
+    for img in images:
+        current = out.get(img.product_id)
+        if current is None or (img.is_primary and not current.is_primary):
+            out[img.product_id] = img
+    return out
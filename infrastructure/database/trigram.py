@@ -0,0 +1,126 @@
+import re
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from core.text import STOPWORDS, norm
+from .bitset import ScoredMatches, add_levels, best_levels, merge_levels, to_bitset
+
+# campos indexados para la búsqueda tolerante a errores
+TRIGRAM_FIELDS = ("nombres", "categoria", "material", "piedra", "piedra_central",
+                  "acabado", "estilo", "disenio", "modelo")
+# similitud mínima (Jaccard de trigramas, como pg_trgm) para considerar parecidas dos palabras
+SIMILARITY_THRESHOLD = 0.3
+
+# términos de consulta considerados (las combinaciones crecen con cada uno)
+MAX_TERMS = 5
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def trigrams(word: str) -> Set[str]:
+    """'anillo' -> {'  a', ' an', 'ani', 'nil', 'ill', 'llo', 'lo '} (relleno como pg_trgm)."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def query_terms(query: str) -> List[str]:
+    return [w for w in _WORD_RE.findall(norm(query)) if w not in STOPWORDS]
+
+
+class TrigramIndex:
+    """
+    Índice de trigramas a nivel de palabra sobre texto normalizado (`norm`).
+    El vocabulario es chico comparado con el catálogo: cada término de la
+    consulta se compara contra las palabras que comparten trigramas y solo
+    después se pasa a los productos (postings por palabra).
+
+    Los productos se identifican por su posición en el orden de listado
+    (nombres, id), así el desempate por nombre es comparar enteros.
+    """
+
+    def __init__(self, version: int, docs: Iterable[Tuple[tuple, str, str]]):
+        """`docs`: (clave de orden, id, texto normalizado) de cada producto."""
+        self.version = version
+        ordered = sorted(docs, key=lambda d: d[0])
+        self.keys: Tuple[tuple, ...] = tuple(d[0] for d in ordered)
+        self.ids: Tuple[str, ...] = tuple(d[1] for d in ordered)
+
+        postings: Dict[str, List[int]] = {}
+        for pos, (_, _, text) in enumerate(ordered):
+            for word in dict.fromkeys(_WORD_RE.findall(text)):
+                postings.setdefault(word, []).append(pos)
+        self._words: Tuple[str, ...] = tuple(postings)
+        self._postings: Tuple[Tuple[int, ...], ...] = tuple(tuple(postings[w]) for w in self._words)
+        self._word_grams: Tuple[int, ...] = tuple(len(trigrams(w)) for w in self._words)
+        by_gram: Dict[str, List[int]] = {}
+        for wid, word in enumerate(self._words):
+            for gram in trigrams(word):
+                by_gram.setdefault(gram, []).append(wid)
+        self._by_gram = {g: tuple(ws) for g, ws in by_gram.items()}
+        self._bitsets: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def similar_words(self, term: str, threshold: float = SIMILARITY_THRESHOLD) -> List[Tuple[int, float]]:
+        """(palabra, similitud) del vocabulario, de mayor a menor similitud."""
+        grams = trigrams(term)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for wid in self._by_gram.get(gram, ()):
+                shared[wid] = shared.get(wid, 0) + 1
+        out = []
+        for wid, common in shared.items():
+            sim = common / (len(grams) + self._word_grams[wid] - common)
+            if sim >= threshold:
+                out.append((wid, sim))
+        out.sort(key=lambda ws: -ws[1])
+        return out
+
+    def _bitset(self, wid: int) -> int:
+        """Postings de una palabra como bitset (int); se cachean las palabras frecuentes."""
+        bits = self._bitsets.get(wid)
+        if bits is not None:
+            return bits
+        postings = self._postings[wid]
+        bits = to_bitset(postings, len(self.ids))
+        # solo si el bitset no ocupa más que la tupla de postings
+        if len(postings) * 64 >= len(self.ids):
+            self._bitsets[wid] = bits
+        return bits
+
+    def search(self, query: str, threshold: float = SIMILARITY_THRESHOLD) -> ScoredMatches:
+        """
+        Productos donde cada término de la consulta tiene una palabra
+        parecida; puntaje = similitud media de la mejor palabra por término.
+        Todo se resuelve con bitsets por nivel de puntaje (ver ScoredMatches).
+        """
+        terms = list(dict.fromkeys(query_terms(query)))[:MAX_TERMS]
+        if not terms:
+            return ScoredMatches(self.keys, [])
+        # por término: [(similitud, productos cuya MEJOR palabra tiene esa similitud)]
+        per_term: List[List[Tuple[float, int]]] = []
+        for term in terms:
+            levels: Dict[float, int] = {}
+            for wid, sim in self.similar_words(term, threshold):
+                sim = round(sim, 6)
+                levels[sim] = levels.get(sim, 0) | self._bitset(wid)
+            exclusive = best_levels(levels)
+            if not exclusive:
+                return ScoredMatches(self.keys, [])
+            per_term.append(exclusive)
+
+        # combinaciones de niveles -> puntaje medio; mismos puntajes se unen
+        totals = add_levels(per_term)
+        return ScoredMatches(self.keys, merge_levels((total / len(per_term), bits) for total, bits in totals))
+
+
+def build_trigram_index(version: int, rows: Iterable[dict], id_column: str = "id",
+                        fields: Sequence[str] = TRIGRAM_FIELDS) -> TrigramIndex:
+    docs = []
+    for row in rows:
+        pid = str(row.get(id_column) or "").strip()
+        if not pid:
+            continue
+        text = " ".join(norm(row.get(f)) for f in fields if row.get(f) is not None)
+        docs.append(((str(row.get("nombres") or ""), row.get(id_column)), pid, text))
+    return TrigramIndex(version, docs)
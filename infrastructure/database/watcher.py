@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+class DataVersionWatcher:
+    """
+    Detecta cambios en la BD combinando `PRAGMA data_version` (escrituras de
+    otras conexiones) con la identidad del archivo (inode, mtime, tamaño),
+    que cambia cuando se reemplaza `data.sqlite`.
+
+    `version()` es un contador monótono del proceso: sube cada vez que se
+    detecta un cambio. La comprobación se limita a una cada `check_interval`
+    segundos para no añadir coste fijo a cada petición.
+    """
+
+    def __init__(self, db_path: str, check_interval: float = 1.0):
+        self.db_path = str(db_path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = os.getpid()
+        self._file_id: Optional[Tuple[int, int, int]] = None
+        self._wal_id: Tuple[int, int, int] = (0, 0, 0)
+        self._data_version: Optional[int] = None
+        self._version = 0
+        self._checked_at = float("-inf")
+
+    def version(self) -> int:
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.check()
+        return self._version
+
+    def token(self) -> str:
+        """
+        Huella del archivo, comparable entre procesos. Incluye el -wal: en
+        modo WAL los commits no tocan el archivo principal hasta el checkpoint.
+        """
+        self.version()
+        ino, mtime_ns, size = self._file_id or (0, 0, 0)
+        token = f"{ino:x}-{mtime_ns:x}-{size:x}"
+        if self._wal_id != (0, 0, 0):
+            _, wal_mtime_ns, wal_size = self._wal_id
+            token += f"-{wal_mtime_ns:x}-{wal_size:x}"
+        return token
+
+    def check(self) -> bool:
+        """Comprueba ya (sin esperar al intervalo). Devuelve True si hubo cambio."""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if os.getpid() != self._pid:
+                # tras un fork no se toca la conexión del padre
+                self._conn = None
+                self._pid = os.getpid()
+
+            file_id = self._stat()
+            self._wal_id = self._stat(self.db_path + "-wal")
+            reopened = self._conn is None or file_id != self._file_id
+            if reopened:
+                # archivo nuevo (o primera vez, o tras un fork): conexión nueva para data_version
+                self._reopen()
+            data_version = self._read_data_version()
+
+            # data_version solo es comparable dentro de una misma conexión
+            changed = (
+                self._file_id is not None
+                and (file_id != self._file_id or (not reopened and data_version != self._data_version))
+            )
+            self._file_id = file_id
+            self._data_version = data_version
+            if changed:
+                self._version += 1
+            return changed
+
+    def _stat(self, path: Optional[str] = None) -> Tuple[int, int, int]:
+        try:
+            st = os.stat(path or self.db_path)
+        except OSError:
+            return (0, 0, 0)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _reopen(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
+        try:
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        except sqlite3.Error:
+            self._conn = None
+
+    def _read_data_version(self) -> Optional[int]:
+        if self._conn is None:
+            return None
+        try:
+            return self._conn.execute("PRAGMA data_version;").fetchone()[0]
+        except sqlite3.Error:
+            self._conn = None
+            return None
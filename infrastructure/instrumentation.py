@@ -0,0 +1,278 @@
+"""
+Instrumentación liviana: tiempos por petición (Server-Timing) y métricas
+agregadas en formato Prometheus que funcionan con varios workers.
+
+Cada worker acumula en memoria y vuelca su estado a
+`<METRICS_DIR>/metrics-<pid>.json` (como mucho una vez por segundo y
+siempre antes de responder /metrics); /metrics suma los archivos de
+los workers vivos. El directorio por defecto es propio del proceso que
+crea el registro (el master de gunicorn): dos servidores en la misma
+máquina no se mezclan ni se borran los archivos.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+COUNT_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 10000)
+
+METRIC_HELP = {
+    "http_request_duration_seconds": ("histogram", "Latencia por ruta"),
+    "http_requests_total": ("counter", "Peticiones por ruta y estado"),
+    "http_response_bytes": ("histogram", "Tamaño del cuerpo de respuesta"),
+    "catalog_rows_returned": ("histogram", "Productos proyectados al construir una respuesta (no cuenta aciertos de cache)"),
+    "cache_requests_total": ("counter", "Consultas a caches por resultado (hit/miss)"),
+    "span_duration_seconds": ("histogram", "Duración de cada tramo instrumentado"),
+    "db_pool_events_total": ("counter", "Eventos del pool de conexiones SQLite (aperturas, reusos, reciclados)"),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+# ========= tiempos por petición =========
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def start_request():
+    _timings.set({})
+
+
+def current_timings() -> Dict[str, float]:
+    return _timings.get() or {}
+
+
+@contextmanager
+def span(name: str):
+    """Mide un tramo; los tramos repetidos (p. ej. varias consultas) se suman."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + (time.perf_counter() - started)
+
+
+def server_timing_header(timings: Dict[str, float], total: Optional[float] = None) -> str:
+    parts = [f"{name};dur={secs * 1000:.2f}" for name, secs in timings.items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+# ========= registro de métricas =========
+def default_directory() -> str:
+    return os.path.join(tempfile.gettempdir(), f"apijoyeria-metrics-{os.getpid()}")
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # existe pero es de otro usuario
+    return True
+
+
+class MetricsRegistry:
+    def __init__(self, directory: Optional[str] = None, flush_interval: float = 1.0):
+        configured = directory or os.environ.get("METRICS_DIR")
+        self.directory = configured or default_directory()
+        # solo el directorio propio se borra al salir (ver gunicorn.conf.py)
+        self.owns_directory = not configured
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], dict] = {}
+        self._flushed_at = 0.0
+
+    # ---------- escritura ----------
+    def inc(self, name: str, labels: Optional[dict] = None, value: float = 1.0):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Optional[dict] = None,
+                buckets: Iterable[float] = LATENCY_BUCKETS):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                bounds = list(buckets)
+                hist = {"buckets": bounds, "counts": [0] * len(bounds), "sum": 0.0, "count": 0}
+                self._histograms[key] = hist
+            for i, bound in enumerate(hist["buckets"]):
+                if value <= bound:
+                    hist["counts"][i] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def record_request(self, route: str, status: int, seconds: float, size: Optional[int],
+                       timings: Dict[str, float]):
+        labels = {"route": route}
+        self.inc("http_requests_total", {"route": route, "status": str(status)})
+        self.observe("http_request_duration_seconds", seconds, labels)
+        if size is not None:
+            self.observe("http_response_bytes", size, labels, SIZE_BUCKETS)
+        for name, secs in timings.items():
+            if name.startswith("rows"):
+                continue
+            self.observe("span_duration_seconds", secs, {"route": route, "span": name})
+        if "rows" in timings:
+            self.observe("catalog_rows_returned", timings["rows"], labels, COUNT_BUCKETS)
+        self.maybe_flush()
+
+    # ---------- multi-worker ----------
+    def reset_after_fork(self):
+        """En el worker recién creado: nada heredado del master."""
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._flushed_at = 0.0
+
+    def clear_files(self):
+        """Borra los volcados de workers anteriores (al arrancar el master)."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith("metrics-") and (name.endswith(".json") or name.endswith(".tmp")):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def remove_file(self, pid: int):
+        """Descarta el volcado de un worker que terminó."""
+        for suffix in (".json", ".json.tmp"):
+            try:
+                os.remove(os.path.join(self.directory, f"metrics-{pid}{suffix}"))
+            except OSError:
+                pass
+
+    def _path(self) -> str:
+        return os.path.join(self.directory, f"metrics-{os.getpid()}.json")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": [[n, list(l), v] for (n, l), v in self._counters.items()],
+                "histograms": [[n, list(l), dict(h, counts=list(h["counts"]))]
+                               for (n, l), h in self._histograms.items()],
+            }
+
+    def maybe_flush(self):
+        if time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._flushed_at = time.monotonic()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self._path() + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(self.snapshot(), fh)
+            os.replace(tmp, self._path())
+        except OSError:
+            pass
+
+    def _merged(self) -> Tuple[Dict, Dict]:
+        counters: Dict[Tuple[str, Labels], float] = {}
+        histograms: Dict[Tuple[str, Labels], dict] = {}
+        try:
+            names = [n for n in os.listdir(self.directory) if n.startswith("metrics-") and n.endswith(".json")]
+        except OSError:
+            names = []
+        snapshots = []
+        for name in names:
+            try:
+                pid = int(name[len("metrics-"):-len(".json")])
+            except ValueError:
+                continue
+            if pid != os.getpid() and not _pid_alive(pid):
+                self.remove_file(pid)  # worker muerto (o corrida anterior)
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "r", encoding="utf-8") as fh:
+                    snapshots.append(json.load(fh))
+            except (OSError, ValueError):
+                continue
+        if not names:
+            snapshots.append(self.snapshot())
+        for snap in snapshots:
+            for n, labels, value in snap.get("counters", []):
+                key = (n, tuple(tuple(p) for p in labels))
+                counters[key] = counters.get(key, 0.0) + value
+            for n, labels, hist in snap.get("histograms", []):
+                key = (n, tuple(tuple(p) for p in labels))
+                acc = histograms.get(key)
+                if acc is None or acc["buckets"] != hist["buckets"]:
+                    histograms[key] = dict(hist, counts=list(hist["counts"]))
+                    continue
+                acc["counts"] = [a + b for a, b in zip(acc["counts"], hist["counts"])]
+                acc["sum"] += hist["sum"]
+                acc["count"] += hist["count"]
+        return counters, histograms
+
+    # ---------- exposición ----------
+    def render(self) -> str:
+        """Texto Prometheus con la suma de todos los workers."""
+        self.flush()
+        counters, histograms = self._merged()
+        lines: List[str] = []
+        declared = set()
+
+        def declare(name: str):
+            if name in declared:
+                return
+            declared.add(name)
+            kind, help_text = METRIC_HELP.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            declare(name)
+            lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+        for (name, labels), hist in sorted(histograms.items()):
+            declare(name)
+            for bound, count in zip(hist["buckets"], hist["counts"]):
+                lines.append(f"{name}_bucket{_fmt_labels(labels + (('le', _fmt_value(bound)),))} {count}")
+            lines.append(f"{name}_bucket{_fmt_labels(labels + (('le', '+Inf'),))} {hist['count']}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {_fmt_value(hist['sum'])}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {hist['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _fmt_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _fmt_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(
+        f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for k, v in labels
+    )
+    return "{" + inner + "}"
+
+
+# registro del proceso (uno por worker)
+metrics = MetricsRegistry()
+
+
+def count_rows(n: int):
+    """Anota cuántos productos devuelve la petición en curso."""
+    timings = _timings.get()
+    if timings is not None:
+        timings["rows"] = timings.get("rows", 0) + n
@@ -0,0 +1,93 @@
+import hashlib
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+DIGEST_LENGTH = 12
+_FINGERPRINT_RE = re.compile(r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{%d})(?P<ext>\.[A-Za-z0-9]+)$" % DIGEST_LENGTH)
+
+
+@dataclass(frozen=True)
+class AssetInfo:
+    filename: str
+    digest: str
+    size: int
+    mtime_ns: int
+
+    @property
+    def fingerprinted_name(self) -> str:
+        stem, dot, ext = self.filename.rpartition(".")
+        if not dot:
+            return f"{self.filename}.{self.digest}"
+        return f"{stem}.{self.digest}.{ext}"
+
+
+class AssetManifest:
+    """
+    Manifest en memoria de los archivos servidos: hash de contenido,
+    tamaño y mtime. Se arma al arrancar; con él las URLs llevan huella
+    (`12.<hash>.png`) y se pueden cachear como inmutables.
+    """
+
+    def __init__(self, directory: str, pattern: str = "*.png"):
+        self.directory = Path(directory)
+        self.pattern = pattern
+        self._lock = threading.Lock()
+        self._assets: Dict[str, AssetInfo] = {}
+        self.build()
+
+    def build(self):
+        assets: Dict[str, AssetInfo] = {}
+        for path in sorted(self.directory.glob(self.pattern)):
+            info = self._hash_file(path)
+            if info is not None:
+                assets[path.name] = info
+        with self._lock:
+            self._assets = assets
+
+    def _hash_file(self, path: Path) -> Optional[AssetInfo]:
+        try:
+            st = path.stat()
+            digest = hashlib.sha256()
+            with open(path, "rb") as fh:
+                for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return AssetInfo(path.name, digest.hexdigest()[:DIGEST_LENGTH], st.st_size, st.st_mtime_ns)
+
+    def get(self, filename: str) -> Optional[AssetInfo]:
+        info = self._assets.get(filename)
+        if info is None and Path(filename).name == filename and self.directory.joinpath(filename).match(self.pattern):
+            # archivo agregado después de arrancar: se incorpora al vuelo
+            info = self._hash_file(self.directory / filename)
+            if info is not None:
+                with self._lock:
+                    self._assets[filename] = info
+        return info
+
+    def resolve(self, requested: str) -> Tuple[Optional[AssetInfo], bool]:
+        """
+        Nombre pedido -> (asset, con_huella_vigente). Acepta el nombre plano
+        o el nombre con huella; una huella vieja resuelve al archivo actual
+        pero sin marcarse como inmutable.
+        """
+        info = self._assets.get(requested)
+        if info is not None:
+            return info, False
+        match = _FINGERPRINT_RE.match(requested)
+        if match:
+            info = self.get(match.group("stem") + match.group("ext"))
+            if info is not None:
+                return info, info.digest == match.group("digest")
+        return self.get(requested), False
+
+    def url_path(self, path: str) -> str:
+        """'/assets/products/12.png' -> '/assets/products/12.<hash>.png' si se conoce."""
+        prefix, _, name = (path or "").rpartition("/")
+        info = self._assets.get(name)
+        if info is None:
+            return path
+        return f"{prefix}/{info.fingerprinted_name}" if prefix or path.startswith("/") else info.fingerprinted_name
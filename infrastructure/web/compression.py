@@ -0,0 +1,96 @@
+"""
+Compresión de respuestas (gzip y, si está instalado `brotli`, br)
+negociada con Accept-Encoding.
+
+- JSON cacheado: las variantes comprimidas se guardan junto al payload
+  en el ResponseCache (se comprime una vez por versión de datos).
+- Respuestas en streaming: se comprimen al vuelo, chunk a chunk.
+- Imágenes (PNG/WebP/AVIF) ya vienen comprimidas: no se tocan.
+"""
+import gzip
+import zlib
+from typing import Iterable, Iterator, Optional
+
+try:
+    import brotli
+except ImportError:  # opcional: sin él solo se ofrece gzip
+    brotli = None
+
+# por debajo de esto la cabecera gzip/br no compensa
+MIN_SIZE = 1024
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# en orden de preferencia ante igual calidad
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+GZIP_LEVEL = 6
+# payloads cacheados: se comprimen una sola vez, conviene más calidad
+BROTLI_QUALITY = 8
+BROTLI_STREAM_QUALITY = 4
+
+
+def is_compressible(mimetype: Optional[str]) -> bool:
+    return bool(mimetype) and mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def negotiate(accept_encodings) -> Optional[str]:
+    """Mejor codificación aceptada (`request.accept_encodings`) o None (identity)."""
+    best, best_quality = None, 0
+    for encoding in ENCODINGS:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    # mtime=0: misma entrada -> mismos bytes (ETag estable entre workers)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """Comprime un cuerpo en streaming; cada chunk se vacía para no frenar el envío."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_STREAM_QUALITY)
+        for chunk in chunks:
+            out = compressor.process(chunk) + compressor.flush()
+            if out:
+                yield out
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: formato gzip
+    for chunk in chunks:
+        out = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def compress_response(resp, accept_encodings):
+    """
+    after_request: comprime respuestas que el controlador no comprimió ya
+    (streaming, /metrics, errores grandes). Deja intactas imágenes, 304 y
+    respuestas con Content-Encoding.
+    """
+    if not is_compressible(resp.mimetype) or resp.status_code < 200 or resp.status_code in (204, 304):
+        return resp
+    resp.vary.add("Accept-Encoding")
+    if "Content-Encoding" in resp.headers:
+        return resp
+    encoding = negotiate(accept_encodings)
+    if encoding is None:
+        return resp
+
+    if resp.is_streamed:
+        resp.response = compress_stream(resp.response, encoding)
+        resp.headers.pop("Content-Length", None)
+    else:
+        body = resp.get_data()
+        if len(body) < MIN_SIZE:
+            return resp
+        resp.set_data(compress(body, encoding))
+    resp.headers["Content-Encoding"] = encoding
+    return resp
@@ -1,203 +1,154 @@
 # controllers.py
-from flask import request, abort, current_app
-from urllib.parse import urljoin
+from flask import request, abort, current_app, stream_with_context
+from werkzeug.exceptions import NotFound
+from werkzeug.wsgi import wrap_file
 from core.ports import ImageService
 from application.services import ProductService
-import unicodedata, re, json
-
-# ========= utils =========
-def norm(s):
-    if s is None:
-        return ""
-    s = unicodedata.normalize("NFD", str(s))
-    s = "".join(ch for ch in s if unicodedata.category(ch) != "Mn")
-    return re.sub(r"\s+", " ", s.lower()).strip()
-
-def tokens_from_category(cat_norm: str):
-    if not cat_norm:
-        return []
-    return [t for t in re.split(r"[^a-z0-9]+", cat_norm) if t]
-
-def title_case_basic(s: str):
-    if not s:
-        return ""
-    prep = {"de","del","la","las","los","y","o","en","con","para","por","al"}
-    parts = re.sub(r"\s+", " ", str(s)).strip().split(" ")
-    out = []
-    for i, w in enumerate(parts):
-        lw = w.lower()
-        out.append(lw if (i > 0 and lw in prep) else lw[:1].upper() + lw[1:])
-    return " ".join(out)
-
-# ========= mapeo de encabezados -> claves canónicas (SOLO renombrar keys en el JSON) =========
-KEY_MAP = {
-    "descripcion": "Descripción",
-    "acabado": "Acabado", 
-    "cadena": "Cadena",
-    "cierre": "Cierre",
-    "corte": "Corte",
-    "detalle": "Detalle",
-    "dije": "Dije",
-    "disenio": "Diseño",
-    "estilo": "Estilo",
-    "ideal_para": "Ideal para",
-    "inspiracion": "Inspiración",
-    "lado1": "Lado 1",
-    "lado2": "Lado 2", 
-    "material": "Material",
-    "modelo": "Modelo",
-    "montura": "Montura",
-    "origen": "Origen",
-    "piedra": "Piedra",
-    "piedra_central": "Piedra Central",
-    "piedras": "Piedras",
-    "piezas": "Piezas",
-    "set": "Set",
-    "significado": "Significado",
-    "tamanio": "Tamaño",
-    "tamanios_disponibles": "Tamaños Disponibles",
-    "uso": "Uso",
-    "versatilidad": "Versatilidad",
-    "categoria": "Categoría",
-}
-# soporto variaciones (con/sin acentos, mayúsculas, espacios)
-KEY_MAP_NORM = {norm(k): v for k, v in KEY_MAP.items()}
-
-def remap_keys(item: dict) -> dict:
-    out = {}
-    for k, v in (item or {}).items():
-        nk = norm(k)                 # normalizo para buscar en el mapa
-        canon = KEY_MAP_NORM.get(nk) # si hay mapeo, uso la clave canónica
-        if canon:
-            out[canon] = v
-        else:
-            # si no hay mapeo, conservo la clave ORIGINAL tal cual (sin deformarla)
-            out[k] = v
-    # migración de categoría legacy -> categoria si aún viene con ese nombre
-    if "categoria" not in out:
-        for lk in ("COLECCION/ SIMBOLISMO", "COLECCION / SIMBOLISMO", "coleccion/simbolismo"):
-            if lk in out and out[lk]:
-                out["categoria"] = out[lk]
-                break
-    return out
+from application.single_flight import SingleFlight, SingleFlightTimeout
+from infrastructure.web.response_cache import ResponseCache, CachedPayload
+from infrastructure.web.shared_cache import IDENTITY
+from infrastructure.web import compression
+from core.pagination import PaginationError, parse_limit, cursor_order, MAX_PAGE_SIZE
+from core.text import norm
+from core.facets import FACET_FIELDS, parse_filters
+from infrastructure.instrumentation import metrics, span, count_rows
+import itertools
+import json
+from infrastructure.web.lifecycle import AppLifecycle
+# mapeo de claves y enriquecimiento: motor compartido por todos los endpoints de productos
+from infrastructure.web.projection import ProductProjection, parse_fields, thumbnail_url
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+JSON_MIMETYPE = "application/json; charset=utf-8"
+# bytes acumulados antes de enviar un chunk (el primer producto sale enseguida)
+STREAM_CHUNK_BYTES = 64 * 1024
+# autocompletado: sugerencias por defecto / máximo por petición
+SUGGEST_LIMIT = 8
+SUGGEST_MAX = 20
+# payloads del cache compartido a partir de este tamaño: sendfile desde el
+# archivo (sin copiarlos al proceso); los chicos se copian y listo
+SENDFILE_MIN_BYTES = 64 * 1024
+
+
+def _encode(item) -> bytes:
+    return json.dumps(item, ensure_ascii=False).encode("utf-8")
+
 
 # ========= controlador =========
 class ProductController:
-    def __init__(self, product_service: ProductService, image_service: ImageService):
+    def __init__(self, product_service: ProductService, image_service: ImageService,
+                 response_cache: ResponseCache = None, single_flight: SingleFlight = None,
+                 lifecycle: AppLifecycle = None, public_base_url: str = None):
         self.product_service = product_service
         self.image_service = image_service
+        self.response_cache = response_cache if response_cache is not None else ResponseCache()
+        # misses simultáneos de la misma clave: se enriquece y serializa una sola vez
+        self.single_flight = single_flight if single_flight is not None else SingleFlight()
+        self._projections = {}
+        # estado del arranque para /ping (None: sin precalentado, lista al construirse)
+        self.lifecycle = lifecycle
+        # host público fijo para las URLs absolutas (y la clave de cache); sin él,
+        # el de cada petición
+        self.public_base_url = public_base_url.rstrip("/") + "/" if public_base_url else None
 
-    def search_products(self):
-        try:
-            q = (request.args.get("q") or "").strip()
-            result = self.product_service.search_products(q)
-            base_url = request.url_root
-
-            enriched = []
-            for product in result.data:
-                # 1) copia base de BD y renombra solo las keys necesarias
-                item = remap_keys(dict(product.data or {}))
-
-                # 2) normalización y tokens de categoría (para front)
-                cat_raw = item.get("categoria", "")
-                cat_norm = norm(cat_raw)
-                item["categoria_norm"] = cat_norm
-                item["categoria_tokens"] = tokens_from_category(cat_norm)
-
-                # 3) nombre presentable (no pisa tu 'nombres'); si no existe, usa "Producto"
-                nombres_raw = (
-                    item.get("nombres")
-                    or item.get("nombre")
-                    or item.get("producto")
-                    or item.get("title")
-                    or item.get("título")
+    def _base_url(self) -> str:
+        return self.public_base_url or request.url_root
+
+    # ---------- cache de respuestas + ETag ----------
+    def _cache_key(self, endpoint: str):
+        args = []
+        for k, v in sorted(request.args.items(multi=True)):
+            v = v.strip()
+            if k == "q":
+                v = norm(v)  # la búsqueda ya ignora mayúsculas y acentos
+            elif k == "fields":
+                v = ",".join(sorted(parse_fields(v) or ()))
+            args.append((k, v))
+        # token y no data_version: la clave se comparte entre workers (cache compartido)
+        return (endpoint, tuple(args), self._base_url(), self.product_service.data_token())
+
+    def _json_response(self, entry: CachedPayload, key=None):
+        """
+        200/304 desde un payload cacheado. Si el cliente acepta gzip/br se
+        usa la variante comprimida guardada junto al payload (ETag propio
+        por codificación).
+        """
+        encoding = compression.negotiate(request.accept_encodings)
+        if encoding is not None and len(entry.body) >= compression.MIN_SIZE:
+            etag = f"{entry.etag}.{encoding}"
+        else:
+            encoding, etag = None, entry.etag
+        if request.if_none_match.contains(etag) or request.if_none_match.contains(entry.etag):
+            resp = current_app.response_class(status=304)
+        else:
+            body = entry.body
+            if encoding is not None:
+                with span("compress"):
+                    body = self.single_flight.do(
+                        ("encode", key, encoding),
+                        lambda: self.response_cache.encoded(
+                            key, entry, encoding, lambda raw: compression.compress(raw, encoding)
+                        ),
+                    )
+            resp = self._body_response(entry, encoding or IDENTITY, body)
+            if encoding is not None:
+                resp.headers["Content-Encoding"] = encoding
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.vary.add("Accept")  # con Accept: application/x-ndjson la respuesta es otra
+        resp.vary.add("Accept-Encoding")
+        return resp
+
+    def _body_response(self, entry: CachedPayload, variant: str, body):
+        shared = entry.shared.get(variant)
+        if shared is not None and len(body) >= SENDFILE_MIN_BYTES:
+            fh = shared.open_body()
+            if fh is not None:
+                # wsgi.file_wrapper: gunicorn lo manda con sendfile
+                resp = current_app.response_class(
+                    wrap_file(request.environ, fh),
+                    status=200,
+                    mimetype=entry.mimetype,
+                    direct_passthrough=True,
                 )
-                item["nombres_display"] = title_case_basic(nombres_raw or "Producto")
-
-                # 4) imágenes y URLs absolutas
-                imgs = sorted(getattr(product, "images", []) or [], key=lambda i: (i.position or 0))
-                item["images"] = [
-                    {
-                        "product_id": img.product_id,
-                        "path": img.path,
-                        "position": img.position,
-                        "is_primary": img.is_primary,
-                        "original_url": img.original_url,
-                    }
-                    for img in imgs
-                ]
-                for idx, img in enumerate(imgs, start=1):
-                    key = "image_url" if idx == 1 else f"image_url{idx}"
-                    item[key] = urljoin(base_url, (img.path or "").lstrip("/"))
-
-                enriched.append(item)
-
-            payload = {"total": result.total, "data": enriched}
-            return current_app.response_class(
-                response=json.dumps(payload, ensure_ascii=False),
-                status=200,
+                resp.content_length = len(body)
+                return resp
+        return current_app.response_class(
+            response=bytes(body) if isinstance(body, memoryview) else body,
+            status=200,
+            mimetype=entry.mimetype,
+        )
+
+    def _cached_json(self, endpoint: str, build_payload):
+        """Sirve el JSON desde cache; solo lo construye si cambió la clave."""
+        try:
+            key = self._cache_key(endpoint)
+            with span("cache"):
+                entry = self.response_cache.get(key)
+            metrics.inc("cache_requests_total", {"cache": "responses", "result": "miss" if entry is None else "hit"})
+            if entry is None:
+                entry = self.single_flight.do(key, lambda: self._build_entry(key, build_payload))
+            return self._json_response(entry, key)
+        except SingleFlightTimeout as e:
+            resp = current_app.response_class(
+                response=json.dumps({"error": str(e)}, ensure_ascii=False),
+                status=503,
                 mimetype="application/json; charset=utf-8",
             )
-        except Exception as e:
+            resp.headers["Retry-After"] = "1"
+            return resp
+        except PaginationError as e:
             payload = {"error": str(e)}
             return current_app.response_class(
                 response=json.dumps(payload, ensure_ascii=False),
-                status=500,
+                status=400,
                 mimetype="application/json; charset=utf-8",
             )
-
-    def serve_product_image(self, filename: str):
-        if not filename.lower().endswith(".png"):
-            abort(404)
-        return self.image_service.serve_image_file(filename)
-    
-    def normal_ring(self):
-        try:
-            result = self.product_service.normal_ring()
-            base_url = request.url_root
-
-            enriched = []
-            for product in result:
-                item = remap_keys(dict(product.data or {}))
-
-                # Normalización de categoría
-                cat_raw = item.get("categoria", "")
-                cat_norm = norm(cat_raw)
-                item["categoria_norm"] = cat_norm
-                item["categoria_tokens"] = tokens_from_category(cat_norm)
-
-                # Nombre display
-                nombres_raw = (
-                    item.get("nombres")
-                    or item.get("nombre")
-                    or item.get("producto")
-                    or item.get("title")
-                    or item.get("título")
-                )
-                item["nombres_display"] = title_case_basic(nombres_raw or "Producto")
-
-                # Imágenes
-                imgs = sorted(getattr(product, "images", []) or [], key=lambda i: (i.position or 0))
-                item["images"] = [
-                    {
-                        "product_id": img.product_id,
-                        "path": img.path,
-                        "position": img.position,
-                        "is_primary": img.is_primary,
-                        "original_url": img.original_url,
-                    }
-                    for img in imgs
-                ]
-                for idx, img in enumerate(imgs, start=1):
-                    key = "image_url" if idx == 1 else f"image_url{idx}"
-                    item[key] = urljoin(base_url, (img.path or "").lstrip("/"))
-
-                enriched.append(item)
-
-            payload = {"total": len(enriched), "data": enriched}
+        except NotFound as e:
+            payload = {"error": e.description}
             return current_app.response_class(
                 response=json.dumps(payload, ensure_ascii=False),
-                status=200,
+                status=404,
                 mimetype="application/json; charset=utf-8",
             )
         except Exception as e:
@@ -207,60 +158,274 @@ class ProductController:
                 status=500,
                 mimetype="application/json; charset=utf-8",
             )
-    
-    def best_sellers(self):
+
+    def _build_entry(self, key, build_payload) -> CachedPayload:
+        # otro hilo (u otro worker) pudo haberla construido entre el miss y tomar el turno
+        entry = self.response_cache.peek(key)
+        if entry is not None:
+            return entry
+        with self.response_cache.building(key):
+            entry = self.response_cache.peek(key)
+            if entry is not None:
+                return entry
+            payload = build_payload()
+            with span("serialize"):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            return self.response_cache.put(key, body)
+
+    # ---------- streaming ----------
+    def _stream_format(self):
+        """
+        'ndjson' con `Accept: application/x-ndjson`, 'json' con `?stream=1`,
+        None para la respuesta normal (cacheada). Las páginas (`limit`,
+        `cursor`) ya son acotadas y siempre usan la respuesta normal.
+        """
+        if request.args.get("limit") or request.args.get("cursor") or self._flag("fuzzy"):
+            return None
+        if any(f in request.args for f in FACET_FIELDS) or self._flag("facets"):
+            return None
+        best = request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE])
+        if best == NDJSON_MIMETYPE:
+            return "ndjson"
+        if self._flag("stream"):
+            return "json"
+        return None
+
+    def _stream_response(self, fmt: str, open_products, fallback=None):
+        """
+        Proyecta y serializa producto a producto desde el generador del
+        repositorio. JSON: `{"data": [...], "total": n}` (total al final);
+        NDJSON: un producto por línea. Sin cache ni ETag: el cuerpo no se
+        conoce hasta terminar. Si el generador no trae nada y hay
+        `fallback`, se responde con ése (y `"fuzzy": true` en JSON), como
+        la respuesta normal.
+        """
+        project = self._projection()
+        base_url = self._base_url()
+        fuzzy = False
         try:
-            products = self.product_service.best_sellers()
-            base_url = request.url_root
-
-            enriched = []
-            for product in products:
-                item = remap_keys(dict(product.data or {}))
-
-                # normalización de categoría
-                cat_raw = item.get("categoria", "")
-                cat_norm = norm(cat_raw)
-                item["categoria_norm"] = cat_norm
-                item["categoria_tokens"] = tokens_from_category(cat_norm)
-
-                # nombre presentable
-                nombres_raw = (
-                    item.get("nombres")
-                    or item.get("nombre")
-                    or item.get("producto")
-                    or item.get("title")
-                    or item.get("título")
-                )
-                item["nombres_display"] = title_case_basic(nombres_raw or "Producto")
-
-                # imágenes y URLs absolutas
-                imgs = sorted(getattr(product, "images", []) or [], key=lambda i: (i.position or 0))
-                item["images"] = [
-                    {
-                        "product_id": img.product_id,
-                        "path": img.path,
-                        "position": img.position,
-                        "is_primary": img.is_primary,
-                        "original_url": img.original_url,
-                    }
-                    for img in imgs
-                ]
-                for idx, img in enumerate(imgs, start=1):
-                    key = "image_url" if idx == 1 else f"image_url{idx}"
-                    item[key] = urljoin(base_url, (img.path or "").lstrip("/"))
-
-                enriched.append(item)
-
-            payload = {"total": len(enriched), "data": enriched}
-            return current_app.response_class(
-                response=json.dumps(payload, ensure_ascii=False),
-                status=200,
-                mimetype="application/json; charset=utf-8",
-            )
+            products = iter(open_products())
+            first = next(products, None)  # errores de la consulta -> 500 antes de empezar
+            if first is None and fallback is not None:
+                fuzzy = True
+                products = iter(fallback())
+                first = next(products, None)
         except Exception as e:
-            payload = {"error": str(e)}
             return current_app.response_class(
-                response=json.dumps(payload, ensure_ascii=False),
+                response=json.dumps({"error": str(e)}, ensure_ascii=False),
                 status=500,
-                mimetype="application/json; charset=utf-8",
+                mimetype=JSON_MIMETYPE,
             )
+
+        def generate():
+            ndjson = fmt == "ndjson"
+            buf, size, count = [] if ndjson else [b'{"data":['], 0, 0
+            pending = [first] if first is not None else []
+            for product in itertools.chain(pending, products):
+                encoded = _encode(project(product, base_url))
+                if ndjson:
+                    buf.append(encoded + b"\n")
+                else:
+                    buf.append(b"," + encoded if count else encoded)
+                size += len(encoded)
+                count += 1
+                if count == 1 or size >= STREAM_CHUNK_BYTES:
+                    yield b"".join(buf)
+                    buf, size = [], 0
+            if not ndjson:
+                buf.append(b'],"total":%d%s}' % (count, b',"fuzzy":true' if fuzzy else b""))
+            if buf:
+                yield b"".join(buf)
+
+        resp = current_app.response_class(
+            stream_with_context(generate()),
+            status=200,
+            mimetype=NDJSON_MIMETYPE if fmt == "ndjson" else JSON_MIMETYPE,
+        )
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.headers["X-Accel-Buffering"] = "no"  # que un proxy no lo acumule
+        resp.vary.add("Accept")
+        return resp
+
+    @staticmethod
+    def _flag(name: str) -> bool:
+        return (request.args.get(name) or "").strip().lower() in ("1", "true", "yes")
+
+    # ---------- paginación ----------
+    def _page_args(self) -> dict:
+        """?limit=&cursor=&total=0 -> kwargs para el servicio."""
+        return {
+            "limit": parse_limit(request.args.get("limit")),
+            "cursor": (request.args.get("cursor") or "").strip() or None,
+            "with_total": (request.args.get("total") or "1").strip().lower() not in ("0", "false", "no"),
+        }
+
+    def _projection(self) -> ProductProjection:
+        """Proyección compilada para ?fields= (se reutiliza entre peticiones)."""
+        fields = parse_fields(request.args.get("fields"))
+        projection = self._projections.get(fields)
+        if projection is None:
+            projection = ProductProjection(fields, self.image_service)
+            if len(self._projections) < 128:
+                self._projections[fields] = projection
+        return projection
+
+    def _page_payload(self, result, page_args: dict) -> dict:
+        base_url = self._base_url()
+        project = self._projection()
+        with span("enrich"):
+            data = [project(product, base_url) for product in result.data]
+        count_rows(len(data))
+        payload = {"total": result.total, "data": data}
+        if page_args["limit"] is not None or page_args["cursor"]:
+            payload["next_cursor"] = result.next_cursor
+        return payload
+
+    def _requested_ids(self):
+        """?ids=1,5,9 -> ['1', '5', '9'] (None si no se pidió)."""
+        raw = request.args.get("ids")
+        if raw is None:
+            return None
+        ids = [i.strip() for i in raw.split(",") if i.strip()]
+        if len(ids) > MAX_PAGE_SIZE:
+            raise PaginationError(f"ids admite como máximo {MAX_PAGE_SIZE} productos")
+        return ids
+
+    # ---------- endpoints ----------
+    def ping(self):
+        """Readiness: 200 cuando la app terminó de arrancar (y precalentar); 503 si no."""
+        if self.lifecycle is not None:
+            payload = self.lifecycle.status()
+        else:
+            payload = {"status": "ok", "ready": True, "data_version": self.product_service.data_version()}
+        resp = current_app.response_class(
+            response=json.dumps(payload, ensure_ascii=False),
+            status=200 if payload["ready"] else 503,
+            mimetype=JSON_MIMETYPE,
+        )
+        resp.headers["Cache-Control"] = "no-store"
+        return resp
+
+    def search_products(self):
+        fmt = self._stream_format()
+        if fmt and request.args.get("ids") is None:
+            q = (request.args.get("q") or "").strip()
+            # mismo reintento tolerante a errores de tipeo que la respuesta normal
+            fallback = (lambda: self.product_service.stream_products(q, fuzzy=True)) if q else None
+            return self._stream_response(fmt, lambda: self.product_service.stream_products(q), fallback)
+
+        def build():
+            ids = self._requested_ids()
+            if ids is not None:
+                # multi-get (carrito, favoritos, vistos): en el orden pedido
+                products = self.product_service.get_products(ids)
+                project = self._projection()
+                base_url = self._base_url()
+                with span("enrich"):
+                    data = [project(p, base_url) for p in products]
+                count_rows(len(data))
+                return {"total": len(products), "data": data}
+
+            q = (request.args.get("q") or "").strip()
+            page_args = self._page_args()
+            filters = parse_filters({f: request.args.getlist(f) for f in FACET_FIELDS})
+            if any(f in request.args for f in FACET_FIELDS) or self._flag("facets"):
+                # ?categoria=&material=&piedra= (y/o ?facets=1): índice invertido + conteos
+                result = self.product_service.search_products(q, filters=filters, **page_args)
+                payload = self._page_payload(result, page_args)
+                payload["facets"] = result.facets
+                return payload
+            fuzzy = bool(q) and (self._flag("fuzzy") or cursor_order(page_args["cursor"]) == "fuzzy")
+            result = self.product_service.search_products(q, fuzzy=fuzzy, **page_args)
+            if not fuzzy and q and not page_args["cursor"] and not result.data:
+                # sin coincidencias exactas: se reintenta tolerando errores de tipeo
+                fuzzy = True
+                result = self.product_service.search_products(q, fuzzy=True, **page_args)
+            payload = self._page_payload(result, page_args)
+            if fuzzy:
+                payload["fuzzy"] = True
+            return payload
+
+        return self._cached_json("products", build)
+
+    def suggest(self):
+        """
+        /products/suggest?q=anil&limit=8 -> sugerencias compactas (id, nombre,
+        miniatura) para el buscador; pensado para una petición por tecla.
+        """
+        def build():
+            q = (request.args.get("q") or "").strip()
+            limit = min(parse_limit(request.args.get("limit")) or SUGGEST_LIMIT, SUGGEST_MAX)
+            base_url = self._base_url()
+            suggestions = self.product_service.suggest(q, limit) if q else []
+            # la clave de cache normaliza q: se devuelve la consulta normalizada,
+            # no la de quien llenó la entrada
+            return {"query": norm(q), "data": [
+                {
+                    "id": s.id,
+                    "nombres_display": s.name,
+                    "thumbnail_url": thumbnail_url(s.image, base_url, self.image_service) if s.image else None,
+                }
+                for s in suggestions
+            ]}
+
+        return self._cached_json("suggest", build)
+
+    def get_product(self, product_id: str):
+        def build():
+            product = self.product_service.get_product(product_id)
+            if product is None:
+                raise NotFound("Producto no encontrado")
+            with span("enrich"):
+                item = self._projection()(product, self._base_url())
+            count_rows(1)
+            return {"data": item}
+
+        return self._cached_json(f"product:{product_id}", build)
+
+    def serve_product_image(self, filename: str):
+        if not filename.lower().endswith(".png"):
+            abort(404)
+        # ?w= ancho deseado; formatos que el cliente declara explícitamente en Accept
+        try:
+            width = int(request.args.get("w") or 0) or None
+        except ValueError:
+            width = None
+        accepted = [
+            mt.split("/", 1)[1] for mt, quality in request.accept_mimetypes
+            if quality > 0 and mt.startswith("image/")
+        ]
+        with span("image"):
+            return self.image_service.serve_image_file(filename, width=width, accepted_formats=accepted)
+    
+    def list_collections(self):
+        def build():
+            return {"data": [
+                {"name": d.name, "title": d.title, "total": total}
+                for d, total in self.product_service.list_collections()
+            ]}
+
+        return self._cached_json("collections", build)
+
+    def collection(self, name: str):
+        fmt = self._stream_format()
+        if fmt:
+            if name not in {d.name for d, _ in self.product_service.list_collections()}:
+                abort(404, description="Colección no encontrada")
+            return self._stream_response(fmt, lambda: self.product_service.stream_collection(name))
+
+        def build():
+            page_args = self._page_args()
+            result = self.product_service.collection(name, **page_args)
+            if result is None:
+                raise NotFound("Colección no encontrada")
+            return self._page_payload(result, page_args)
+
+        return self._cached_json(f"collection:{name}", build)
+
+    # colecciones históricas con ruta propia
+    def normal_ring(self):
+        return self.collection("normal-ring")
+
+    def best_sellers(self):
+        return self.collection("best-sellers")
@@ -1,41 +1,140 @@
-from flask import Flask, jsonify, request
+import os
+import time
+
+from flask import Flask, jsonify, request, g
+from werkzeug.exceptions import HTTPException
 from flask_cors import CORS, cross_origin
 from pathlib import Path
 
 from infrastructure.database.repositories import SQLiteProductRepository
 from infrastructure.database.models import DatabaseConfig
+from infrastructure.database.materialize import check_derived_fields
+from core.collections import load_collections
 
 from infrastructure.web.controllers import ProductController
 from infrastructure.web.image_service import LocalImageService
+from infrastructure.web.image_derivatives import ImageDerivativePipeline
+from infrastructure.web.asset_manifest import AssetManifest
+from infrastructure.web.response_cache import ResponseCache
+from infrastructure.web.shared_cache import SharedPayloadStore
+from infrastructure.web.compression import compress_response
+from infrastructure.web.lifecycle import AppLifecycle, WARM_UP_ENVIRON_KEY
+from infrastructure import instrumentation
 
 from application.use_cases import SearchProductsUseCase, GetProductUseCase
 from application.services import ProductService
 
 
-def create_app():
+def create_app(db_path: str = None, products_dir: str = None, derivatives_dir: str = None,
+               collections_path: str = None, warm_up: bool = False, shared_cache_dir: str = None,
+               search_backend: str = None, public_base_url: str = None,
+               catalog_snapshot: bool = None):
+    """
+    Arma la app. Las rutas por defecto son las del repo; se pueden cambiar
+    (benchmarks, catálogos de prueba), también desde gunicorn:
+    `gunicorn 'infrastructure.web.flask_app:create_app(db_path="/tmp/x.sqlite")'`.
+
+    `warm_up=True` arma índices y payloads calientes antes de devolver la
+    app (ver lifecycle.py); con preload_app lo hace el master una sola vez.
+
+    `shared_cache_dir` (o SHARED_CACHE_DIR): payloads compartidos entre
+    workers (ver shared_cache.py); gunicorn.conf.py lo configura.
+
+    `search_backend` (o SEARCH_BACKEND): "relevance" (por defecto, índice
+    en memoria) o "fts" (bm25 del índice FTS5 que arma la ingesta).
+
+    `catalog_snapshot` (o CATALOG_SNAPSHOT=1): catálogo completo en memoria
+    (listados, búsqueda y productos por id sin tocar SQLite); se rearma
+    al cambiar la BD.
+
+    `public_base_url` (o PUBLIC_BASE_URL): host con el que se arman las
+    URLs absolutas en vez del de cada petición; el precalentado de
+    payloads lo necesita para que sus claves coincidan con el tráfico.
+    """
     app = Flask(__name__)
     CORS(app, resources={r"/*": {"origins": "*"}})
 
     # Configuración
     BASE_DIR = Path(__file__).resolve().parent.parent.parent
-    DB_PATH = (BASE_DIR / "data.sqlite").resolve()
-    PRODUCTS_DIR = (BASE_DIR / "resources" / "products").resolve()
+    DB_PATH = Path(db_path or BASE_DIR / "data.sqlite").resolve()
+    PRODUCTS_DIR = Path(products_dir or BASE_DIR / "resources" / "products").resolve()
+    DERIVATIVES_DIR = Path(derivatives_dir or BASE_DIR / "resources" / "derivatives").resolve()
+    COLLECTIONS_PATH = Path(collections_path or BASE_DIR / "resources" / "collections.json").resolve()
 
     # Inyección de dependencias
-    db_config = DatabaseConfig(db_path=str(DB_PATH))
-    product_repository = SQLiteProductRepository(db_config)
+    search_backend = search_backend or os.environ.get("SEARCH_BACKEND") or "relevance"
+    if search_backend not in ("relevance", "fts"):
+        raise ValueError(f"SEARCH_BACKEND desconocido: {search_backend!r} (relevance | fts)")
+    if catalog_snapshot is None:
+        catalog_snapshot = os.environ.get("CATALOG_SNAPSHOT", "0") not in ("0", "")
+    db_config = DatabaseConfig(db_path=str(DB_PATH), relevance_enabled=search_backend == "relevance",
+                               snapshot_enabled=catalog_snapshot)
+    # campos derivados (categoria_norm, tokens, nombre presentable) e índice FTS5
+    # (search_backend="fts") los arma la ingesta / `ingest --prepare` en el build;
+    # la app no escribe en la BD, solo falla si no está preparada
+    check_derived_fields(db_config)
+    # colecciones curadas declaradas en JSON (/products/collections/<name>)
+    product_repository = SQLiteProductRepository(db_config, load_collections(str(COLLECTIONS_PATH)))
 
     # Servicio de imágenes local (solo sirve archivos; las imágenes por producto
     # ya vienen desde el SQLiteProductRepository en cada Product.images)
-    image_service = LocalImageService(str(PRODUCTS_DIR))
+    # + variantes WebP/AVIF por ancho (?w=) negociadas con el header Accept
+    derivatives = ImageDerivativePipeline(str(PRODUCTS_DIR), str(DERIVATIVES_DIR))
+    # manifest de hashes: URLs /assets/products/12.<hash>.png inmutables
+    asset_manifest = AssetManifest(str(PRODUCTS_DIR))
+    image_service = LocalImageService(str(PRODUCTS_DIR), derivatives, asset_manifest)
 
     search_use_case = SearchProductsUseCase(product_repository)
     get_use_case = GetProductUseCase(product_repository)
 
-    # Nota: ahora inyectamos también el repo en ProductService para normal_ring()
+    # el repo también va directo al servicio (colecciones, sugerencias)
     product_service = ProductService(search_use_case, get_use_case, product_repository)
 
-    product_controller = ProductController(product_service, image_service)
+    # cache de JSON serializado (clave: endpoint + query + base URL + versión de datos);
+    # con varios workers, respaldado por archivos mmap compartidos
+    shared_cache_dir = shared_cache_dir or os.environ.get("SHARED_CACHE_DIR")
+    shared_cache = SharedPayloadStore(shared_cache_dir, product_repository.data_token) if shared_cache_dir else None
+    response_cache = ResponseCache(shared=shared_cache)
+    # arranque / readiness (/ping) / reset tras fork (gunicorn.conf.py lo usa vía app.extensions)
+    lifecycle = AppLifecycle(product_repository)
+    app.extensions["lifecycle"] = lifecycle
+    public_base_url = public_base_url or os.environ.get("PUBLIC_BASE_URL")
+    product_controller = ProductController(product_service, image_service, response_cache, lifecycle=lifecycle,
+                                           public_base_url=public_base_url)
+
+    # Tiempos por petición (Server-Timing) + métricas agregadas (/metrics)
+    @app.before_request
+    def start_timing():
+        g.request_started = time.perf_counter()
+        instrumentation.start_request()
+
+    @app.after_request
+    def record_timing(resp):
+        started = g.pop("request_started", None)
+        if started is None:
+            return resp
+        elapsed = time.perf_counter() - started
+        timings = instrumentation.current_timings()
+        resp.headers["Server-Timing"] = instrumentation.server_timing_header(
+            {k: v for k, v in timings.items() if k != "rows"}, elapsed
+        )
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        if route != "/metrics" and not request.environ.get(WARM_UP_ENVIRON_KEY):
+            size = None if resp.is_streamed else resp.calculate_content_length()
+            instrumentation.metrics.record_request(route, resp.status_code, elapsed, size, timings)
+        return resp
+
+    # gzip/br para lo que el controlador no comprimió (streaming, /metrics, errores)
+    @app.after_request
+    def compress(resp):
+        return compress_response(resp, request.accept_encodings)
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        return app.response_class(
+            instrumentation.metrics.render(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
 
     # Rutas
     @app.route("/ping", methods=["GET", "OPTIONS"])
@@ -52,10 +151,38 @@ def create_app():
             return ("", 204)
         return product_controller.search_products()
 
+    @app.route("/products/suggest", methods=["GET", "OPTIONS"])
+    @cross_origin(origins="*")
+    def suggest():
+        if request.method == "OPTIONS":
+            return ("", 204)
+        return product_controller.suggest()
+
+    @app.route("/products/<product_id>", methods=["GET", "OPTIONS"])
+    @cross_origin(origins="*")
+    def product_detail(product_id: str):
+        if request.method == "OPTIONS":
+            return ("", 204)
+        return product_controller.get_product(product_id)
+
     @app.route("/assets/products/<path:filename>", methods=["GET"])
     def product_image(filename: str):
         return product_controller.serve_product_image(filename)
 
+    @app.route("/products/collections", methods=["GET", "OPTIONS"])
+    @cross_origin(origins="*")
+    def collections():
+        if request.method == "OPTIONS":
+            return ("", 204)
+        return product_controller.list_collections()
+
+    @app.route("/products/collections/<name>", methods=["GET", "OPTIONS"])
+    @cross_origin(origins="*")
+    def collection(name: str):
+        if request.method == "OPTIONS":
+            return ("", 204)
+        return product_controller.collection(name)
+
     @app.route("/products/normal-ring", methods=["GET", "OPTIONS"])
     @cross_origin(origins="*")
     def normal_ring():
@@ -73,6 +200,9 @@ def create_app():
     # Manejo de errores
     @app.errorhandler(Exception)
     def handle_any_error(e):
+        if isinstance(e, HTTPException):
+            # 404 de imágenes inexistentes, 405, etc.: se respeta su código
+            return jsonify({"error": e.description}), e.code
         return jsonify({"error": str(e)}), 500
 
     # CORS headers
@@ -84,6 +214,10 @@ def create_app():
         resp.headers.setdefault("Access-Control-Max-Age", "86400")
         return resp
 
+    if warm_up:
+        lifecycle.warm_up(app, public_base_url)
+    else:
+        lifecycle.mark_ready()
     return app
 
 
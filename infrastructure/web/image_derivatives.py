@@ -0,0 +1,339 @@
+import contextlib
+import json
+import logging
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from PIL import Image
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin lock entre procesos, solo entre hilos
+    fcntl = None
+
+# anchos pregenerados (no se amplía: se omiten los mayores que el original)
+DEFAULT_WIDTHS = (320, 640, 1024, 1600)
+MANIFEST_NAME = "manifest.json"
+
+MIMETYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "png": "image/png",
+}
+SAVE_OPTIONS = {
+    "avif": {"quality": 55},
+    "webp": {"quality": 80, "method": 6},
+}
+
+log = logging.getLogger(__name__)
+
+
+def available_formats() -> Tuple[str, ...]:
+    """Formatos derivados que este Pillow puede escribir, en orden de preferencia."""
+    extensions = Image.registered_extensions()
+    out = []
+    if ".avif" in extensions:
+        out.append("avif")
+    if ".webp" in extensions:
+        out.append("webp")
+    return tuple(out)
+
+
+class ImageDerivativePipeline:
+    """
+    Genera variantes redimensionadas (WebP y AVIF si está disponible) de
+    las imágenes de productos en un directorio de cache, con un manifest
+    JSON. Se pregenera todo en el build (Dockerfile) y tras la ingesta:
+
+        python -m infrastructure.web.image_derivatives
+
+    Al responder nunca se genera ni se toca el disco: qué imágenes tienen
+    variantes al día se comprueba al arrancar (`build_metadata`) y cuando
+    se generan. Si faltan se sirve el original y la generación se encola
+    en un hilo de fondo. Entre procesos la generación de cada imagen se
+    serializa con un lock de archivo.
+    """
+
+    def __init__(self, source_dir: str, cache_dir: str, widths: Iterable[int] = DEFAULT_WIDTHS,
+                 formats: Optional[Iterable[str]] = None):
+        self.source_dir = Path(source_dir)
+        self.cache_dir = Path(cache_dir)
+        self.widths = tuple(sorted(set(int(w) for w in widths)))
+        self.formats = tuple(formats) if formats is not None else available_formats()
+        self._lock = threading.Lock()
+        self._file_locks: Dict[str, threading.Lock] = {}
+        # cola de generación en segundo plano (se rearma tras un fork)
+        self._queue: Optional[queue.SimpleQueue] = None
+        self._queued: Set[str] = set()
+        self._worker_pid: Optional[int] = None
+        self._manifest: Dict[str, dict] = {}
+        self._metadata: Dict[str, dict] = {}
+        # filename -> entrada del manifest con variantes al día (lo que se sirve)
+        self._fresh: Dict[str, dict] = {}
+        self.load_manifest()
+        self.build_metadata()
+
+    # ---------- manifest ----------
+    @property
+    def manifest_path(self) -> Path:
+        return self.cache_dir / MANIFEST_NAME
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            data = {}
+        self._manifest = data if isinstance(data, dict) else {}
+
+    def _save_manifest(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # otros workers pueden haber escrito entradas: se fusionan con las nuestras
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as fh:
+                on_disk = json.load(fh)
+            if isinstance(on_disk, dict):
+                self._manifest = dict(on_disk, **self._manifest)
+        except (OSError, ValueError):
+            pass
+        tmp = self.manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self._manifest, fh, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    def entry(self, filename: str) -> Optional[dict]:
+        return self._manifest.get(filename)
+
+    # ---------- metadatos (dimensiones, bytes, anchos para srcset) ----------
+    def build_metadata(self):
+        """
+        Tabla en memoria filename -> {width, height, bytes, widths}. Se arma
+        una vez al arrancar (del manifest o leyendo solo la cabecera del PNG)
+        para no tocar archivos al responder. De paso se valida qué entradas
+        del manifest siguen al día (original sin cambios, variantes en disco).
+        """
+        metadata: Dict[str, dict] = {}
+        fresh: Dict[str, dict] = {}
+        for src in sorted(self.source_dir.glob("*.png")):
+            stamp = self._source_stamp(src)
+            if stamp is None:
+                continue
+            entry = self._manifest.get(src.name)
+            if self._is_fresh(entry, stamp):
+                fresh[src.name] = entry
+            source = entry.get("source", {}) if entry else {}
+            if source.get("mtime_ns") == stamp["mtime_ns"] and source.get("width"):
+                width, height = source["width"], source["height"]
+            else:
+                try:
+                    with Image.open(src) as im:
+                        width, height = im.size
+                except OSError:
+                    continue
+            metadata[src.name] = self._describe(width, height, stamp["size"])
+        self._metadata = metadata
+        self._fresh = fresh
+
+    def _describe(self, width: int, height: int, size: int) -> dict:
+        return {
+            "width": width,
+            "height": height,
+            "bytes": size,
+            "widths": [w for w in self.widths if w < width],
+        }
+
+    def describe(self, filename: str) -> Optional[dict]:
+        return self._metadata.get(filename)
+
+    # ---------- generación ----------
+    def _source_stamp(self, src: Path) -> Optional[dict]:
+        try:
+            st = src.stat()
+        except OSError:
+            return None
+        return {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+    def _is_fresh(self, entry: Optional[dict], stamp: dict) -> bool:
+        if not entry:
+            return False
+        src = entry.get("source", {})
+        if src.get("mtime_ns") != stamp["mtime_ns"] or src.get("size") != stamp["size"]:
+            return False
+        return all((self.cache_dir / v["file"]).exists() for v in entry.get("variants", []))
+
+    def _lock_for(self, filename: str) -> threading.Lock:
+        with self._lock:
+            return self._file_locks.setdefault(filename, threading.Lock())
+
+    @contextlib.contextmanager
+    def _process_lock(self, filename: str) -> Iterator[None]:
+        """Lock de archivo (flock): un solo proceso genera cada imagen."""
+        if fcntl is None:
+            yield
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_dir / f".{filename}.lock", "w") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _disk_entry(self, filename: str) -> Optional[dict]:
+        """Entrada del manifest en disco (otro proceso pudo haberla generado)."""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        return data.get(filename) if isinstance(data, dict) else None
+
+    def fresh_entry(self, filename: str) -> Optional[dict]:
+        """Entrada con variantes al día; None si faltan (sin generar ni tocar el disco)."""
+        return self._fresh.get(filename)
+
+    def ensure(self, filename: str) -> Optional[dict]:
+        """
+        Devuelve la entrada del manifest, generando las variantes si faltan
+        (lento: pregeneración o hilo de fondo, no dentro de una petición).
+        """
+        src = self.source_dir / filename
+        stamp = self._source_stamp(src)
+        if stamp is None:
+            return None
+        entry = self._manifest.get(filename)
+        if self._is_fresh(entry, stamp):
+            self._fresh[filename] = entry
+            return entry
+        with self._lock_for(filename), self._process_lock(filename):
+            entry = self._manifest.get(filename)
+            if self._is_fresh(entry, stamp):
+                self._fresh[filename] = entry
+                return entry
+            entry = self._disk_entry(filename)
+            if self._is_fresh(entry, stamp):
+                # la generó otro proceso
+                with self._lock:
+                    self._manifest[filename] = entry
+                    self._fresh[filename] = entry
+                return entry
+            entry = self._generate(filename, src, stamp)
+            with self._lock:
+                self._manifest[filename] = entry
+                self._save_manifest()
+                source = entry["source"]
+                self._metadata[filename] = self._describe(source["width"], source["height"], source["size"])
+                self._fresh[filename] = entry
+        return entry
+
+    def _generate(self, filename: str, src: Path, stamp: dict) -> dict:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        stem = Path(filename).stem
+        variants: List[dict] = []
+        with Image.open(src) as im:
+            im.load()
+            width, height = im.size
+            has_alpha = im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+            base = im.convert("RGBA" if has_alpha else "RGB")
+            for target in self.widths:
+                if target >= width:
+                    continue
+                h = max(1, round(height * target / width))
+                resized = base.resize((target, h), Image.LANCZOS)
+                for fmt in self.formats:
+                    name = f"{stem}.{target}w.{fmt}"
+                    out = self.cache_dir / name
+                    tmp = out.with_suffix(f".{os.getpid()}.tmp")
+                    resized.save(tmp, format=fmt.upper(), **SAVE_OPTIONS.get(fmt, {}))
+                    os.replace(tmp, out)
+                    variants.append({
+                        "file": name,
+                        "format": fmt,
+                        "width": target,
+                        "height": h,
+                        "bytes": out.stat().st_size,
+                    })
+        return {
+            "source": dict(stamp, width=width, height=height),
+            "variants": variants,
+        }
+
+    def generate_all(self) -> int:
+        count = 0
+        for src in sorted(self.source_dir.glob("*.png")):
+            if self.ensure(src.name):
+                count += 1
+        return count
+
+    def schedule(self, filename: str):
+        """Encola la generación de `filename` en el hilo de fondo del proceso."""
+        with self._lock:
+            if self._worker_pid != os.getpid():
+                # primera vez o tras un fork: el hilo del padre no existe aquí
+                self._queue = queue.SimpleQueue()
+                self._queued = set()
+                self._worker_pid = os.getpid()
+                threading.Thread(target=self._run_queue, args=(self._queue,),
+                                 name="image-derivatives", daemon=True).start()
+            if filename in self._queued:
+                return
+            self._queued.add(filename)
+            self._queue.put(filename)
+
+    def _run_queue(self, pending: queue.SimpleQueue):
+        while True:
+            filename = pending.get()
+            try:
+                self.ensure(filename)
+            except Exception:
+                log.exception("no se pudieron generar las variantes de %s", filename)
+            finally:
+                with self._lock:
+                    self._queued.discard(filename)
+
+    # ---------- selección ----------
+    def pick(self, filename: str, accepted_formats: Iterable[str],
+             width: Optional[int] = None) -> Optional[Tuple[str, str]]:
+        """
+        Elige la mejor variante para el cliente: el primer formato aceptado
+        (según la preferencia del pipeline) y el menor ancho >= `width`
+        (o el mayor disponible). Devuelve (archivo en cache, mimetype) o
+        None si conviene servir el original. Si las variantes no están
+        generadas se encolan y mientras tanto se sirve el original.
+        """
+        accepted = [f for f in self.formats if f in set(accepted_formats)]
+        if not accepted:
+            return None
+        entry = self._fresh.get(filename)
+        if not entry:
+            if filename in self._metadata:
+                self.schedule(filename)
+            return None
+        for fmt in accepted:
+            candidates = sorted(
+                (v for v in entry["variants"] if v["format"] == fmt),
+                key=lambda v: v["width"],
+            )
+            if not candidates:
+                continue
+            if width is None:
+                chosen = candidates[-1]
+            else:
+                if width > candidates[-1]["width"] and width >= entry["source"]["width"] * 0.9:
+                    return None  # piden casi el original: se sirve tal cual
+                chosen = next((v for v in candidates if v["width"] >= width), candidates[-1])
+            return chosen["file"], MIMETYPES[fmt]
+        return None
+
+
+if __name__ == "__main__":
+    base_dir = Path(__file__).resolve().parent.parent.parent
+    pipeline = ImageDerivativePipeline(
+        str(base_dir / "resources" / "products"),
+        str(base_dir / "resources" / "derivatives"),
+    )
+    total = pipeline.generate_all()
+    print(f"{total} imágenes procesadas en {pipeline.cache_dir} (formatos: {', '.join(pipeline.formats)})")
@@ -1,33 +1,91 @@
 from pathlib import Path
-from flask import url_for, send_from_directory
-from typing import Optional
+from flask import url_for, send_file, abort
+from typing import Iterable, Optional
 from core.ports import ImageService
+from infrastructure.web.asset_manifest import AssetManifest
+from infrastructure.web.image_derivatives import ImageDerivativePipeline
+
+# URLs con huella de contenido: cambian si cambia el archivo
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+DEFAULT_MAX_AGE = 86400
+# original servido mientras se generan las variantes: que el cliente vuelva pronto
+PENDING_MAX_AGE = 60
 
 class LocalImageService(ImageService):
-    def __init__(self, products_dir: str):
+    def __init__(self, products_dir: str, derivatives: Optional[ImageDerivativePipeline] = None,
+                 manifest: Optional[AssetManifest] = None):
         self.products_dir = Path(products_dir)
+        # variantes WebP/AVIF redimensionadas (opcional)
+        self.derivatives = derivatives
+        # hash/tamaño/mtime de cada archivo, armado al arrancar
+        self.manifest = manifest if manifest is not None else AssetManifest(str(self.products_dir))
     
     def get_image_url(self, product_id: str) -> Optional[str]:
         if not product_id:
             return None
         
-        filename = f"{product_id}.png"
-        file_path = self.products_dir / filename
-        
-        if file_path.exists():
-            return url_for("product_image", filename=filename, _external=True)
+        info = self.manifest.get(f"{product_id}.png")
+        if info is not None:
+            return url_for("product_image", filename=info.fingerprinted_name, _external=True)
         return None
-    
-    def serve_image_file(self, filename: str):
-        file_path = self.products_dir / filename
-        if not file_path.exists():
-            from flask import abort
+
+    def asset_path(self, path: str) -> str:
+        return self.manifest.url_path(path)
+
+    def describe_image(self, filename: str) -> Optional[dict]:
+        if self.derivatives is None:
+            return None
+        return self.derivatives.describe(filename)
+
+    def serve_image_file(self, filename: str, width: Optional[int] = None,
+                         accepted_formats: Iterable[str] = ()):
+        info, immutable = self.manifest.resolve(filename)
+        if info is None:
             abort(404)
-        
-        return send_from_directory(
-            directory=str(self.products_dir),
-            path=filename,
-            mimetype="image/png",
-            as_attachment=False,
-            max_age=86400
-        )
\ No newline at end of file
+
+        # los nombres salen de los manifests (no del cliente): send_file directo,
+        # sin el isfile() extra de send_from_directory
+        variant = None
+        pending = False
+        if self.derivatives is not None:
+            variant = self.derivatives.pick(info.filename, accepted_formats, width)
+            pending = (
+                variant is None
+                and any(f in self.derivatives.formats for f in accepted_formats)
+                and self.derivatives.fresh_entry(info.filename) is None
+            )
+        resp = None
+        if variant is not None:
+            variant_file, mimetype = variant
+            try:
+                resp = send_file(
+                    self.derivatives.cache_dir / variant_file,
+                    mimetype=mimetype,
+                    as_attachment=False,
+                    etag=f"{info.digest}-{variant_file}",
+                    conditional=True,
+                    max_age=DEFAULT_MAX_AGE
+                )
+            except FileNotFoundError:  # borrada a mano después del arranque: va el original
+                resp = None
+        if resp is None:
+            try:
+                resp = send_file(
+                    self.products_dir / info.filename,
+                    mimetype="image/png",
+                    as_attachment=False,
+                    etag=info.digest,
+                    conditional=True,
+                    max_age=DEFAULT_MAX_AGE
+                )
+            except FileNotFoundError:
+                abort(404)
+        if pending:
+            resp.cache_control.max_age = PENDING_MAX_AGE
+        elif immutable:
+            resp.cache_control.max_age = IMMUTABLE_MAX_AGE
+            resp.cache_control.public = True
+            resp.cache_control.immutable = True
+        # la respuesta depende del Accept del cliente
+        resp.vary.add("Accept")
+        return resp
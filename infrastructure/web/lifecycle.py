@@ -0,0 +1,87 @@
+"""
+Arranque de la app: precalentado, readiness (/ping) y reset tras fork.
+
+Con `gunicorn --preload` (ver gunicorn.conf.py) `create_app()` corre una
+vez en el master: el precalentado deja armados los índices del catálogo,
+el manifest de imágenes y los payloads serializados (y comprimidos) de
+las rutas más pedidas, y los workers los heredan copy-on-write en vez de
+pagarlos en su primera petición. `post_fork` llama a `reset_after_fork`
+para soltar conexiones y estado que no se comparten entre procesos.
+"""
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+from infrastructure import instrumentation
+from infrastructure.web import compression
+
+# rutas cuyo JSON se serializa y comprime en el arranque
+HOT_PATHS = ("/products", "/products/best-sellers", "/products/normal-ring", "/products/collections")
+# las peticiones del precalentado no cuentan en /metrics
+WARM_UP_ENVIRON_KEY = "apijoyeria.warm_up"
+
+log = logging.getLogger(__name__)
+
+
+class AppLifecycle:
+    def __init__(self, repository):
+        self.repository = repository
+        self.started_at = time.perf_counter()
+        self.ready = False
+        self.error: Optional[str] = None
+        # segundos por etapa del arranque (se informan en /ping)
+        self.timings: Dict[str, float] = {}
+
+    def warm_up(self, app, base_url: Optional[str] = None):
+        """
+        `base_url`: host público (PUBLIC_BASE_URL) con el que se arman las
+        URLs absolutas; los payloads cacheados dependen de él. Sin él solo
+        se arman los índices: un payload armado con otro host nunca
+        coincidiría con la clave de una petición real.
+        """
+        try:
+            for name, secs in self.repository.warm_up().items():
+                self.timings[f"index_{name}"] = secs
+            if not base_url:
+                log.info("sin PUBLIC_BASE_URL: no se precalientan los payloads")
+                self.mark_ready()
+                return
+            started = time.perf_counter()
+            client = app.test_client()
+            for path in HOT_PATHS:
+                for encoding in ("identity",) + compression.ENCODINGS:
+                    client.get(path, base_url=base_url, headers={"Accept-Encoding": encoding},
+                               environ_base={WARM_UP_ENVIRON_KEY: True})
+            self.timings["payloads"] = time.perf_counter() - started
+        except Exception as e:  # la app sigue funcionando en frío: lista, pero "degraded"
+            log.exception("falló el precalentado")
+            self.error = str(e)
+        self.mark_ready()
+
+    def mark_ready(self):
+        self.timings["startup"] = time.perf_counter() - self.started_at
+        self.ready = True
+
+    def reset_after_fork(self):
+        self.repository.reset_after_fork()
+        instrumentation.metrics.reset_after_fork()
+
+    def status(self) -> dict:
+        """
+        Estado para /ping; `ready` es False solo mientras el arranque no
+        terminó. Si el precalentado falló la app responde igual (en frío):
+        `status` es "degraded" y se informa el error.
+        """
+        if not self.ready:
+            status = "starting"
+        else:
+            status = "degraded" if self.error else "ok"
+        return {
+            "status": status,
+            "ready": self.ready,
+            "pid": os.getpid(),
+            "data_version": self.repository.data_version(),
+            "startup_ms": {k: round(v * 1000, 1) for k, v in self.timings.items()},
+            **({"error": self.error} if self.error else {}),
+        }
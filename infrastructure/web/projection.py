@@ -0,0 +1,172 @@
+# projection.py
+import re
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Optional
+from urllib.parse import urljoin
+from core.ports import ImageService
+from core.text import norm, derive_product_fields, DERIVED_COLUMNS
+
+# ========= mapeo de encabezados -> claves canónicas (SOLO renombrar keys en el JSON) =========
+KEY_MAP = {
+    "descripcion": "Descripción",
+    "acabado": "Acabado", 
+    "cadena": "Cadena",
+    "cierre": "Cierre",
+    "corte": "Corte",
+    "detalle": "Detalle",
+    "dije": "Dije",
+    "disenio": "Diseño",
+    "estilo": "Estilo",
+    "ideal_para": "Ideal para",
+    "inspiracion": "Inspiración",
+    "lado1": "Lado 1",
+    "lado2": "Lado 2", 
+    "material": "Material",
+    "modelo": "Modelo",
+    "montura": "Montura",
+    "origen": "Origen",
+    "piedra": "Piedra",
+    "piedra_central": "Piedra Central",
+    "piedras": "Piedras",
+    "piezas": "Piezas",
+    "set": "Set",
+    "significado": "Significado",
+    "tamanio": "Tamaño",
+    "tamanios_disponibles": "Tamaños Disponibles",
+    "uso": "Uso",
+    "versatilidad": "Versatilidad",
+    "categoria": "Categoría",
+}
+# soporto variaciones (con/sin acentos, mayúsculas, espacios)
+KEY_MAP_NORM = {norm(k): v for k, v in KEY_MAP.items()}
+LEGACY_CATEGORY_KEYS = ("COLECCION/ SIMBOLISMO", "COLECCION / SIMBOLISMO", "coleccion/simbolismo")
+
+@lru_cache(maxsize=64)
+def canonical_keys(keys: tuple) -> tuple:
+    """
+    Clave de salida para cada columna. Solo depende del conjunto de columnas,
+    así que se calcula una vez por esquema y no por producto.
+    """
+    # si no hay mapeo, conservo la clave ORIGINAL tal cual (sin deformarla)
+    return tuple(KEY_MAP_NORM.get(norm(k)) or k for k in keys)
+
+def image_url(img, base_url: str, image_service: ImageService = None) -> str:
+    """URL absoluta de la imagen (con huella de contenido si el servicio la conoce)."""
+    path = img.path or ""
+    if image_service is not None:
+        path = image_service.asset_path(path)
+    return urljoin(base_url, path.lstrip("/"))
+
+def thumbnail_url(img, base_url: str, image_service: ImageService = None) -> str:
+    """URL de la variante más chica (?w=) si hay derivados; si no, la imagen original."""
+    url = image_url(img, base_url, image_service)
+    info = image_service.describe_image((img.path or "").rsplit("/", 1)[-1]) if image_service else None
+    if info and info["widths"]:
+        return f"{url}?w={min(info['widths'])}"
+    return url
+
+def image_payload(img, base_url: str, image_service: ImageService = None) -> dict:
+    """
+    Dict de una imagen; si hay metadatos precalculados agrega dimensiones
+    intrínsecas, bytes y un `srcset` con las variantes por ancho (?w=).
+    """
+    out = {
+        "product_id": img.product_id,
+        "path": img.path,
+        "position": img.position,
+        "is_primary": img.is_primary,
+        "original_url": img.original_url,
+    }
+    info = image_service.describe_image((img.path or "").rsplit("/", 1)[-1]) if image_service else None
+    if info:
+        url = image_url(img, base_url, image_service)
+        out["width"] = info["width"]
+        out["height"] = info["height"]
+        out["bytes"] = info["bytes"]
+        out["srcset"] = ", ".join(
+            [f"{url}?w={w} {w}w" for w in info["widths"]] + [f"{url} {info['width']}w"]
+        )
+    return out
+
+_IMAGE_URL_RE = re.compile(r"^image_url(\d*)$")
+
+def parse_fields(raw: Optional[str]) -> Optional[FrozenSet[str]]:
+    """'id, nombres_display,image_url' -> frozenset; vacío/None = todos los campos."""
+    if not raw:
+        return None
+    fields = frozenset(f.strip() for f in raw.split(",") if f.strip())
+    return fields or None
+
+class ProductProjection:
+    """
+    Proyección compilada Product -> dict del JSON público.
+
+    Con `fields=None` produce el payload completo (claves canónicas,
+    derivados, imágenes y image_url*). Con un conjunto de campos solo
+    calcula lo pedido: el plan de columnas se compila una vez por esquema
+    y las imágenes / derivados se omiten si no se piden.
+    Los campos se nombran por su clave de salida ("Descripción") o por la
+    columna de origen ("descripcion").
+    """
+
+    def __init__(self, fields: Optional[Iterable[str]] = None, image_service: ImageService = None):
+        self.fields = frozenset(fields) if fields is not None else None
+        self.image_service = image_service
+        self._plans = {}
+
+        want = self.wants
+        self.derived = tuple(c for c in DERIVED_COLUMNS if want(c))
+        self.with_images = want("images")
+        # posiciones de image_url* pedidas (None = todas)
+        if self.fields is None or "image_urls" in self.fields:
+            self.url_slots = None
+        else:
+            self.url_slots = frozenset(
+                int(m.group(1) or 1) for m in map(_IMAGE_URL_RE.match, self.fields) if m
+            )
+
+    def wants(self, name: str) -> bool:
+        return self.fields is None or name in self.fields
+
+    def _plan(self, keys: tuple) -> tuple:
+        """(columna, clave de salida) a copiar, en el orden de la tabla."""
+        plan = self._plans.get(keys)
+        if plan is None:
+            pairs = zip(keys, canonical_keys(keys))
+            if self.fields is not None:
+                pairs = [(k, out) for k, out in pairs if out in self.fields or k in self.fields]
+            plan = tuple(pairs)
+            self._plans[keys] = plan
+        return plan
+
+    def __call__(self, product, base_url: str) -> dict:
+        data = product.data or {}
+
+        # 1) columnas de BD con su clave canónica (solo las pedidas)
+        item = {out: data[k] for k, out in self._plan(tuple(data))}
+        if "categoria" not in item and self.wants("categoria"):
+            # migración de categoría legacy -> categoria si aún viene con ese nombre
+            for lk in LEGACY_CATEGORY_KEYS:
+                if lk in item and item[lk]:
+                    item["categoria"] = item[lk]
+                    break
+
+        # 2) derivados materializados en la BD (categoria_norm, tokens, nombre presentable);
+        #    si alguna fila aún no está materializada se calculan al vuelo
+        if self.derived:
+            derived = data
+            if any(data.get(c) is None for c in DERIVED_COLUMNS):
+                derived = derive_product_fields(data)
+            for c in self.derived:
+                item[c] = derived[c].split() if c == "categoria_tokens" else derived[c]
+
+        # 3) imágenes y URLs absolutas
+        if self.with_images or self.url_slots is None or self.url_slots:
+            imgs = sorted(getattr(product, "images", []) or [], key=lambda i: (i.position or 0))
+            if self.with_images:
+                item["images"] = [image_payload(img, base_url, self.image_service) for img in imgs]
+            for idx, img in enumerate(imgs, start=1):
+                if self.url_slots is None or idx in self.url_slots:
+                    key = "image_url" if idx == 1 else f"image_url{idx}"
+                    item[key] = image_url(img, base_url, self.image_service)
+        return item
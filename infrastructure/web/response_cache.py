@@ -0,0 +1,168 @@
+import contextlib
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, ContextManager, Dict, Hashable, Optional, Union
+
+from infrastructure.web.shared_cache import IDENTITY, SharedEntry, SharedPayloadStore
+
+Body = Union[bytes, memoryview]
+
+
+@dataclass(frozen=True)
+class CachedPayload:
+    body: Body  # memoryview si viene del cache compartido (mmap)
+    etag: str  # ETag fuerte, sin comillas
+    mimetype: str = "application/json; charset=utf-8"
+    # variantes comprimidas ya calculadas: encoding -> bytes
+    encoded: Dict[str, Body] = field(default_factory=dict, compare=False, repr=False)
+    # entradas del cache compartido por variante ("identity" o encoding), para sendfile
+    shared: Dict[str, SharedEntry] = field(default_factory=dict, compare=False, repr=False)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(v) for v in self.encoded.values())
+
+
+class ResponseCache:
+    """
+    Cache LRU de respuestas ya serializadas (bytes + ETag).
+    La clave debe incluir la versión de datos: al cambiar la BD las entradas
+    viejas dejan de consultarse y salen solas por LRU.
+
+    Con `shared` (varios workers) los payloads se guardan en el cache
+    compartido y el LRU local solo guarda vistas sobre su mmap: un miss
+    local busca ahí antes de armar la respuesta. La clave tiene que ser
+    igual en todos los procesos (token de datos, no el contador local).
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024,
+                 shared: Optional[SharedPayloadStore] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, CachedPayload]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._shared_hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    def get(self, key: Hashable) -> Optional[CachedPayload]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry
+        entry = self._from_shared(key)
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+            else:
+                self._shared_hits += 1
+        return entry
+
+    def peek(self, key: Hashable) -> Optional[CachedPayload]:
+        """Como `get`, pero sin tocar el orden LRU ni las estadísticas."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry if entry is not None else self._from_shared(key)
+
+    def put(self, key: Hashable, body: bytes, mimetype: Optional[str] = None) -> CachedPayload:
+        entry = CachedPayload(body=body, etag=self.make_etag(body), mimetype=mimetype or CachedPayload.mimetype)
+        if len(body) > self.max_bytes:
+            return entry  # demasiado grande para cachear; se sirve igual
+        if self.shared is not None:
+            shared = self.shared.put(key, body, {"etag": entry.etag, "mimetype": entry.mimetype})
+            if shared is not None:
+                entry = self._shared_payload(shared)
+        self._store(key, entry)
+        return entry
+
+    def building(self, key: Hashable) -> ContextManager[None]:
+        """Turno para armar `key` (entre workers si hay cache compartido)."""
+        return self.shared.building(key) if self.shared is not None else contextlib.nullcontext()
+
+    def _store(self, key: Hashable, entry: CachedPayload):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self._evict()
+
+    def _from_shared(self, key: Hashable) -> Optional[CachedPayload]:
+        if self.shared is None:
+            return None
+        shared = self.shared.get(key)
+        if shared is None:
+            return None
+        entry = self._shared_payload(shared)
+        self._store(key, entry)
+        return entry
+
+    @staticmethod
+    def _shared_payload(shared: SharedEntry) -> CachedPayload:
+        return CachedPayload(body=shared.body, etag=shared.meta["etag"], mimetype=shared.meta["mimetype"],
+                             shared={IDENTITY: shared})
+
+    def encoded(self, key: Hashable, entry: CachedPayload, encoding: str,
+                encode: Callable[[bytes], bytes]) -> bytes:
+        """
+        Variante comprimida de `entry` (se calcula una vez y queda junto al
+        payload; cuenta para `max_bytes`).
+        """
+        body = entry.encoded.get(encoding)
+        if body is not None:
+            return body
+        if self.shared is None:
+            body = encode(entry.body)
+        else:
+            # la variante también se comprime una sola vez entre todos los workers
+            shared = self.shared.get(key, encoding)
+            if shared is None:
+                with self.shared.building(key, encoding):
+                    shared = self.shared.get(key, encoding)
+                    if shared is None:
+                        shared = self.shared.put(key, encode(entry.body), {}, encoding)
+            if shared is None:
+                body = encode(entry.body)
+            else:
+                body = shared.body
+                entry.shared.setdefault(encoding, shared)
+        with self._lock:
+            if encoding not in entry.encoded:
+                entry.encoded[encoding] = body
+                if self._entries.get(key) is entry:
+                    self._bytes += len(body)
+                    self._evict()
+        return entry.encoded[encoding]
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "shared_hits": self._shared_hits,
+                "misses": self._misses,
+            }
@@ -0,0 +1,220 @@
+"""
+Payloads serializados compartidos entre procesos (workers de gunicorn).
+
+Cada entrada es un archivo `<directorio>/<token de datos>/<hash de clave>.<variante>`
+(cabecera JSON chica + cuerpo) que se lee con mmap: las páginas viven una
+sola vez en el cache del SO (tmpfs en /dev/shm si existe) y todos los
+workers las comparten, en vez de que cada uno arme y guarde su copia.
+
+- Lectores sin locks: un archivo se publica completo con `os.replace`,
+  así que quien lo abre ve la entrada entera o no la ve.
+- Versionado: el token de datos (huella del archivo de la BD, igual en
+  todos los procesos) es el directorio. Las versiones anteriores a la
+  más nueva se borran recién VERSION_GRACE segundos después de que ésta
+  aparece: un worker que todavía no vio el cambio no pierde (ni borra)
+  la versión que otros están usando. Los mmap ya abiertos siguen
+  válidos aunque el archivo se borre.
+- Quien arma una entrada toma un archivo de lock (O_EXCL) por clave: los
+  demás workers esperan su resultado en vez de armarla de nuevo.
+"""
+import contextlib
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Hashable, Iterator, Optional
+
+IDENTITY = "identity"
+# magic + largo de la cabecera JSON
+_HEADER = struct.Struct("<4sI")
+_MAGIC = b"APC1"
+# un lock más viejo que esto se considera abandonado (worker muerto)
+BUILD_TIMEOUT = 30.0
+BUILD_POLL = 0.01
+# cuánto se conserva una versión vieja después de que aparece una nueva
+VERSION_GRACE = 60.0
+# marca de cada versión: su mtime es cuándo un proceso pasó a usarla
+_CURRENT_MARK = ".current"
+
+
+def default_directory() -> str:
+    """Directorio por proceso maestro; en tmpfs si el sistema lo tiene."""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, f"apijoyeria-{os.getpid()}")
+
+
+@dataclass(frozen=True)
+class SharedEntry:
+    meta: dict
+    body: memoryview  # sobre el mmap del archivo (sin copiar)
+    path: str
+    offset: int  # dónde empieza el cuerpo dentro del archivo
+
+    def open_body(self) -> Optional[BinaryIO]:
+        """Archivo posicionado al inicio del cuerpo (para sendfile), o None si ya no existe."""
+        try:
+            fh = open(self.path, "rb")
+        except OSError:
+            return None
+        fh.seek(self.offset)
+        return fh
+
+
+class SharedPayloadStore:
+    def __init__(self, directory: str, token_fn: Callable[[], str], max_bytes: int = 256 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.token_fn = token_fn
+        self.max_bytes = max_bytes
+        self._token: Optional[str] = None
+        self._lock = threading.Lock()  # solo escritores (contabilidad para el recorte)
+        self._written = 0
+
+    # ---------- rutas ----------
+    def _version_dir(self) -> Path:
+        token = self.token_fn()
+        if token != self._token:
+            self._switch(token)
+        return self.directory / token
+
+    def _switch(self, token: str):
+        version_dir = self.directory / token
+        version_dir.mkdir(parents=True, exist_ok=True)
+        with contextlib.suppress(OSError):
+            (version_dir / _CURRENT_MARK).touch()
+        self._token = token
+        self._collect()
+
+    def _collect(self):
+        """Borra las versiones anteriores a la más nueva, pasado VERSION_GRACE."""
+        versions = []
+        with contextlib.suppress(OSError):
+            for d in self.directory.iterdir():
+                with contextlib.suppress(OSError):
+                    versions.append(((d / _CURRENT_MARK).stat().st_mtime, d))
+        if len(versions) < 2:
+            return
+        newest_since, newest = max(versions)
+        if time.time() - newest_since < VERSION_GRACE:
+            return
+        for _, old in versions:
+            if old != newest:
+                shutil.rmtree(old, ignore_errors=True)
+
+    def _path(self, key: Hashable, variant: str) -> Path:
+        digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).hexdigest()
+        return self._version_dir() / f"{digest}.{variant}"
+
+    # ---------- lectura (sin locks) ----------
+    def get(self, key: Hashable, variant: str = IDENTITY) -> Optional[SharedEntry]:
+        return self._read(self._path(key, variant))
+
+    @staticmethod
+    def _read(path: Path) -> Optional[SharedEntry]:
+        try:
+            with open(path, "rb") as fh:
+                mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # no existe / vacío
+            return None
+        try:
+            magic, meta_len = _HEADER.unpack_from(mm)
+            offset = _HEADER.size + meta_len
+            if magic != _MAGIC or offset > len(mm):
+                raise ValueError("cabecera inválida")
+            meta = json.loads(mm[_HEADER.size:offset])
+        except (ValueError, struct.error):
+            # archivo corrupto (escrito a medias por otra versión, disco lleno...):
+            # se descarta y cuenta como miss
+            mm.close()
+            with contextlib.suppress(OSError):
+                os.unlink(path)
+            return None
+        return SharedEntry(meta, memoryview(mm)[offset:], str(path), offset)
+
+    # ---------- escritura ----------
+    def put(self, key: Hashable, body: bytes, meta: dict, variant: str = IDENTITY) -> Optional[SharedEntry]:
+        """Publica la entrada (si ya existe, gana la primera) y la devuelve mapeada."""
+        if len(body) > self.max_bytes:
+            return None
+        path = self._path(key, variant)
+        if not path.exists():
+            encoded_meta = json.dumps(meta).encode("utf-8")
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                with open(tmp, "wb") as fh:
+                    fh.write(_HEADER.pack(_MAGIC, len(encoded_meta)))
+                    fh.write(encoded_meta)
+                    fh.write(body)
+                os.replace(tmp, path)
+            except OSError:  # directorio borrado por un cambio de versión, disco lleno...
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp)
+                return None
+            self._account(len(body), path.parent)
+        return self._read(path)
+
+    @contextlib.contextmanager
+    def building(self, key: Hashable, variant: str = IDENTITY) -> Iterator[None]:
+        """
+        Turno para armar una entrada entre procesos. Si otro worker la está
+        armando se espera a que la publique (o a BUILD_TIMEOUT); adentro
+        hay que volver a mirar `get` antes de armarla.
+        """
+        path = self._path(key, variant)
+        lock = path.with_name(f".{path.name}.lock")
+        deadline = time.monotonic() + BUILD_TIMEOUT
+        fd = None
+        while True:
+            try:
+                fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                if path.exists() or time.monotonic() >= deadline:
+                    break
+                with contextlib.suppress(OSError):
+                    if time.time() - lock.stat().st_mtime > BUILD_TIMEOUT:
+                        os.unlink(lock)  # dueño muerto
+                        continue
+                time.sleep(BUILD_POLL)
+            except OSError:
+                break  # sin directorio compartido: cada uno arma la suya
+        try:
+            yield
+        finally:
+            if fd is not None:
+                os.close(fd)
+                with contextlib.suppress(OSError):
+                    os.unlink(lock)
+
+    def _account(self, size: int, version_dir: Path):
+        """Recorte aproximado: al pasar `max_bytes` se borran las entradas más viejas."""
+        with self._lock:
+            self._written += size
+            if self._written < self.max_bytes // 8:
+                return
+            self._written = 0
+        self._collect()
+        files = []
+        with contextlib.suppress(OSError):
+            for f in os.scandir(version_dir):
+                if not f.name.startswith("."):
+                    with contextlib.suppress(OSError):
+                        st = f.stat()
+                        files.append((st.st_mtime, st.st_size, f.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes * 3 // 4:
+                break
+            with contextlib.suppress(OSError):
+                os.unlink(path)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._token = None
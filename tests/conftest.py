@@ -0,0 +1,52 @@
+# el repo no es un paquete instalable: los tests importan core/, application/
+# e infrastructure/ desde la raíz
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image  # noqa: E402
+
+from infrastructure.database.ingest import build_database  # noqa: E402
+from infrastructure.database.models import DatabaseConfig  # noqa: E402
+
+CATALOG_COLUMNS = ["id", "nombres", "categoria", "material", "piedra", "plus"]
+CATALOG_ROWS = [
+    [1, "ANILLO SOL", "Anillos", "Oro", "Diamante", "BEST SELLER"],
+    [2, "ANILLO LUNA", "Anillos / Compromiso", "Plata", "Perla", None],
+    [3, "COLLAR ESTRELLA", "Collares", "Oro", None, "BEST SELLER"],
+    [4, "ARETE GOTA", "Aretes", "Plata", "Perla", None],
+    [5, "ANILLO MAR", "Anillos", "Plata", None, None],
+    [6, "DIJE CORAZON", "Dijes", "Oro", "Rubi", None],
+]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """BD chica armada con la ingesta + imágenes PNG por producto."""
+    products = tmp_path / "products"
+    products.mkdir()
+    images = {}
+    for row in CATALOG_ROWS:
+        Image.new("RGB", (800, 600), "gold").save(products / f"{row[0]}.png")
+        images[str(row[0])] = [f"{row[0]}.png"]
+    db = str(tmp_path / "catalogo.sqlite")
+    build_database(db, CATALOG_COLUMNS, CATALOG_ROWS, images, DatabaseConfig(db_path=db))
+    return {"db_path": db, "products_dir": str(products), "derivatives_dir": str(tmp_path / "derivatives")}
+
+
+@pytest.fixture
+def make_app(catalog):
+    from infrastructure.web.flask_app import create_app
+
+    def make(**kwargs):
+        return create_app(**dict(catalog, **kwargs))
+
+    return make
+
+
+@pytest.fixture
+def client(make_app):
+    return make_app().test_client()
@@ -0,0 +1,47 @@
+from infrastructure.database.bitset import (
+    ScoredMatches, add_levels, best_levels, iter_positions, merge_levels, to_bitset,
+)
+
+
+def test_to_bitset_e_iter_positions():
+    bits = to_bitset([0, 3, 9, 64], 70)
+    assert list(iter_positions(bits)) == [0, 3, 9, 64]
+    assert list(iter_positions(bits, start=4)) == [9, 64]
+    assert list(iter_positions(0)) == []
+
+
+def test_merge_levels_une_iguales_y_ordena():
+    levels = merge_levels([(1.0, 0b001), (2.0, 0b010), (1.0000001, 0b100), (3.0, 0)])
+    assert levels == [(2.0, 0b010), (1.0, 0b101)]
+
+
+def test_best_levels_deja_cada_posicion_en_su_mejor_nivel():
+    assert best_levels({1.0: 0b111, 4.0: 0b010}) == [(4.0, 0b010), (1.0, 0b101)]
+
+
+def test_add_levels_exige_todos_los_terminos_y_suma_puntajes():
+    per_term = [
+        [(8.0, 0b0011), (1.0, 0b0100)],
+        [(2.0, 0b0001), (1.0, 0b0110)],
+    ]
+    assert add_levels(per_term) == [(10.0, 0b0001), (9.0, 0b0010), (2.0, 0b0100)]
+
+
+def test_scored_matches_orden_total_y_paginas():
+    keys = [("a", 1), ("b", 2), ("c", 3), ("d", 4)]
+    matches = ScoredMatches(keys, [(5.0, 0b1010), (1.0, 0b0101)])
+    assert matches.total == 4
+    assert list(matches.positions()) == [1, 3, 0, 2]
+
+    page, last = matches.page(limit=3)
+    assert page == [(1, 5.0), (3, 5.0), (0, 1.0)]
+    assert last == (-1.0, "a", 1)
+    page, last = matches.page(after=list(last), limit=3)
+    assert page == [(2, 1.0)]
+    assert last is None
+
+
+def test_bits_une_los_niveles():
+    matches = ScoredMatches([(str(i),) for i in range(4)], [(2.0, 0b0100), (1.0, 0b0011)])
+    assert matches.bits == 0b0111
+    assert ScoredMatches([], []).bits == 0
@@ -0,0 +1,51 @@
+import gzip
+
+import pytest
+from werkzeug.http import parse_accept_header
+
+from infrastructure.web import compression
+
+
+def accept(header):
+    return parse_accept_header(header)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("*", "br"),
+    ("gzip, br", "br"),  # igual calidad: orden de preferencia
+    ("gzip, br;q=0.5", "gzip"),
+    ("br;q=0.9, gzip;q=0.8", "br"),
+])
+def test_negotiate(monkeypatch, header, expected):
+    monkeypatch.setattr(compression, "ENCODINGS", ("br", "gzip"))
+    assert compression.negotiate(accept(header)) == expected
+
+
+def test_negotiate_sin_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "ENCODINGS", ("gzip",))
+    assert compression.negotiate(accept("br")) is None
+    assert compression.negotiate(accept("br, gzip;q=0.1")) == "gzip"
+
+
+@pytest.mark.parametrize("mimetype, expected", [
+    ("application/json", True),
+    ("application/x-ndjson", True),
+    ("text/plain", True),
+    ("image/png", False),
+    (None, False),
+])
+def test_is_compressible(mimetype, expected):
+    assert compression.is_compressible(mimetype) is expected
+
+
+def test_gzip_estable_y_en_streaming():
+    body = b'{"data":[' + b",".join(b'{"id":%d}' % i for i in range(500)) + b"]}"
+    assert compression.compress(body, "gzip") == compression.compress(body, "gzip")  # mismo ETag
+    assert gzip.decompress(compression.compress(body, "gzip")) == body
+    chunks = [body[i:i + 700] for i in range(0, len(body), 700)]
+    assert gzip.decompress(b"".join(compression.compress_stream(chunks, "gzip"))) == body
@@ -0,0 +1,28 @@
+def test_etag_y_304(client):
+    first = client.get("/products?limit=2")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    again = client.get("/products?limit=2", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.get_data() == b""
+    assert again.headers["ETag"] == etag
+
+
+def test_etag_distinto_por_consulta_y_por_encoding(client):
+    plain = client.get("/products?limit=2").headers["ETag"]
+    assert client.get("/products?limit=3").headers["ETag"] != plain
+
+    gz = client.get("/products?limit=2", headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["Content-Encoding"] == "gzip"
+    assert gz.headers["ETag"] != plain
+    # el ETag de la variante comprimida también valida
+    resp = client.get("/products?limit=2", headers={"Accept-Encoding": "gzip", "If-None-Match": gz.headers["ETag"]})
+    assert resp.status_code == 304
+
+
+def test_etag_viejo_responde_200(client):
+    resp = client.get("/products?limit=2", headers={"If-None-Match": '"otro"'})
+    assert resp.status_code == 200
+    assert resp.get_json()["data"]
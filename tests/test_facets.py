@@ -0,0 +1,29 @@
+def ids(body):
+    return [p["id"] for p in body["data"]]
+
+
+def test_facetas_con_conteos(client):
+    body = client.get("/products?material=plata").get_json()
+    assert ids(body) == [2, 5, 4]  # orden (nombres, id)
+    assert body["total"] == 3
+    # la faceta propia no se filtra a sí misma: "oro" sigue contando
+    assert body["facets"]["material"] == {"oro": 3, "plata": 3}
+    assert body["facets"]["piedra"] == {"perla": 2}
+
+
+def test_texto_y_facetas_se_intersectan(client):
+    body = client.get("/products?q=anillo&material=plata").get_json()
+    assert ids(body) == [2, 5]
+    assert body["facets"]["material"] == {"plata": 2, "oro": 1}
+
+    assert ids(client.get("/products?q=anillo&piedra=perla").get_json()) == [2]
+    assert client.get("/products?q=collar&material=plata").get_json()["data"] == []
+
+
+def test_texto_y_facetas_paginan_con_cursor(client):
+    first = client.get("/products?q=anillo&facets=1&limit=2").get_json()
+    assert ids(first) == [2, 5]
+    assert first["total"] == 3
+    second = client.get(f"/products?q=anillo&facets=1&limit=2&cursor={first['next_cursor']}").get_json()
+    assert ids(second) == [1]
+    assert second.get("next_cursor") is None
@@ -0,0 +1,54 @@
+import os
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from infrastructure.web.image_derivatives import ImageDerivativePipeline
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    source, cache = tmp_path / "products", tmp_path / "derivatives"
+    source.mkdir()
+    Image.new("RGB", (800, 600), "gold").save(source / "12.png")
+    return source, cache
+
+
+def pipeline(dirs):
+    return ImageDerivativePipeline(str(dirs[0]), str(dirs[1]), widths=(320, 640), formats=("webp",))
+
+
+def test_pick_sirve_del_manifest_en_memoria_sin_tocar_el_disco(dirs, monkeypatch):
+    pipeline(dirs).generate_all()
+    started = pipeline(dirs)  # arranque de otro proceso: valida el manifest una vez
+
+    def no_disk(*args, **kwargs):
+        raise AssertionError("stat en el camino de la petición")
+
+    monkeypatch.setattr(Path, "stat", no_disk)
+    monkeypatch.setattr(os, "stat", no_disk)
+    assert started.pick("12.png", ["webp"], 300) == ("12.320w.webp", "image/webp")
+    assert started.pick("12.png", ["webp"]) == ("12.640w.webp", "image/webp")
+    assert started.pick("12.png", ["webp"], 790) is None  # casi el original
+    assert started.pick("12.png", ["avif"], 300) is None
+    assert started.fresh_entry("12.png") is not None
+
+
+def test_sin_variantes_se_encola_y_sirve_el_original(dirs, monkeypatch):
+    started = pipeline(dirs)
+    scheduled = []
+    monkeypatch.setattr(started, "schedule", scheduled.append)
+    assert started.pick("12.png", ["webp"], 300) is None
+    assert started.pick("99.png", ["webp"], 300) is None
+    assert scheduled == ["12.png"]
+
+    started.ensure("12.png")  # lo que hace el hilo de fondo
+    assert started.pick("12.png", ["webp"], 300) == ("12.320w.webp", "image/webp")
+
+
+def test_original_modificado_invalida_al_arrancar(dirs):
+    pipeline(dirs).generate_all()
+    Image.new("RGB", (500, 500), "red").save(dirs[0] / "12.png")
+    os.utime(dirs[0] / "12.png", ns=(1, 1))
+    assert pipeline(dirs).fresh_entry("12.png") is None
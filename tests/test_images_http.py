@@ -0,0 +1,28 @@
+from infrastructure.web.image_derivatives import ImageDerivativePipeline
+from infrastructure.web.image_service import PENDING_MAX_AGE
+
+
+def test_negocia_variante_por_accept(catalog, make_app):
+    ImageDerivativePipeline(catalog["products_dir"], catalog["derivatives_dir"],
+                            formats=("webp",)).generate_all()
+    client = make_app().test_client()
+
+    resp = client.get("/assets/products/1.png?w=300", headers={"Accept": "image/webp,image/*"})
+    assert resp.status_code == 200
+    assert resp.mimetype == "image/webp"
+    assert "Accept" in resp.vary
+
+    resp = client.get("/assets/products/1.png?w=300", headers={"Accept": "image/png"})
+    assert resp.mimetype == "image/png"
+
+
+def test_sin_variantes_sirve_el_original_con_cache_corto(client, monkeypatch):
+    monkeypatch.setattr(ImageDerivativePipeline, "schedule", lambda self, filename: None)
+    resp = client.get("/assets/products/1.png?w=300", headers={"Accept": "image/webp"})
+    assert resp.status_code == 200
+    assert resp.mimetype == "image/png"
+    assert resp.cache_control.max_age == PENDING_MAX_AGE
+
+
+def test_imagen_inexistente(client):
+    assert client.get("/assets/products/999.png").status_code == 404
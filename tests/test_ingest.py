@@ -0,0 +1,81 @@
+import sqlite3
+
+import pytest
+from openpyxl import Workbook
+
+from infrastructure.database import ingest as ingest_module
+from infrastructure.database.ingest import IMAGES_URL_PREFIX, build_database, ingest
+from infrastructure.database.materialize import check_derived_fields
+from infrastructure.database.models import DatabaseConfig
+
+
+@pytest.fixture
+def target(tmp_path):
+    return str(tmp_path / "catalogo.sqlite")
+
+
+def rows_of(db, sql):
+    conn = sqlite3.connect(db)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def test_arma_productos_imagenes_y_derivados(target):
+    columns = ["id", "nombres", "categoria"]
+    rows = [[2, "ANILLO SOL", "Anillos / Compromiso"], [1, "COLLAR LUNA", "Collares"]]
+    images = {"2": ["2.png", "2_2.png"]}
+
+    assert build_database(target, columns, rows, images, DatabaseConfig(db_path=target)) == 2
+
+    assert rows_of(target, "SELECT id, nombres, nombres_display FROM products ORDER BY id") == [
+        (1, "COLLAR LUNA", "Collar Luna"),
+        (2, "ANILLO SOL", "Anillo Sol"),
+    ]
+    assert rows_of(target, "SELECT product_id, path, position, is_primary FROM product_images ORDER BY position") == [
+        ("2", IMAGES_URL_PREFIX + "2.png", 1, 1),
+        ("2", IMAGES_URL_PREFIX + "2_2.png", 2, 0),
+    ]
+    # lista para servir: la app solo comprueba, no escribe
+    check_derived_fields(DatabaseConfig(db_path=target))
+    assert rows_of(target, "SELECT rowid FROM products_fts WHERE products_fts MATCH 'anillo'")
+
+
+def test_omite_ids_invalidos_y_repetidos(target):
+    columns = ["id", "nombres"]
+    rows = [[1, "A"], [None, "sin id"], ["x12", "texto"], [1, "repetido"], ["3", "B"]]
+
+    assert build_database(target, columns, rows, {}, DatabaseConfig(db_path=target)) == 2
+    assert rows_of(target, "SELECT id, nombres FROM products ORDER BY id") == [(1, "A"), (3, "B")]
+
+
+def test_sin_columna_id_numera_por_fila(target):
+    columns = ["nombres"]
+    rows = [["A"], ["B"], ["C"]]
+
+    assert build_database(target, columns, rows, {"2": ["2.png"]}, DatabaseConfig(db_path=target)) == 3
+    assert rows_of(target, "SELECT id, nombres FROM products ORDER BY id") == [(1, "A"), (2, "B"), (3, "C")]
+    assert rows_of(target, "SELECT product_id FROM product_images") == [("2",)]
+
+
+def test_sin_indice_fts_falla_el_build(target, monkeypatch):
+    monkeypatch.setattr(ingest_module, "ensure_search_index", lambda config: False)
+    with pytest.raises(RuntimeError, match="FTS5"):
+        build_database(target, ["id", "nombres"], [[1, "A"]], {}, DatabaseConfig(db_path=target))
+
+
+def test_ingesta_fallida_no_reemplaza_la_bd(tmp_path, monkeypatch):
+    db = tmp_path / "data.sqlite"
+    build_database(str(db), ["id", "nombres"], [[1, "VIEJO"]], {}, DatabaseConfig(db_path=str(db)))
+    book = Workbook()
+    book.active.append(["ID", "NOMBRES"])
+    book.active.append([1, "NUEVO"])
+    xlsx = tmp_path / "catalogo.xlsx"
+    book.save(xlsx)
+
+    monkeypatch.setattr(ingest_module, "ensure_search_index", lambda config: False)
+    with pytest.raises(RuntimeError):
+        ingest(str(xlsx), str(db), str(tmp_path))
+    assert rows_of(str(db), "SELECT nombres FROM products") == [("VIEJO",)]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["catalogo.xlsx", "data.sqlite"]
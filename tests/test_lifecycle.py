@@ -0,0 +1,31 @@
+from infrastructure.database.repositories import SQLiteProductRepository
+
+
+def test_ping_listo_tras_precalentar(make_app):
+    client = make_app(warm_up=True, public_base_url="https://api.example.com").test_client()
+    resp = client.get("/ping")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["status"] == "ok"
+    assert "payloads" in body["startup_ms"]
+
+
+def test_precalentado_fallido_no_bloquea_readiness(make_app, monkeypatch):
+    def broken(self):
+        raise RuntimeError("índice roto")
+
+    monkeypatch.setattr(SQLiteProductRepository, "warm_up", broken)
+    client = make_app(warm_up=True).test_client()
+
+    resp = client.get("/ping")
+    assert resp.status_code == 200
+    assert resp.get_json()["status"] == "degraded"
+    assert resp.get_json()["error"] == "índice roto"
+    # y sigue respondiendo en frío
+    assert client.get("/products").status_code == 200
+
+
+def test_urls_con_el_host_publico_y_no_el_de_la_peticion(make_app):
+    app = make_app(warm_up=True, public_base_url="https://api.example.com")
+    resp = app.test_client().get("/products", base_url="http://10.0.0.5:8000/")
+    assert resp.get_json()["data"][0]["image_url"].startswith("https://api.example.com/")
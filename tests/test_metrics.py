@@ -0,0 +1,9 @@
+def test_metrics_expone_eventos_del_pool(client):
+    assert client.get("/products").status_code == 200
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.content_type == "text/plain; version=0.0.4; charset=utf-8"
+    body = resp.get_data(as_text=True)
+    assert "# TYPE db_pool_events_total counter" in body
+    assert 'db_pool_events_total{event="opened"}' in body
@@ -0,0 +1,67 @@
+import pytest
+
+from core.pagination import (
+    MAX_PAGE_SIZE, PaginationError, cursor_order, decode_cursor, encode_cursor, paginate, parse_limit,
+)
+
+ITEMS = [("anillo", 3), ("arete", 1), ("collar", 2), ("dije", 5), ("pulsera", 4)]
+
+
+def key(item):
+    return item
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("name", ["Anillo ñandú", 7])
+    assert cursor_order(cursor) == "name"
+    assert decode_cursor(cursor, "name") == ["Anillo ñandú", 7]
+
+
+def test_decode_cursor_sin_cursor():
+    assert decode_cursor(None, "name") is None
+    assert decode_cursor("", "name") is None
+    assert cursor_order(None) is None
+
+
+@pytest.mark.parametrize("cursor", ["basura", encode_cursor("fuzzy", [1.0, "a", 1])])
+def test_decode_cursor_invalido(cursor):
+    with pytest.raises(PaginationError):
+        decode_cursor(cursor, "name")
+
+
+@pytest.mark.parametrize("raw, expected", [(None, None), ("", None), (" 10 ", 10), ("999999", MAX_PAGE_SIZE)])
+def test_parse_limit(raw, expected):
+    assert parse_limit(raw) == expected
+
+
+@pytest.mark.parametrize("raw", ["0", "-3", "diez"])
+def test_parse_limit_invalido(raw):
+    with pytest.raises(PaginationError):
+        parse_limit(raw)
+
+
+def test_paginate_recorre_todo_sin_repetir():
+    seen, after = [], None
+    while True:
+        page, last = paginate(ITEMS, key, 2, after)
+        seen.extend(page)
+        if last is None:
+            break
+        after = list(last)
+    assert seen == ITEMS
+
+
+def test_paginate_con_claves_precalculadas():
+    page, last = paginate(ITEMS, key, 2, ["arete", 1], keys=ITEMS)
+    assert page == [("collar", 2), ("dije", 5)]
+    assert last == ("dije", 5)
+
+
+def test_paginate_sin_limite_y_ultima_pagina():
+    assert paginate(ITEMS, key, None, ["dije", 5]) == ([("pulsera", 4)], None)
+    assert paginate(ITEMS, key, 10, None) == (ITEMS, None)
+
+
+def test_paginate_cursor_de_otro_tipo():
+    with pytest.raises(PaginationError):
+        paginate(ITEMS, key, 2, [1.5, None])
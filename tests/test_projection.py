@@ -0,0 +1,28 @@
+def test_payload_completo(client):
+    item = client.get("/products/1").get_json()["data"]
+    assert item["id"] == 1
+    assert item["Material"] == "Oro"  # clave canónica
+    assert item["nombres_display"] == "Anillo Sol"
+    assert item["categoria_tokens"] == ["anillos"]
+    image = item["images"][0]
+    assert image["is_primary"] and image["width"] == 800
+    assert image["srcset"].endswith(" 800w")
+    # URL con huella de contenido
+    assert item["image_url"].startswith("http://localhost/assets/products/1.")
+    assert item["image_url"] != "http://localhost/assets/products/1.png"
+
+
+def test_fields_solo_lo_pedido(client):
+    body = client.get("/products?fields=id,material,image_url&limit=2").get_json()
+    # por columna de origen o por clave de salida
+    assert [sorted(p) for p in body["data"]] == [["Material", "id", "image_url"]] * 2
+    assert client.get("/products/3?fields=nombres_display").get_json() == {
+        "data": {"nombres_display": "Collar Estrella"}
+    }
+
+
+def test_fields_no_cambia_la_clave_de_cache(client):
+    a = client.get("/products/3?fields=id,nombres")
+    b = client.get("/products/3?fields=nombres,%20id")
+    assert a.get_json() == b.get_json()
+    assert a.headers["ETag"] == b.headers["ETag"]
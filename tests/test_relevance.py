@@ -0,0 +1,40 @@
+from infrastructure.database.relevance import build_relevance_index
+
+ROWS = [
+    {"id": 1, "nombres": "Collar Luna", "categoria": "collares", "descripcion": "anillo de regalo"},
+    {"id": 2, "nombres": "Anillo Sol", "categoria": "anillos", "material": "oro"},
+    {"id": 3, "nombres": "Arete", "categoria": "anillos", "material": "plata", "piedra": "oro"},
+    {"id": 4, "nombres": "Dije", "categoria": "dijes", "material": "plata oro"},
+    {"id": 5, "nombres": "Anillo Luna", "categoria": "anillos", "plus": "BEST SELLER"},
+]
+
+
+def ids(index, query):
+    return [index.ids[pos] for pos in index.search(query).positions()]
+
+
+def test_ordena_por_campo_y_best_seller():
+    index = build_relevance_index(1, ROWS)
+    # nombre > categoría > texto largo; el best seller gana el empate de nombre
+    assert ids(index, "anillo") == ["5", "2", "3", "1"]
+
+
+def test_prefijos_y_todos_los_terminos():
+    index = build_relevance_index(1, ROWS)
+    assert set(ids(index, "anil lun")) == {"1", "5"}
+    assert ids(index, "anillo esmeralda") == []
+    assert ids(index, "") == []
+
+
+def test_sin_tildes_ni_mayusculas():
+    index = build_relevance_index(1, [{"id": 1, "nombres": "Corazón"}])
+    assert ids(index, "CORAZON") == ["1"]
+
+
+def test_frase_no_cruza_columnas():
+    index = build_relevance_index(1, ROWS)
+    # "plata oro" seguido solo está en la columna material del 4; en el 3
+    # son dos columnas distintas (material, piedra) y no cuenta como frase
+    assert ids(index, "plata oro") == ["4", "3"]
+    scores = dict((index.ids[pos], score) for pos, score in index.search("plata oro").page()[0])
+    assert scores["4"] > scores["3"]
@@ -0,0 +1,47 @@
+import sqlite3
+
+from infrastructure.database.models import DatabaseConfig
+from infrastructure.database.schema import SchemaCache
+from infrastructure.database.watcher import DataVersionWatcher
+
+
+def make_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE products (id INTEGER, nombres TEXT)")
+    conn.execute("CREATE TABLE product_images (id INTEGER, product_id TEXT, path TEXT, position INTEGER)")
+    conn.commit()
+    conn.close()
+
+
+def test_esquema_cacheado_sin_pragmas_por_peticion(tmp_path):
+    db = str(tmp_path / "x.sqlite")
+    make_db(db)
+    version = [1]
+    cache = SchemaCache(DatabaseConfig(db_path=db), lambda: version[0])
+    conn = sqlite3.connect(db)
+    statements = []
+    conn.set_trace_callback(statements.append)
+
+    assert cache.get(conn).columns == ["id", "nombres"]
+    statements.clear()
+    for _ in range(3):
+        cache.get(conn)
+    assert statements == []
+
+    other = sqlite3.connect(db)
+    other.execute("ALTER TABLE products ADD COLUMN plus TEXT")
+    other.commit()
+    assert cache.get(conn).columns == ["id", "nombres"]  # hasta que cambie la versión
+    version[0] = 2
+    assert cache.get(conn).columns == ["id", "nombres", "plus"]
+
+
+def test_el_watcher_detecta_cambios_de_esquema(tmp_path):
+    db = str(tmp_path / "x.sqlite")
+    make_db(db)
+    watcher = DataVersionWatcher(db, check_interval=0)
+    before = watcher.version()
+    other = sqlite3.connect(db)
+    other.execute("ALTER TABLE products ADD COLUMN plus TEXT")
+    other.commit()
+    assert watcher.version() > before
@@ -0,0 +1,45 @@
+def ids(body):
+    return [p["id"] for p in body["data"]]
+
+
+def walk(client, url):
+    seen, cursor = [], None
+    while True:
+        body = client.get(url + (f"&cursor={cursor}" if cursor else "")).get_json()
+        seen.extend(ids(body))
+        cursor = body.get("next_cursor")
+        if not cursor:
+            return seen
+
+
+def test_cursor_recorre_el_listado_sin_repetir(client):
+    full = ids(client.get("/products").get_json())
+    assert len(full) == 6
+    assert walk(client, "/products?limit=2") == full
+
+
+def test_cursor_de_busqueda_por_relevancia(client):
+    assert walk(client, "/products?q=anillo&limit=1") == ids(client.get("/products?q=anillo").get_json())
+
+
+def test_cursor_invalido(client):
+    assert client.get("/products?limit=2&cursor=basura").status_code == 400
+
+
+def test_fallback_tolerante_a_errores_de_tipeo(client):
+    exact = client.get("/products?q=anillo").get_json()
+    assert "fuzzy" not in exact
+
+    body = client.get("/products?q=anilo").get_json()
+    assert body["fuzzy"] is True
+    assert set(ids(body)) == {1, 2, 5}
+    # la página siguiente sigue en modo tolerante por el cursor
+    first = client.get("/products?q=anilo&limit=2").get_json()
+    rest = client.get(f"/products?q=anilo&limit=2&cursor={first['next_cursor']}").get_json()
+    assert rest["fuzzy"] is True
+    assert set(ids(first) + ids(rest)) == {1, 2, 5}
+
+
+def test_sin_coincidencias(client):
+    body = client.get("/products?q=zzzz").get_json()
+    assert body["data"] == []
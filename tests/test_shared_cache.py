@@ -0,0 +1,82 @@
+import os
+import time
+
+import pytest
+
+from infrastructure.web import shared_cache
+from infrastructure.web.shared_cache import SharedPayloadStore
+
+
+@pytest.fixture
+def token():
+    return {"value": "v1"}
+
+
+@pytest.fixture
+def store(tmp_path, token):
+    return SharedPayloadStore(str(tmp_path), lambda: token["value"])
+
+
+def test_put_y_get_entre_procesos(store, tmp_path, token):
+    entry = store.put(("products", ()), b'{"data":[]}', {"etag": "abc"})
+    assert entry.meta == {"etag": "abc"}
+    assert bytes(entry.body) == b'{"data":[]}'
+
+    # otro worker (otra instancia sobre el mismo directorio) lo lee sin armarlo
+    other = SharedPayloadStore(str(tmp_path), lambda: token["value"])
+    found = other.get(("products", ()))
+    assert bytes(found.body) == b'{"data":[]}'
+    with found.open_body() as fh:
+        assert fh.read() == b'{"data":[]}'
+    assert other.get(("products", ()), "gzip") is None
+
+
+def test_gana_la_primera_escritura(store):
+    store.put("k", b"primero", {})
+    assert bytes(store.put("k", b"segundo", {}).body) == b"primero"
+
+
+def test_cambio_de_version_es_un_miss(store, token):
+    store.put("k", b"viejo", {})
+    token["value"] = "v2"
+    assert store.get("k") is None
+
+
+@pytest.mark.parametrize("content", [
+    b"AP",  # más corto que la cabecera
+    b"XXXX\x02\x00\x00\x00{}body",  # magic equivocado
+    shared_cache._HEADER.pack(shared_cache._MAGIC, 99) + b"{}",  # cabecera más larga que el archivo
+    shared_cache._HEADER.pack(shared_cache._MAGIC, 3) + b"{x}body",  # JSON roto
+])
+def test_archivo_corrupto_es_un_miss_y_se_borra(store, content):
+    store.put("k", b"ok", {})
+    path = store._path("k", shared_cache.IDENTITY)
+    path.write_bytes(content)
+    assert store.get("k") is None
+    assert not path.exists()
+
+
+def test_version_vieja_se_borra_recien_pasado_el_margen(store, tmp_path, token):
+    store.put("k", b"viejo", {})
+    lagging = SharedPayloadStore(str(tmp_path), lambda: "v1")
+    lagging.get("k")
+    token["value"] = "v2"
+    store.put("k", b"nuevo", {})
+    # recién aparecida v2: un worker que todavía lee v1 no la pierde
+    assert sorted(os.listdir(tmp_path)) == ["v1", "v2"]
+    assert bytes(lagging.get("k").body) == b"viejo"
+
+    past = time.time() - shared_cache.VERSION_GRACE - 1
+    for version in ("v1", "v2"):
+        os.utime(tmp_path / version / shared_cache._CURRENT_MARK, (past - (version == "v1"),) * 2)
+    store._collect()
+    assert sorted(os.listdir(tmp_path)) == ["v2"]
+    assert bytes(store.get("k").body) == b"nuevo"
+
+
+def test_building_toma_y_suelta_el_lock(store):
+    path = store._path("k", shared_cache.IDENTITY)
+    lock = path.with_name(f".{path.name}.lock")
+    with store.building("k"):
+        assert lock.exists()
+    assert not lock.exists()
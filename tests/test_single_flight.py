@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+from application.single_flight import SingleFlight, SingleFlightTimeout
+
+
+def run_concurrently(n, target):
+    threads = [threading.Thread(target=target) for _ in range(n)]
+    for t in threads:
+        t.start()
+    return threads
+
+
+def test_llamadas_concurrentes_comparten_un_calculo():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "payload"
+
+    leader = run_concurrently(1, lambda: results.append(flight.do("k", slow)))
+    assert started.wait(5)
+    followers = run_concurrently(4, lambda: results.append(flight.do("k", slow)))
+    while flight.stats()["shared"] < 4:
+        threading.Event().wait(0.001)
+    release.set()
+    for t in leader + followers:
+        t.join(5)
+
+    assert calls == [1]
+    assert results == ["payload"] * 5
+    assert flight.stats() == {"executed": 1, "shared": 4, "timeouts": 0, "in_flight": 0}
+
+
+def test_no_es_un_cache():
+    flight = SingleFlight()
+    assert flight.do("k", lambda: 1) == 1
+    assert flight.do("k", lambda: 2) == 2
+
+
+def test_la_excepcion_llega_a_todos():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("falló")
+
+    def call():
+        try:
+            flight.do("k", failing)
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = run_concurrently(1, call)
+    assert started.wait(5)
+    threads += run_concurrently(2, call)
+    while flight.stats()["shared"] < 2:
+        threading.Event().wait(0.001)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert errors == ["falló"] * 3
+
+
+def test_timeout_del_que_espera():
+    flight = SingleFlight(timeout=0.01)
+    started, release = threading.Event(), threading.Event()
+    leader = run_concurrently(1, lambda: flight.do("k", lambda: started.set() or release.wait(5)))
+    assert started.wait(5)
+    with pytest.raises(SingleFlightTimeout):
+        flight.do("k", lambda: None)
+    release.set()
+    leader[0].join(5)
+    assert flight.stats()["timeouts"] == 1
@@ -0,0 +1,41 @@
+import pytest
+
+from infrastructure.database.pool import SQLiteConnectionPool
+
+URLS = [
+    "/products",
+    "/products?limit=2",
+    "/products?q=anillo",
+    "/products?q=anillo&limit=1",
+    "/products/3",
+    "/products?ids=4,1,99",
+    "/products/best-sellers",
+    "/products?q=anillo&stream=1",
+]
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_snapshot_responde_igual_que_sqlite(make_app, url):
+    from_sqlite = make_app(catalog_snapshot=False).test_client().get(url)
+    from_memory = make_app(catalog_snapshot=True).test_client().get(url)
+    assert from_memory.status_code == from_sqlite.status_code
+    assert from_memory.get_json() == from_sqlite.get_json()
+
+
+def test_snapshot_sin_sqlite_en_el_camino_caliente(make_app, monkeypatch):
+    client = make_app(catalog_snapshot=True, warm_up=True).test_client()
+
+    def no_sqlite(self):
+        raise AssertionError("consulta a SQLite con el snapshot activo")
+
+    monkeypatch.setattr(SQLiteConnectionPool, "connection", no_sqlite)
+    assert client.get("/products/2").get_json()["data"]["id"] == 2
+    assert client.get("/products?limit=2").status_code == 200
+    assert client.get("/products?ids=5,6").get_json()["total"] == 2
+
+
+def test_snapshot_por_variable_de_entorno(make_app, monkeypatch):
+    monkeypatch.setenv("CATALOG_SNAPSHOT", "1")
+    client = make_app(warm_up=True).test_client()
+    monkeypatch.setattr(SQLiteConnectionPool, "connection", lambda self: pytest.fail("snapshot apagado"))
+    assert client.get("/products/1").status_code == 200
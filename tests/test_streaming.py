@@ -0,0 +1,36 @@
+import json
+
+NDJSON = {"Accept": "application/x-ndjson"}
+
+
+def test_ndjson_un_producto_por_linea(client):
+    resp = client.get("/products", headers=NDJSON)
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/x-ndjson"
+    assert "ETag" not in resp.headers  # sin cache: el cuerpo se arma mientras se envía
+    assert "Accept" in resp.headers["Vary"]
+    lines = resp.get_data(as_text=True).splitlines()
+    # mismo contenido y orden que la respuesta normal
+    assert [json.loads(line) for line in lines] == client.get("/products").get_json()["data"]
+
+
+def test_stream_json_con_total_al_final(client):
+    resp = client.get("/products?q=anillo&stream=1")
+    assert "ETag" not in resp.headers
+    body = resp.get_json()
+    assert body["total"] == 3
+    assert body == client.get("/products?q=anillo").get_json() | {"total": 3}
+
+
+def test_paginas_no_se_transmiten(client):
+    resp = client.get("/products?limit=2", headers=NDJSON)
+    assert resp.mimetype == "application/json"
+    assert "ETag" in resp.headers
+
+
+def test_stream_con_fallback_tolerante(client):
+    body = client.get("/products?q=anilo&stream=1").get_json()
+    assert body["fuzzy"] is True
+    assert {p["id"] for p in body["data"]} == {1, 2, 5}
+    lines = client.get("/products?q=anilo", headers=NDJSON).get_data(as_text=True).splitlines()
+    assert {json.loads(line)["id"] for line in lines} == {1, 2, 5}